@@ -228,7 +228,8 @@ run_script() {
     fi
 }
 
-# Profile installations
+# Profile installations: run the declarative profile (profiles/*.toml)
+# through the headless batch runner
 install_profile() {
     local profile="$1"
 
@@ -242,27 +243,24 @@ install_profile() {
     case "$profile" in
         "gaming")
             echo -e "${BLUE}Installing Complete Gaming Setup...${NC}"
-            run_script "$INSTALL_DIR/multimedia/gaming.sh"
-            run_script "$INSTALL_DIR/multimedia/codecs.sh"
-            run_script "$INSTALL_DIR/desktop/applications.sh"
-            run_script "$INSTALL_DIR/system/system-tweaks.sh"
             ;;
         "development")
             echo -e "${BLUE}Installing Complete Development Environment...${NC}"
-            run_script "$INSTALL_DIR/terminal/shell-setup.sh"
-            run_script "$INSTALL_DIR/development/dev-tools.sh"
-            run_script "$INSTALL_DIR/development/editors.sh"
-            run_script "$INSTALL_DIR/development/containers.sh"
-            run_script "$INSTALL_DIR/extras/flatpak.sh"
+            profile="developer"
             ;;
         "multimedia")
             echo -e "${BLUE}Installing Complete Multimedia Workstation...${NC}"
-            run_script "$INSTALL_DIR/multimedia/media-apps.sh"
-            run_script "$INSTALL_DIR/multimedia/codecs.sh"
-            run_script "$INSTALL_DIR/desktop/applications.sh"
-            run_script "$INSTALL_DIR/desktop/themes.sh"
             ;;
     esac
+
+    local archer_dir sudo_mode="ask"
+    archer_dir="$(dirname "$SCRIPT_DIR")"
+    # Ask for the sudo password once and serve it to every job
+    [[ $EUID -eq 0 ]] && sudo_mode="none"
+    if ! (cd "$archer_dir" && ARCHER_DIR="$archer_dir" python3 -m archer.run --sudo "$sudo_mode" --profile "$profile"); then
+        echo -e "${RED}Profile $profile did not complete; see the output above.${NC}"
+    fi
+    wait_for_input
 }
 
 # Detect current desktop theme
@@ -9,10 +9,12 @@ import sys
 import subprocess
 import time
 import argparse
+import re
+import shlex
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn, MofNCompleteColumn, TaskProgressColumn
@@ -24,6 +26,52 @@ from rich.layout import Layout
 from rich.live import Live
 from rich.tree import Tree
 
+# Package-local helpers live in bin/archer
+sys.path.insert(0, str(Path(__file__).parent))
+from archer.pacman_progress import PacmanProgressParser
+from archer.line_classifier import classifier
+from archer.output_spool import OutputSpool
+
+# Output classifiers shared by every progress view, compiled once
+SCRIPT_CLASSIFIER = classifier('script')
+SIMPLE_CLASSIFIER = classifier('simple')
+NALA_CLASSIFIER = classifier('nala')
+# Progress the nala view credits for the first line seen in each phase
+NALA_PHASE_STEPS = {'downloading': 20, 'installing': 25, 'building': 30, 'configuring': 15, 'extracting': 10, 'complete': 10}
+# Package managers whose sync installs show_multi_package_progress follows
+PACKAGE_MANAGERS = ('pacman', 'yay', 'paru')
+SYNC_OPTION_RE = re.compile(r'-S[yu]*')
+# Options whose next word is their argument, not a package
+VALUE_OPTIONS = frozenset({
+    '-b', '-r', '--dbpath', '--root', '--arch', '--cachedir', '--config', '--gpgdir',
+    '--hookdir', '--logfile', '--sysroot', '--ignore', '--ignoregroup',
+    '--assume-installed', '--overwrite', '--print-format',
+})
+# Log chatter and indented/formatted lines not worth showing as a status
+NOISE_RE = re.compile(r'warning:|note:|info:|debug:|trace:|==>|-->|:::|   ', re.IGNORECASE)
+
+class StatusPanel:
+    """Progress bar and status line in a titled panel, for use with Live.
+
+    Output loops only assign `status`; Live renders the panel on its own
+    refresh tick, so the panel is rebuilt a few times a second however
+    fast the command prints.
+    """
+
+    def __init__(self, progress: Progress, title: str, status: str = "Starting installation..."):
+        self.progress = progress
+        self.title = title
+        self.status = status
+
+    def __rich__(self) -> Panel:
+        return Panel(
+            Group(self.progress, "", Text(self.status, style="cyan")),
+            title=self.title,
+            border_style="blue",
+            padding=(0, 1)
+        )
+
+
 class ArcherUI:
     """Enhanced UI using Rich library"""
 
@@ -219,11 +267,6 @@ class ArcherUI:
 
     def show_script_progress(self, description: str, command: str) -> bool:
         """Show progress for shell script execution with panel interface"""
-        from rich.live import Live
-        from rich.panel import Panel
-        from rich.text import Text
-        from rich.console import Group
-
         # Initialize progress components
         progress = Progress(
             SpinnerColumn(),
@@ -245,31 +288,10 @@ class ArcherUI:
             universal_newlines=True
         )
 
-        output_lines = []
-        current_operation = "Starting installation..."
-
-        with Live(console=self.console, refresh_per_second=4, transient=False) as live:
+        view = StatusPanel(progress, f"[bold blue]🔧 {description}[/bold blue]")
 
-            def update_display():
-                # Create status text
-                status_text = Text(current_operation, style="cyan")
-
-                # Group progress and status together
-                content_group = Group(progress, "", status_text)
-
-                # Create panel with both progress and status inside
-                panel = Panel(
-                    content_group,
-                    title=f"[bold blue]🔧 {description}[/bold blue]",
-                    border_style="blue",
-                    padding=(0, 1)
-                )
-                live.update(panel)
-                status_text = Text(current_operation, style="cyan")
-                layout["status"].update(status_text)
-
-            # Initial display
-            update_display()
+        with OutputSpool(description) as spool, \
+                Live(view, console=self.console, refresh_per_second=4, transient=False) as live:
 
             while True:
                 output = process.stdout.readline()
@@ -277,91 +299,44 @@ class ArcherUI:
                     break
 
                 if output:
+                    spool.append(output.rstrip('\n'))
                     line = output.strip()
-                    output_lines.append(line)
-                    current_operation = line
-
                     # Update status based on common script patterns
-                    line_lower = line.lower()
-                    if any(pattern in line_lower for pattern in ['installing', 'install ']):
-                        if 'gfortran' in line_lower:
-                            current_operation += "Installing GFortran compiler..."
-                        elif 'lfortran' in line_lower:
-                            current_operation = "Building LFortran (this may take 20-45 minutes)..."
-                        elif any(pkg in line_lower for pkg in ['dlang', 'dmd', 'ldc']):
-                            current_operation += "Installing D compiler..."
-                        elif 'nim' in line_lower:
-                            current_operation += "Installing Nim language..."
-                        elif 'zig' in line_lower:
-                            current_operation += "Installing Zig language..."
-                        elif 'rust' in line_lower:
-                            current_operation += "Installing Rust toolchain..."
-                        elif 'go' in line_lower:
-                            current_operation += "Installing Go language..."
-                        elif 'postgresql' in line_lower:
-                            current_operation += "Installing PostgreSQL database..."
-                        elif 'mariadb' in line_lower or 'mysql' in line_lower:
-                            current_operation += "Installing MariaDB database..."
-                        elif 'redis' in line_lower:
-                            current_operation += "Installing Redis cache..."
-                        elif 'sqlite' in line_lower:
-                            current_operation += "Installing SQLite database..."
-                        elif 'mongodb' in line_lower:
-                            current_operation += "Installing MongoDB database..."
-                        elif 'dbeaver' in line_lower:
-                            current_operation += "Installing DBeaver GUI client..."
-                        elif 'dbmate' in line_lower:
-                            current_operation += "Installing DBmate migration tool..."
-                        else:
-                            current_operation += "Installing packages..."
-                    elif 'downloading' in line_lower:
-                        current_operation += "Downloading packages..."
-                    elif 'building' in line_lower or 'compiling' in line_lower:
-                        # Special handling for LFortran build process
-                        if 'lfortran' in line_lower or any(word in line_lower for word in ['bison', 'parser', 'grammar']):
-                            current_operation += "Building LFortran (bison parser generation - please be patient)..."
-                        else:
-                            current_operation += "Building from source..."
-                    elif 'configuring' in line_lower:
-                        current_operation += "Configuring installation..."
-                    elif 'complete' in line_lower or 'success' in line_lower:
-                        current_operation += "Installation completing..."
-                    elif 'mise install' in line_lower:
-                        current_operation += "Installing via Mise..."
-                    elif 'yay -s' in line_lower or 'pacman -s' in line_lower:
-                        current_operation += "Installing from repositories..."
-                    elif 'systemctl enable' in line_lower:
-                        current_operation += "Enabling system services..."
-                    elif 'service' in line_lower and 'start' in line_lower:
-                        current_operation += "Starting services..."
-
-                    # Update progress task and display
-                    progress.update(task, description=f"Running {description}...")
-                    update_display()
+                    match = SCRIPT_CLASSIFIER.classify(line)
+                    current_operation = line if match is None else match.status
+
+                    # Live picks this up on its next refresh
+                    view.status = current_operation
 
             return_code = process.poll()
+            spool.close()
 
             if return_code == 0:
-                current_operation = f"✓ {description} completed successfully!"
+                view.status = f"✓ {description} completed successfully!"
                 progress.update(task, description=f"✓ {description} completed")
-                update_display()
+                live.refresh()
                 time.sleep(1)  # Show completion
                 return True
             else:
-                current_operation = f"✗ {description} failed (exit code: {return_code})"
+                view.status = f"✗ {description} failed (exit code: {return_code})"
                 progress.update(task, description=f"✗ {description} failed")
-                update_display()
+                live.refresh()
                 time.sleep(1)  # Show error
 
                 # Show debugging info after live display ends
-                if output_lines:
-                    self.console.print(f"\n[yellow]Last output (for debugging):[/yellow]")
-                    for line in output_lines[-5:]:
-                        if line.strip():  # Only show non-empty lines
-                            self.console.print(f"  [dim]{line}[/dim]")
-
+                self._report_output(spool, 5, "Last output (for debugging):")
                 return False
 
+    def _report_output(self, spool: OutputSpool, count: int, title: str):
+        """Print the tail of a failed command and where its full log is."""
+        lines = spool.last(count)
+        if lines:
+            self.console.print(f"\n[yellow]{title}[/yellow]")
+            for line in lines:
+                self.console.print(f"  [dim]{line}[/dim]")
+        if spool.path is not None:
+            self.console.print(f"  [dim]Full output ({spool.lines} lines): {spool.path}[/dim]")
+
     def show_verbose_passthrough(self, description: str, command: str) -> bool:
         """Show raw command output without any progress wrapper (verbose mode)"""
         self.console.print(f"\n[bold blue]🔧 {description}[/bold blue]")
@@ -415,11 +390,6 @@ class ArcherUI:
 
     def show_simple_progress(self, description: str, command: str) -> bool:
         """Show simple spinner-based progress with panel interface for quick installations"""
-        from rich.live import Live
-        from rich.panel import Panel
-        from rich.text import Text
-        from rich.console import Group
-
         # Initialize progress components
         progress = Progress(
             SpinnerColumn(),
@@ -442,27 +412,10 @@ class ArcherUI:
         )
 
         # Simple output capture without heavy processing
-        output_lines = []
-        current_operation = "Starting installation..."
-
-        with Live(layout, console=self.console, refresh_per_second=4, transient=False) as live:
-
-            def update_display():
-                # Update progress panel
-                progress_panel = Panel(
-                    progress,
-                    title=f"[bold blue]⚡ {description}[/bold blue]",
-                    border_style="blue",
-                    padding=(0, 1)
-                )
-                layout["progress_panel"].update(progress_panel)
-
-                # Update status line
-                status_text = Text(current_operation, style="cyan")
-                layout["status"].update(status_text)
+        view = StatusPanel(progress, f"[bold blue]⚡ {description}[/bold blue]")
 
-            # Initial display
-            update_display()
+        with OutputSpool(description) as spool, \
+                Live(view, console=self.console, refresh_per_second=4, transient=False) as live:
 
             while True:
                 output = process.stdout.readline()
@@ -470,60 +423,42 @@ class ArcherUI:
                     break
 
                 if output:
+                    spool.append(output.rstrip('\n'))
                     line = output.strip()
-                    output_lines.append(line)
 
                     # Update status for key operations
-                    line_lower = line.lower()
-                    if 'downloading' in line_lower:
-                        current_operation = "Downloading components..."
-                    elif 'installing' in line_lower:
-                        current_operation = "Installing packages..."
-                    elif 'complete' in line_lower or 'success' in line_lower:
-                        current_operation = "Completing installation..."
-                    elif 'cargo install' in line_lower:
-                        current_operation = "Installing Rust package..."
-                    elif 'npm install' in line_lower:
-                        current_operation = "Installing Node.js package..."
-                    elif 'pip install' in line_lower:
-                        current_operation = "Installing Python package..."
-                    elif 'go install' in line_lower:
-                        current_operation = "Installing Go package..."
-
-                    # Update display
-                    update_display()
+                    match = SIMPLE_CLASSIFIER.classify(line)
+                    if match is not None:
+                        view.status = match.status
 
             return_code = process.poll()
+            spool.close()
 
             if return_code == 0:
-                current_operation = f"✓ {description} completed successfully!"
+                view.status = f"✓ {description} completed successfully!"
                 progress.update(task, description=f"✓ {description} completed")
-                update_display()
+                live.refresh()
                 time.sleep(1)  # Show completion
                 return True
             else:
-                current_operation = f"✗ {description} failed (exit code: {return_code})"
+                view.status = f"✗ {description} failed (exit code: {return_code})"
                 progress.update(task, description=f"✗ {description} failed")
-                update_display()
+                live.refresh()
                 time.sleep(1)  # Show error
 
                 # Show debugging info after live display ends
-                if output_lines:
-                    self.console.print(f"\n[yellow]Last output:[/yellow]")
-                    for line in output_lines[-3:]:
-                        if line.strip():
-                            self.console.print(f"  [dim]{line}[/dim]")
-
+                self._report_output(spool, 3, "Last output:")
                 return False
 
     def show_multi_package_progress(self, description: str, packages: List[str], command_template: str) -> bool:
-        """Show nala-style progress with panel for multiple packages"""
-        from rich.live import Live
-        from rich.panel import Panel
-        from rich.text import Text
-        from rich.console import Group
+        """Install several packages in one transaction with per-package progress.
 
-        # Initialize progress components
+        `command_template` receives the whole list once, e.g.
+        "sudo pacman -S --needed --noconfirm {packages}" ({package} is
+        accepted too). Progress is attributed to the requested packages by
+        following pacman's output, so there is one process and one database
+        lock however many packages are requested.
+        """
         progress = Progress(
             TextColumn("[bold blue]{task.description}"),
             BarColumn(bar_width=40),
@@ -533,127 +468,121 @@ class ArcherUI:
             expand=False
         )
 
-        main_task = progress.add_task(f"[bold]{description}", total=len(packages))
-
-        # Status tracking
-        success_count = 0
-        failed_packages = []
-        current_status = "Starting installation..."
-
-        with Live(console=self.console, refresh_per_second=4, transient=False) as live:
-
-            def update_display():
-                # Create status text
-                status_text = Text(current_status, style="cyan")
-
-                # Group progress and status together
-                content_group = Group(progress, "", status_text)
-
-                # Create panel with both progress and status inside
-                panel = Panel(
-                    content_group,
-                    title=f"[bold blue]📦 {description}[/bold blue]",
-                    border_style="blue",
-                    padding=(0, 1)
-                )
-                live.update(panel)
-
-        with Live(layout, console=self.console, refresh_per_second=4, transient=False) as live:
+        main_task = progress.add_task(f"[bold]{description}", total=100)
+        package_task = progress.add_task(f"0/{len(packages)} packages", total=len(packages))
 
-            def update_display():
-                # Update progress panel
-                progress_panel = Panel(
-                    progress,
-                    title=f"[bold blue]📦 {description}[/bold blue]",
-                    border_style="blue",
-                    padding=(0, 1)
-                )
-                layout["progress_panel"].update(progress_panel)
-
-                # Update status line
-                status_text = Text(current_status, style="cyan")
-                layout["status"].update(status_text)
-
-            # Initial display
-            update_display()
-
-            for i, package in enumerate(packages, 1):
-                # Update main progress
-                progress.update(main_task, completed=i-1)
-
-                # Update status
-                current_status = f"[{i}/{len(packages)}] Installing {package}..."
-                update_display()
-
-                # Execute package installation
-                command = command_template.format(package=package)
-                process = subprocess.Popen(
-                    command,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
-                )
+        quoted = " ".join(shlex.quote(package) for package in packages)
+        command = command_template.format(packages=quoted, package=quoted)
 
-                output_lines = []
-
-                # Monitor installation progress
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-
-                    if output:
-                        line = output.strip()
-                        output_lines.append(line)
-                        line_lower = line.lower()
-
-                        # Update sub-status based on output
-                        if 'downloading' in line_lower:
-                            current_status = f"[{i}/{len(packages)}] Downloading {package}..."
-                        elif 'installing' in line_lower:
-                            current_status = f"[{i}/{len(packages)}] Installing {package}..."
-                        elif 'configuring' in line_lower:
-                            current_status = f"[{i}/{len(packages)}] Configuring {package}..."
-                        elif 'building' in line_lower:
-                            current_status = f"[{i}/{len(packages)}] Building {package}..."
-
-                        update_display()
-
-                # Check result
-                return_code = process.poll()
-
-                if return_code == 0:
-                    current_status = f"[{i}/{len(packages)}] ✓ {package} installed successfully"
-                    success_count += 1
-                else:
-                    current_status = f"[{i}/{len(packages)}] ✗ {package} failed"
-                    failed_packages.append(package)
+        # Requested packages by the name pacman prints for them
+        pending = {package.split('/')[-1]: package for package in packages}
+        installed = []
+        failed_packages = []
+        pacman_parser = PacmanProgressParser()
+        view = StatusPanel(progress, f"[bold blue]📦 {description}[/bold blue]")
 
-                update_display()
-                time.sleep(0.5)  # Brief pause to show individual result
+        def settle(name: str, ok: bool):
+            package = pending.pop(name, None)
+            if package is None:
+                return
+            (installed if ok else failed_packages).append(package)
+            progress.update(package_task, completed=len(installed) + len(failed_packages),
+                            description=f"{len(installed)}/{len(packages)} packages")
 
-            # Complete the main progress
-            progress.update(main_task, completed=len(packages))
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            universal_newlines=True
+        )
 
-            # Final status
-            if success_count == len(packages):
-                current_status = f"✓ All {len(packages)} packages installed successfully!"
-                update_display()
-                time.sleep(1)
-                return True
+        with OutputSpool(description) as spool, \
+                Live(view, console=self.console, refresh_per_second=4, transient=False) as live:
+            current = ''
+            for output in process.stdout:
+                spool.append(output.rstrip('\n'))
+                line = output.strip()
+                if not line:
+                    continue
+
+                update = pacman_parser.feed(line)
+                if update is not None:
+                    progress.update(main_task, completed=update.overall)
+                    view.status = update.status
+                    if update.phase == 'installing' and update.package != current:
+                        # The previous package finished once the next one starts
+                        settle(current, True)
+                        current = update.package
+                    elif update.phase in ('hooks', 'done'):
+                        settle(current, True)
+                        current = ''
+                    continue
+
+                if line.startswith('warning:') and line.endswith('-- skipping'):
+                    # "warning: foo-1.0-1 is up to date -- skipping"
+                    name = line.split()[1].rsplit('-', 2)[0]
+                    settle(name, True)
+                elif line.startswith('error: target not found:'):
+                    settle(line.rsplit(':', 1)[1].strip(), False)
+
+            return_code = process.wait()
+            spool.close()
+            settle(current, return_code == 0)
+            for name in list(pending):
+                settle(name, return_code == 0)
+
+            progress.update(main_task, completed=100 if return_code == 0 else pacman_parser.overall)
+            if return_code == 0:
+                view.status = f"✓ All {len(packages)} packages installed successfully!"
             else:
-                current_status = f"⚠ {success_count}/{len(packages)} packages installed (some failed)"
-                update_display()
-                time.sleep(1)
-
-                # Show failed packages after live display ends
-                if failed_packages:
-                    self.console.print(f"\n[red]Failed packages: {', '.join(failed_packages)}[/red]")
-
-                return success_count > 0
+                view.status = f"✗ {description} failed (exit code: {return_code})"
+            live.refresh()
+            time.sleep(1)
+
+        if return_code != 0:
+            # Show what went wrong after the live display ends
+            if failed_packages:
+                self.console.print(f"\n[red]Failed packages: {', '.join(failed_packages)}[/red]")
+            self._report_output(spool, 5, "Last output:")
+        return return_code == 0
+
+    @staticmethod
+    def _package_install(command: str) -> Optional[Tuple[List[str], str]]:
+        """(packages, command template) when `command` only syncs several packages.
+
+        Accepts an optional `cd DIR &&` prefix and `sudo`, e.g.
+        "sudo pacman -S --needed --noconfirm git vim"; anything else
+        (pipes, variables, a single package) returns None.
+        """
+        *prefix, install = command.split('&&')
+        if any(not part.strip().startswith('cd ') for part in prefix) or re.search(r'[|;<>$`]', install):
+            return None
+        try:
+            words = shlex.split(install)
+        except ValueError:
+            return None
+        start = 1 if words[:1] == ['sudo'] else 0
+        if len(words) < start + 2 or words[start] not in PACKAGE_MANAGERS \
+                or not SYNC_OPTION_RE.fullmatch(words[start + 1]):
+            return None
+        options, packages = [], []
+        args = iter(words[start + 2:])
+        for word in args:
+            if not word.startswith('-'):
+                packages.append(word)
+                continue
+            options.append(word)
+            if word in VALUE_OPTIONS:
+                options.append(next(args, ''))
+        if len(packages) < 2:
+            return None
+        template = shlex.join(words[:start + 2] + options) + ' {packages}'
+        if prefix:
+            template = '&&'.join(prefix) + '&& ' + template
+        return packages, template
 
     def show_progress(self, description: str, command: str, script_path: str = "") -> bool:
         """Show progress with intelligent detection of installation type"""
@@ -662,6 +591,12 @@ class ArcherUI:
         if self.verbose:
             return self.show_verbose_passthrough(description, command)
 
+        # A direct install of several packages runs as one transaction with
+        # per-package progress
+        package_install = self._package_install(command)
+        if package_install is not None:
+            return self.show_multi_package_progress(description, *package_install)
+
         # Detect installation type and choose appropriate progress display
         install_type = self._detect_installation_type(command, script_path)
 
@@ -680,11 +615,6 @@ class ArcherUI:
 
     def show_nala_progress(self, description: str, command: str) -> bool:
         """Show progress while executing a command with nala-style interface using panel"""
-        from rich.live import Live
-        from rich.panel import Panel
-        from rich.text import Text
-        from rich.console import Group
-
         # Start the subprocess
         process = subprocess.Popen(
             command,
@@ -709,31 +639,14 @@ class ArcherUI:
         main_task = progress.add_task(f"[bold]{description}", total=100)
 
         # Progress tracking variables
-        output_lines = []
         main_progress = 0
         current_operation = "Starting installation..."
         operations_seen = set()
+        pacman_parser = PacmanProgressParser()
+        view = StatusPanel(progress, f"[bold blue]📦 {description}[/bold blue]", current_operation)
 
-        with Live(console=self.console, refresh_per_second=8, transient=False) as live:
-
-            def update_display():
-                # Create status text
-                status_text = Text(current_operation, style="cyan")
-
-                # Group progress and status together
-                content_group = Group(progress, "", status_text)
-
-                # Create panel with both progress and status inside
-                panel = Panel(
-                    content_group,
-                    title=f"[bold blue]📦 {description}[/bold blue]",
-                    border_style="blue",
-                    padding=(0, 1)
-                )
-                live.update(panel)
-
-            # Initial display
-            update_display()
+        with OutputSpool(description) as spool, \
+                Live(view, console=self.console, refresh_per_second=8, transient=False) as live:
 
             while True:
                 output = process.stdout.readline()
@@ -741,167 +654,55 @@ class ArcherUI:
                     break
 
                 if output:
+                    spool.append(output.rstrip('\n'))
                     line = output.strip()
-                    output_lines.append(line)
-
-                    # Keep only last 50 lines
-                    if len(output_lines) > 50:
-                        output_lines = output_lines[-25:]
-
-                    # Parse different types of operations for progress estimation
-                    line_lower = line.lower()
-
-                    # Always update with most recent meaningful output for better feedback
-                    previous_operation = current_operation
-
-                    # Detect different phases and update progress
-                    if any(keyword in line_lower for keyword in ['downloading', 'download']):
-                        if 'downloading' not in operations_seen:
-                            operations_seen.add('downloading')
-                            main_progress = min(main_progress + 20, 90)
-
-                        # Extract specific package/file being downloaded
-                        if any(pkg in line_lower for pkg in ['http', 'ftp', '.tar', '.zip', '.gz', '.xz']):
-                            # Extract filename from URL or path
-                            words = line.split()
-                            for word in words:
-                                if any(ext in word.lower() for ext in ['.tar', '.zip', '.gz', '.xz', '.deb', '.rpm']):
-                                    filename = word.split('/')[-1][:40]
-                                    current_operation = f"Downloading {filename}..."
-                                    break
-                            else:
-                                current_operation = "Downloading packages..."
-                        else:
-                            current_operation = "Downloading packages..."
-
-                    elif any(keyword in line_lower for keyword in ['installing', 'install']):
-                        if 'installing' not in operations_seen:
-                            operations_seen.add('installing')
-                            main_progress = min(main_progress + 25, 90)
-
-                        # Extract specific package name being installed
-                        import re
-                        package_patterns = [
-                            r'installing\s+(\w+[-\w]*)',
-                            r'install:\s+(\w+[-\w]*)',
-                            r'package\s+(\w+[-\w]*)',
-                            r'setting up\s+(\w+[-\w]*)',
-                            r'unpacking\s+(\w+[-\w]*)'
-                        ]
-                        for pattern in package_patterns:
-                            match = re.search(pattern, line_lower)
-                            if match:
-                                package_name = match.group(1)[:20]
-                                current_operation = f"Installing {package_name}..."
-                                break
-                        else:
-                            current_operation = "Installing packages..."
-
-                    elif any(keyword in line_lower for keyword in ['building', 'compiling', 'compile', 'make', 'gcc', 'clang']):
-                        if 'building' not in operations_seen:
-                            operations_seen.add('building')
-                            main_progress = min(main_progress + 30, 90)
-
-                        # Show specific file being compiled
-                        if any(ext in line_lower for ext in ['.c', '.cpp', '.cc', '.cxx', '.h', '.hpp']):
-                            words = line.split()
-                            for word in words:
-                                if any(ext in word.lower() for ext in ['.c', '.cpp', '.cc', '.cxx']):
-                                    filename = word.split('/')[-1][:30]
-                                    current_operation = f"Compiling {filename}..."
-                                    break
-                            else:
-                                current_operation = "Building from source..."
-                        elif 'makepkg' in line_lower:
-                            current_operation = "Building package with makepkg..."
-                        elif 'cargo' in line_lower and 'build' in line_lower:
-                            current_operation = "Building Rust project..."
-                        elif 'npm' in line_lower and any(cmd in line_lower for cmd in ['build', 'compile']):
-                            current_operation = "Building Node.js project..."
-                        else:
-                            current_operation = "Building from source..."
-
-                    elif any(keyword in line_lower for keyword in ['configuring', 'configure']):
-                        if 'configuring' not in operations_seen:
-                            operations_seen.add('configuring')
-                            main_progress = min(main_progress + 15, 90)
-                        current_operation = "Configuring installation..."
-
-                    elif any(keyword in line_lower for keyword in ['extracting', 'extract']):
-                        if 'extracting' not in operations_seen:
-                            operations_seen.add('extracting')
-                            main_progress = min(main_progress + 10, 90)
-                        current_operation = "Extracting packages..."
-
-                    elif any(keyword in line_lower for keyword in ['processing', 'process']):
-                        current_operation = "Processing installation..."
-
-                    elif any(keyword in line_lower for keyword in ['complete', 'finished', 'done', 'success']):
-                        current_operation = "Completing installation..."
-                        main_progress = min(main_progress + 10, 100)
-
-                    # More granular detection for specific operations
-                    elif 'resolving dependencies' in line_lower:
-                        current_operation = "Resolving dependencies..."
-                    elif 'checking for conflicts' in line_lower:
-                        current_operation = "Checking for conflicts..."
-                    elif 'checking keys' in line_lower or 'validating' in line_lower:
-                        current_operation = "Validating packages..."
-                    elif 'loading packages' in line_lower:
-                        current_operation = "Loading package files..."
-                    elif 'checking integrity' in line_lower:
-                        current_operation = "Checking package integrity..."
-                    elif 'preparing' in line_lower:
-                        current_operation = "Preparing installation..."
-                    elif 'updating' in line_lower and 'database' in line_lower:
-                        current_operation = "Updating package database..."
-                    elif 'synchronizing' in line_lower:
-                        current_operation = "Synchronizing package databases..."
-                    elif 'retrieving' in line_lower:
-                        current_operation = "Retrieving packages..."
-
-                    # Show recent output for any line that contains useful info
-                    elif len(line) > 10 and not any(skip in line_lower for skip in [
-                        'warning:', 'note:', 'info:', 'debug:', 'trace:',
-                        '==>', '-->', ':::', '   ', '    '  # Skip indented/formatted lines
-                    ]):
-                        # Show last meaningful output line (truncated)
-                        display_line = line[:60] + "..." if len(line) > 60 else line
-                        if not display_line.isspace() and len(display_line.strip()) > 5:
-                            current_operation = f"Processing: {display_line}"
-
-                    # Always update display if operation changed or periodically for activity indication
-                    if current_operation != previous_operation or len(output_lines) % 2 == 0:
-                        # Update progress bar
-                        progress.update(main_task, completed=main_progress)
-
-                        # Update display
-                        update_display()
-
-                    # Reduced delay for more responsive updates
-                    time.sleep(0.01)
+
+                    # Pacman/yay transactions report real progress; keyword
+                    # heuristics are only a fallback for other output
+                    update = pacman_parser.feed(line)
+                    if update is not None:
+                        main_progress = max(main_progress, update.overall)
+                        current_operation = update.status
+
+                    else:
+                        # Keyword heuristics for any other output
+                        match = NALA_CLASSIFIER.classify(line)
+                        if match is not None:
+                            current_operation = match.status
+                            if match.phase == 'complete':
+                                main_progress = min(main_progress + NALA_PHASE_STEPS['complete'], 100)
+                            elif match.phase in NALA_PHASE_STEPS and match.phase not in operations_seen:
+                                operations_seen.add(match.phase)
+                                main_progress = min(main_progress + NALA_PHASE_STEPS[match.phase], 90)
+
+                        # Show recent output for any line that contains useful info
+                        elif len(line) > 10 and not NOISE_RE.search(line):
+                            # Show last meaningful output line (truncated)
+                            display_line = line[:60] + "..." if len(line) > 60 else line
+                            if len(display_line.strip()) > 5:
+                                current_operation = f"Processing: {display_line}"
+
+                    # Only state changes here; Live renders them on its next tick
+                    view.status = current_operation
+                    progress.update(main_task, completed=main_progress)
 
             # Final completion
             return_code = process.poll()
+            spool.close()
 
             if return_code == 0:
                 progress.update(main_task, completed=100)
-                current_operation = f"✓ {description} completed successfully!"
-                update_display()
+                view.status = f"✓ {description} completed successfully!"
+                live.refresh()
                 time.sleep(1)  # Show completion for a moment
                 return True
             else:
-                current_operation = f"✗ {description} failed (exit code: {return_code})"
-                update_display()
+                view.status = f"✗ {description} failed (exit code: {return_code})"
+                live.refresh()
                 time.sleep(1)  # Show error for a moment
 
                 # Show error details after the live display ends
-                if output_lines:
-                    self.console.print(f"\n[yellow]Last output (for debugging):[/yellow]")
-                    for line in output_lines[-5:]:
-                        if line.strip():
-                            self.console.print(f"  [dim]{line}[/dim]")
-
+                self._report_output(spool, 5, "Last output (for debugging):")
                 return False
 
     def confirm_action(self, message: str) -> bool:
@@ -63,6 +63,7 @@ Archer Linux Enhancement Suite
 
 USAGE:
     archer.sh [OPTIONS]
+    archer.sh run [RUN OPTIONS] TARGET...
 
 OPTIONS:
     --debug, -d     Show discovered menu structure and exit
@@ -71,11 +72,16 @@ OPTIONS:
     --check         Check system requirements
     --classic       Use the classic GUM-based interface (archer-old.sh)
 
+COMMANDS:
+    run TARGET...   Run installers without a user interface (see 'archer.sh run --help')
+
 EXAMPLES:
     archer.sh                 # Start the TUI interface (default)
     archer.sh --classic       # Use the classic GUM-based interface
     archer.sh --debug         # Debug: show menu structure
     archer.sh --check         # Check if all dependencies are installed
+    archer.sh run development/system-programming/rust 'development/database-tools/*'
+    archer.sh run --profile developer   # Install profile from profiles/developer.toml
 
 ENVIRONMENT:
     ARCHER_DIR              # Override the Archer installation directory
@@ -177,6 +183,13 @@ main() {
             cd "$ARCHER_DIR"
             exec python3 -m archer.tui --debug
             ;;
+        run)
+            # Unattended: no Textual, no terminal prompts
+            check_python
+            shift
+            cd "$ARCHER_DIR"
+            exec python3 -m archer.run "$@"
+            ;;
         --classic)
             # Use classic GUM-based interface
             cd "$ARCHER_DIR"
@@ -2,4 +2,4 @@
 
 This lightweight package exposes the textual TUI module and any helpers.
 """
-__all__ = ["tui", "lib"]
+__all__ = ["tui", "lib", "pacman_progress", "runner", "sudo_broker", "prompt_channel", "profiling", "bench", "history", "eta", "batch_progress", "trace", "run", "profiles", "pacman_db", "line_classifier", "output_spool", "isolation", "pressure", "skip_cache"]
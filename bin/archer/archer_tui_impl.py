@@ -5,10 +5,9 @@ This module contains the actual Textual application class used by the package
 entrypoint `archer.tui`.
 """
 from textual.app import App, ComposeResult
-from textual.containers import Container, Horizontal, Vertical, ScrollableContainer
+from textual.containers import Container, Horizontal, Vertical
 from textual.widgets import (
-    Header, Footer, Tree, DataTable, RadioSet, RadioButton,
-    Checkbox, ProgressBar, Static, RichLog, Button, Select, Input
+    Header, Tree, DataTable, ProgressBar, Static, RichLog, Button
 )
 from textual.widget import Widget
 from textual.reactive import reactive
@@ -16,19 +15,24 @@ from textual.message import Message
 from textual import events
 import asyncio
 import os
-import sys
-import subprocess
+import re
 import time
-import shutil
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
-# Import the package-local lib
+# Import the package-local lib. Modules only needed once a job runs
+# (runner, history, skip_cache, eta, batch_progress, pacman_progress) are
+# imported where they are used so they stay off the startup path.
 from .lib import ArcherMenu, ArcherUI
+from .trace import EventTrace
+from .sudo_broker import SudoBroker
+from .prompt_channel import PromptChannel
 
-# Minimum terminal dimensions
-MIN_COLUMNS = 100
-MIN_ROWS = 25
+# Generic "NN%" fallback for output the pacman parser does not recognise
+PERCENT_RE = re.compile(r"(\d{1,3})\s?%")
+# Seconds between history-based progress estimates for quiet scripts
+ETA_TICK = 0.5
 
 
 class DynamicPackageTable(Widget):
@@ -266,26 +270,25 @@ class ArcherMenuTree(Tree):
     def on_tree_node_selected(self, event: Tree.NodeSelected) -> None:
         """Handle menu selection"""
         node = event.node
-
-        # Debug: Always log when a node is selected
-        print(f"DEBUG: Tree node selected: {node.label}")
+        trace = getattr(self.app, 'trace', None) or EventTrace(enabled=False)
+        started = time.perf_counter()
 
         if hasattr(node, 'data') and node.data:
             menu_key = node.data["menu_key"]
-            print(f"DEBUG: Menu key: {menu_key}")
 
             # Get menu options using the existing ArcherMenu system with filtering
             try:
                 _, _, options = self.archer_menu.get_menu_options_filtered(menu_key)
-                print(f"DEBUG: Found {len(options)} options for {menu_key}")
+                trace.emit('tree.select', menu=menu_key, options=len(options),
+                           ms=(time.perf_counter() - started) * 1000)
                 self.post_message(self.MenuSelected(menu_key, options))
             except Exception as e:
-                print(f"DEBUG: Error getting options for {menu_key}: {e}")
+                trace.emit('tree.error', menu=menu_key, error=str(e))
                 # If menu doesn't exist or has no options, try to get any child menus
                 options = []
                 self.post_message(self.MenuSelected(menu_key, options))
         else:
-            print(f"DEBUG: Node has no data: {node}")
+            trace.emit('tree.select', label=str(node.label), menu=None)
 
 
 class ProgressPanel(Container):
@@ -329,7 +332,20 @@ class ProgressPanel(Container):
                 pct = 0
             if pct > 100:
                 pct = 100
-            bar.update(pct)
+            bar.update(progress=pct)
+        except Exception:
+            pass
+
+    def set_task_label(self, text: str):
+        try:
+            self.query_one("#pkg_status_label", Static).update(text)
+        except Exception:
+            pass
+
+    def set_main_progress(self, pct: int):
+        try:
+            bar = self.query_one("#main_progress", ProgressBar)
+            bar.update(progress=min(max(pct, 0), 100))
         except Exception:
             pass
 
@@ -346,7 +362,37 @@ class ActionButtonsPanel(Container):
             yield Button(label="INSTALL ALL", id="install_all_btn")
 
 
-class SudoModal(Container):
+class ChoiceModal(Container):
+    """Base for modal-like widgets that resolve a single user choice.
+
+    The choice is delivered through an asyncio Future, so callers can
+    `await modal.wait_for_choice()` without polling.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.choice = None
+        self._choice_future: Optional[asyncio.Future] = None
+
+    def _future(self) -> asyncio.Future:
+        if self._choice_future is None:
+            self._choice_future = asyncio.get_running_loop().create_future()
+        return self._choice_future
+
+    def set_choice(self, choice: str):
+        """Record the user's choice and wake up whoever is waiting for it."""
+        if self.choice is not None:
+            return
+        self.choice = choice
+        fut = self._future()
+        if not fut.done():
+            fut.set_result(choice)
+
+    async def wait_for_choice(self) -> str:
+        return await self._future()
+
+
+class SudoModal(ChoiceModal):
     """A very small modal-like widget asking the user to allow sudo pre-flight."""
 
     def __init__(self, message: str = "This action requires elevated privileges. Request sudo now?"):
@@ -355,6 +401,8 @@ class SudoModal(Container):
         self.password = None
 
     def compose(self) -> ComposeResult:
+        # Input is only needed by the modals; keep it off the startup path
+        from textual.widgets import Input
         yield Static(self.message, id="sudo_msg")
         # Provide a password field so the modal can collect sudo password
         yield Input(password=True, placeholder="Enter sudo password", id="sudo_input")
@@ -362,32 +410,38 @@ class SudoModal(Container):
             yield Button(label="Continue", id="sudo_confirm")
             yield Button(label="Cancel", id="sudo_cancel")
 
-    def on_button_pressed(self, event: Button.Pressed):
-        """Set a simple attribute on the modal to indicate the user's choice."""
-        btn = event.control
+    def _confirm(self):
         # Read the input widget value when confirming
         try:
-            inp = self.query_one('#sudo_input', Input)
+            inp = self.query_one('#sudo_input')
             entered = getattr(inp, 'value', None) or None
         except Exception:
             entered = None
+        # Store password along with choice
+        self.password = entered
+        self.set_choice('confirm')
 
+    def on_button_pressed(self, event: Button.Pressed):
+        """Resolve the modal with the user's choice."""
+        btn = event.control
         if btn.id == 'sudo_confirm':
-            # Store password along with choice
-            self.password = entered
-            self.choice = 'confirm'
+            self._confirm()
         elif btn.id == 'sudo_cancel':
-            self.choice = 'cancel'
+            self.set_choice('cancel')
+
+    def on_input_submitted(self, event):
+        """Pressing Enter in the password field confirms."""
+        event.stop()
+        self._confirm()
 
 
-class FailureModal(Container):
+class FailureModal(ChoiceModal):
     """Modal to present fatal or non-fatal error messages from installers."""
 
     def __init__(self, message: str, fatal: bool = False):
         super().__init__()
         self.message = message
         self.fatal = fatal
-        self.choice = None
 
     def compose(self) -> ComposeResult:
         yield Static(self.message, id="failure_msg")
@@ -401,11 +455,64 @@ class FailureModal(Container):
     def on_button_pressed(self, event: Button.Pressed):
         btn = event.control
         if getattr(btn, 'id', '') == 'fail_abort':
-            self.choice = 'abort'
+            self.set_choice('abort')
         elif getattr(btn, 'id', '') == 'fail_continue':
-            self.choice = 'continue'
+            self.set_choice('continue')
         else:
-            self.choice = 'close'
+            self.set_choice('close')
+
+
+class ConfirmModal(ChoiceModal):
+    """Yes/No question asked by an installer script through the prompt channel."""
+
+    def __init__(self, message: str):
+        super().__init__()
+        self.message = message
+
+    def compose(self) -> ComposeResult:
+        yield Static(self.message, id="confirm_msg")
+        with Horizontal():
+            yield Button(label="Yes", id="confirm_yes")
+            yield Button(label="No", id="confirm_no")
+
+    def on_button_pressed(self, event: Button.Pressed):
+        event.stop()
+        self.set_choice('yes' if event.control.id == 'confirm_yes' else 'no')
+
+
+class SecretModal(ChoiceModal):
+    """Masked input requested by an installer script through the prompt channel."""
+
+    def __init__(self, prompt: str):
+        super().__init__()
+        self.prompt = prompt
+        self.value = None
+
+    def compose(self) -> ComposeResult:
+        from textual.widgets import Input
+        yield Static(self.prompt, id="secret_msg")
+        yield Input(password=True, placeholder="Password", id="secret_input")
+        with Horizontal():
+            yield Button(label="OK", id="secret_ok")
+            yield Button(label="Cancel", id="secret_cancel")
+
+    def _submit(self):
+        try:
+            self.value = self.query_one('#secret_input').value or ""
+        except Exception:
+            self.value = ""
+        self.set_choice('ok')
+
+    def on_button_pressed(self, event: Button.Pressed):
+        event.stop()
+        if event.control.id == 'secret_ok':
+            self._submit()
+        else:
+            self.set_choice('cancel')
+
+    def on_input_submitted(self, event):
+        event.stop()
+        self._submit()
 
 
 class ArcherTUIApp(App):
@@ -417,19 +524,61 @@ class ArcherTUIApp(App):
     current_options = reactive([])
     installation_mode = reactive("install_all")
 
-    def __init__(self):
+    def __init__(
+        self,
+        use_pty: Optional[bool] = None,
+        archer_menu: Union[ArcherMenu, "Future[ArcherMenu]", None] = None,
+        started_at: Optional[float] = None,
+        profiler=None,
+        trace: Optional[EventTrace] = None,
+        isolate: Optional[str] = None,
+    ):
         super().__init__()
+        # archer.profiling.SessionProfiler when started with --profile
+        self.profiler = profiler
+        # Structured UI/job event trace (--trace or ARCHER_TRACE); a no-op when off
+        self.trace = trace if trace is not None else EventTrace.from_env()
+        # Ids of jobs in the trace
+        self._job_seq = 0
+        # perf_counter() value startup is measured from; see first_frame_ms
+        self._started_at = time.perf_counter() if started_at is None else started_at
+        self.first_frame_ms: Optional[float] = None
+        # Run installers under a pseudo-terminal so they stream progress
+        # instead of block-buffering into a pipe (--pty or ARCHER_PTY=1)
+        if use_pty is None:
+            use_pty = os.environ.get('ARCHER_PTY', '0') == '1'
+        self.use_pty = use_pty
+        # Isolation mode for jobs (--isolate or ARCHER_ISOLATE), resolved to
+        # archer.isolation.JobLimits before the first job runs
+        self._isolate = isolate
+        self._job_limits_resolved = False
+        self.job_limits = None
         # Default to project root (two levels up from bin/archer)
         default_archer_dir = str(Path(__file__).resolve().parents[2])
         self.archer_dir = os.environ.get('ARCHER_DIR', default_archer_dir)
 
-        # Initialize the existing ArcherMenu system
+        # Initialize the existing ArcherMenu system. The entry point may hand
+        # us a Future from background discovery; it is resolved on mount.
         self.archer_ui = ArcherUI(verbose=False)
-        self.archer_menu = ArcherMenu(self.archer_ui)
+        self._archer_menu_future: Optional[Future] = None
+        if isinstance(archer_menu, Future):
+            self._archer_menu_future = archer_menu
+            self.archer_menu = None
+        else:
+            self.archer_menu = archer_menu or ArcherMenu(self.archer_ui)
         # modal state
         self._sudo_modal_active = False
-        # per-session sudo validation cache (True when we validated credentials)
-        self._sudo_validated = False
+        # Owns validated sudo credentials for this session: keeps the
+        # timestamp fresh and answers child askpass requests
+        self.sudo_broker = SudoBroker()
+        # Lets child scripts show confirm/secret prompts in this app
+        self.prompt_channel = PromptChannel(self._handle_prompt_request)
+        # Resource usage of every job, kept across sessions, and the skip
+        # cache; both are opened when the first job needs them
+        self._run_history = None
+        self._skip_cache = None
+        # Redraws the main bar while a batch of jobs runs
+        self._job_batch_timer = None
 
     def compose(self) -> ComposeResult:
         """Create the application layout"""
@@ -458,6 +607,13 @@ class ArcherTUIApp(App):
 
     async def on_mount(self) -> None:
         """Populate the main menu list on mount using discovered menus (top-level items)."""
+        mount_started = time.perf_counter()
+        await self.trace.start()
+        if self._archer_menu_future is not None:
+            self.archer_menu = self._archer_menu_future.result()
+            self._archer_menu_future = None
+        self.call_after_refresh(self._record_first_frame)
+
         # Build ordered list of top-level menu keys (preserve discovery order)
         menu_list = self.query_one("#menu_list", DataTable)
         menu_list.clear(columns=True)
@@ -492,6 +648,39 @@ class ArcherTUIApp(App):
         subtopics_table.clear(columns=True)
         subtopics_table.add_columns("Sub-Topic")
 
+        try:
+            await self.prompt_channel.start()
+        except Exception as e:
+            output = self.query_one("#output_panel", InstallationOutputPanel)
+            output.add_output(f"[yellow]Installer prompts unavailable: {e}[/yellow]")
+
+        self.trace.emit('ui.mount', ms=(time.perf_counter() - mount_started) * 1000, menus=len(order))
+        if self.profiler is not None:
+            self.profiler.record('mount', time.perf_counter() - mount_started)
+            self.profiler.start()
+
+    def _record_first_frame(self) -> None:
+        """Measure time from process start to the first rendered frame."""
+        if self.first_frame_ms is not None:
+            return
+        self.first_frame_ms = (time.perf_counter() - self._started_at) * 1000
+        self.trace.emit('ui.first_frame', ms=self.first_frame_ms)
+        if self.profiler is not None:
+            self.profiler.record('first_paint', self.first_frame_ms / 1000)
+        try:
+            output = self.query_one("#output_panel", InstallationOutputPanel)
+            output.add_output(f"[dim]Ready in {self.first_frame_ms:.0f} ms[/dim]")
+        except Exception:
+            pass
+
+    async def on_unmount(self) -> None:
+        """Tear down the sudo broker so no refresher or socket outlives the app."""
+        await self.sudo_broker.close()
+        await self.prompt_channel.close()
+        if self.profiler is not None:
+            await self.profiler.stop()
+        await self.trace.close()
+
     def on_data_table_cell_selected(self, event: DataTable.CellSelected):
         """Handle cell selection for both menu_list and subtopics_panel."""
         control_id = event.control.id
@@ -507,8 +696,7 @@ class ArcherTUIApp(App):
             if event.coordinate.column != 0:
                 return
             row_identifier = getattr(event.coordinate, "row_key", None) or event.coordinate.row
-            output = self.query_one("#output_panel", InstallationOutputPanel)
-            output.add_output(f"[dim]DEBUG: CellSelected row={row_identifier}[/dim]")
+            self.trace.emit('table.cell_selected', table=control_id, row=str(row_identifier))
             self._activate_subtopic_row(row_identifier)
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected):
@@ -531,13 +719,13 @@ class ArcherTUIApp(App):
                 row_identifier = getattr(event, "cursor_row", None)
             if row_identifier is None:
                 row_identifier = getattr(event, "row_index", None)
-            output = self.query_one("#output_panel", InstallationOutputPanel)
-            output.add_output(f"[dim]DEBUG: RowSelected row={row_identifier}[/dim]")
+            self.trace.emit('table.row_selected', table=control_id, row=str(row_identifier))
             if row_identifier is not None:
                 self._activate_subtopic_row(row_identifier)
 
     def _handle_menu_selection_by_row(self, row_identifier):
         """Given a menu_list row identifier, populate the subtopics panel with its sub-menus."""
+        started = time.perf_counter()
         output = self.query_one("#output_panel", InstallationOutputPanel)
         menu_list = self.query_one("#menu_list", DataTable)
         subtopics_table = self.query_one("#subtopics_panel", DataTable)
@@ -606,9 +794,12 @@ class ArcherTUIApp(App):
             output.add_output(f"[green]Sub-topics presented: {', '.join(submenus.keys())}[/green]")
         else:
             output.add_output(f"[dim]No sub-topics available for {menu_key}[/dim]")
+        self.trace.emit('menu.select', menu=menu_key, subtopics=len(submenus),
+                        ms=(time.perf_counter() - started) * 1000)
 
     # Subtopic selection: unified logic using row mapping
     def _activate_subtopic_row(self, row_identifier):
+        started = time.perf_counter()
         output = self.query_one("#output_panel", InstallationOutputPanel)
         if not hasattr(self, '_subtopic_row_map'):
             output.add_output("[red]DEBUG: No subtopic row map present[/red]")
@@ -632,7 +823,6 @@ class ArcherTUIApp(App):
             return
 
         menu_key, display_name = self._subtopic_row_map[row_key]
-        output.add_output(f"[dim]DEBUG: Activating row {row_identifier} -> {menu_key}")
         package_panel = self.query_one("#package_panel", DynamicPackageTable)
         subtopics_table = self.query_one("#subtopics_panel", DataTable)
         try:
@@ -662,10 +852,13 @@ class ArcherTUIApp(App):
             subtopics_table.visible = True
             output.add_output(f"[blue]Selected sub-topic:[/blue] {display_name}")
             output.add_output(f"[green]Toolsets presented: {len(options)} options[/green]")
+            self.trace.emit('subtopic.activate', menu=menu_key, options=len(options),
+                            ms=(time.perf_counter() - started) * 1000)
         except Exception as e:
             package_panel.packages = []
             package_panel.visible = False
             output.add_output(f"[red]Error loading toolsets for '{menu_key}': {e}[/red]")
+            self.trace.emit('subtopic.error', menu=menu_key, error=str(e))
 
 
     def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted):
@@ -839,19 +1032,105 @@ class ArcherTUIApp(App):
     }
     """
 
-    async def _run_install_command(self, description: str, command: str, script_path: str = ""):
-        """Run a shell command asynchronously and stream output to the installation panel."""
+    @property
+    def run_history(self):
+        if self._run_history is None:
+            from .history import RunHistory
+            self._run_history = RunHistory()
+        return self._run_history
+
+    @property
+    def skip_cache(self):
+        if self._skip_cache is None:
+            from .skip_cache import SkipCache
+            self._skip_cache = SkipCache()
+        return self._skip_cache
+
+    async def _start_job_batch(self, items: List[Tuple[str, str]]):
+        """Create the BatchProgress model for `(description, script)` jobs.
+
+        Jobs are weighted by their predicted duration; the main bar is
+        redrawn from the model at a capped frame rate until `_finish_job_batch`.
+        """
+        from .batch_progress import BatchProgress
+        from .eta import predict_duration
+
+        def predict_all():
+            predictions = []
+            for description, script in items:
+                try:
+                    predictions.append(predict_duration(self.run_history, script or description))
+                except Exception:
+                    predictions.append(None)
+            return predictions
+
+        batch = BatchProgress()
+        for (description, _script), prediction in zip(items, await asyncio.to_thread(predict_all)):
+            batch.add(description, prediction)
+
+        progress_panel = self.query_one("#progress_panel", ProgressPanel)
+        progress_panel.set_main_progress(0)
+        progress_panel.show_panel()
+
+        def render():
+            value = batch.frame()
+            if value is not None:
+                progress_panel.set_main_progress(int(value * 100))
+
+        if self._job_batch_timer is not None:
+            self._job_batch_timer.stop()
+        self._job_batch_timer = self.set_interval(batch.min_interval, render)
+        self.trace.emit('batch.start', jobs=len(batch.jobs),
+                        predicted_s=round(batch.remaining_seconds(), 1))
+        return batch
+
+    def _finish_job_batch(self, batch):
+        progress_panel = self.query_one("#progress_panel", ProgressPanel)
+        if self._job_batch_timer is not None:
+            self._job_batch_timer.stop()
+            self._job_batch_timer = None
+        progress_panel.set_main_progress(int(batch.fraction() * 100))
+        progress_panel.set_task_label("Current task:")
+        progress_panel.hide_panel()
+        self.trace.emit('batch.end', jobs=len(batch.jobs), finished=batch.finished)
+
+    async def _run_install_command(self, description: str, command: str, script_path: str = "",
+                                   batch=None, batch_job: int = 0):
+        """Run a shell command asynchronously and stream output to the installation panel.
+
+        When `batch` is given the job reports into that batch's global
+        progress; otherwise it forms a batch of its own.
+        """
+        from .eta import EtaClock, format_duration
+        from .pacman_progress import PacmanProgressParser
+        from .runner import start_job
+
         output = self.query_one("#output_panel", InstallationOutputPanel)
         progress_panel = self.query_one("#progress_panel", ProgressPanel)
 
+        own_batch = batch is None
+        if own_batch:
+            batch = await self._start_job_batch([(description, script_path)])
+            batch_job = 0
+
+        self._job_seq += 1
+        job_id = self._job_seq
+        self.trace.emit('job.start', job=job_id, description=description, script=script_path,
+                        batch_job=batch_job)
+        rc = None
+        job = None
         output.add_output(f"[blue]Starting: {description}[/blue]")
-        progress_panel.show_panel()
+        if len(batch.jobs) > 1:
+            progress_panel.set_task_label(f"Current task ({batch_job + 1}/{len(batch.jobs)}):")
         # Reset per-package progress/status
         try:
             progress_panel.set_pkg_progress(0)
             progress_panel.set_pkg_status("")
         except Exception:
             pass
+        # Tracks pacman/yay transactions in this job's output
+        pacman_parser = PacmanProgressParser()
+        eta_timer = None
 
         try:
             # Create subprocess
@@ -863,19 +1142,20 @@ class ArcherTUIApp(App):
                 # If we haven't validated sudo for this TUI session yet, prompt via the
                 # in-TUI modal so no terminal prompt appears. If validation fails, skip.
                 try:
-                    if not getattr(self, '_sudo_validated', False):
+                    if not self.sudo_broker.validated:
+                        asked = time.perf_counter()
                         ok = await self._show_sudo_modal_and_request()
+                        self.trace.emit('job.sudo_wait', job=job_id, ok=ok,
+                                        ms=(time.perf_counter() - asked) * 1000)
                         if not ok:
                             out = self.query_one("#output_panel", InstallationOutputPanel)
                             out.add_output("[yellow]Skipping install because sudo credentials could not be obtained or were cancelled.[/yellow]")
-                            progress_panel.hide_panel()
                             return
                 except Exception:
                     # Fallback: if modal fails for any reason, skip the install to avoid
                     # falling back to a terminal prompt.
                     out = self.query_one("#output_panel", InstallationOutputPanel)
                     out.add_output("[red]Internal error requesting sudo credentials; skipping install.[/red]")
-                    progress_panel.hide_panel()
                     return
 
             # Run child scripts with stdin redirected to DEVNULL so they cannot
@@ -884,62 +1164,58 @@ class ArcherTUIApp(App):
             # non-interactive defaults so installers will avoid prompting.
             env = os.environ.copy()
             env.setdefault('ARCHER_TUI', '1')
-            # Force AUTO_CONFIRM to 1 for child processes so they don't attempt
-            # interactive confirmations in the TUI session.
-            env.setdefault('AUTO_CONFIRM', '1')
-
-            # If we have a validated sudo password cached, create a temporary
-            # askpass helper and set SUDO_ASKPASS so child sudo calls can use it.
-            askpass_path = None
-            try:
-                if needs_sudo and getattr(self, '_sudo_validated', False) and getattr(self, '_sudo_password', None):
-                    import tempfile
-                    # Create a small, executable helper that prints the password
-                    tf = tempfile.NamedTemporaryFile(delete=False, prefix='archer_askpass_', mode='w')
-                    askpass_path = tf.name
-                    # write a POSIX shell script that echoes the password
-                    pw = getattr(self, '_sudo_password')
-                    tf.write('#!/bin/sh\n')
-                    # Use printf to avoid issues with echo flags
-                    safe_pw = pw.replace("'", "'\\''")
-                    tf.write("printf '%s' '" + safe_pw + "'\n")
-                    tf.close()
-                    try:
-                        os.chmod(askpass_path, 0o700)
-                    except Exception:
-                        pass
-                    # Ensure environment has SUDO_ASKPASS
-                    env['SUDO_ASKPASS'] = askpass_path
-                    # Also prefix the shell command to export the variable for shells
-                    # that inherit env only from the command string; we'll also ensure
-                    # to request askpass by adding -A to sudo occurrences.
-                    prefix = f"SUDO_ASKPASS='{askpass_path}' ";
-                    try:
-                        command = prefix + command.replace('sudo ', 'sudo -A ')
-                    except Exception:
-                        command = prefix + command
-            except Exception:
-                askpass_path = None
-
-            proc = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.STDOUT,
-                stdin=asyncio.subprocess.DEVNULL,
-                env=env,
-            )
-
-            # Stream stdout lines to the output panel
-            assert proc.stdout is not None
-            while True:
-                line = await proc.stdout.readline()
-                if not line:
-                    break
-                try:
-                    text = line.decode('utf-8', errors='replace').rstrip()
-                except Exception:
-                    text = str(line)
+            # Child prompts are answered by this app through the prompt
+            # channel. Without it, default AUTO_CONFIRM to 1 so children never
+            # attempt interactive confirmations they cannot complete.
+            prompt_env = self.prompt_channel.child_env()
+            if prompt_env:
+                env.update(prompt_env)
+            else:
+                env.setdefault('AUTO_CONFIRM', '1')
 
+            # Let child sudo calls fetch the password from the broker
+            if needs_sudo:
+                env.update(self.sudo_broker.child_env())
+
+            # Scripts that print no progress get bars estimated from how long
+            # they took before; real progress output always takes precedence
+            prediction = batch.prediction(batch_job)
+            reported = {'main': False, 'pkg': False, 'status': False}
+            if prediction is not None:
+                eta_clock = EtaClock(prediction)
+
+                def show_estimate():
+                    fraction = eta_clock.fraction()
+                    if not reported['main']:
+                        batch.update(batch_job, fraction)
+                    if not reported['pkg']:
+                        progress_panel.set_pkg_progress(int(fraction * 100))
+                    if not reported['status']:
+                        remaining = eta_clock.remaining()
+                        if remaining > 0:
+                            progress_panel.set_pkg_status(
+                                f"About {format_duration(remaining)} left (from {prediction.runs} previous runs)")
+                        else:
+                            progress_panel.set_pkg_status(
+                                f"Taking longer than usual ({format_duration(eta_clock.elapsed())})")
+
+                show_estimate()
+                eta_timer = self.set_interval(ETA_TICK, show_estimate)
+
+            limits = await self._resolve_job_limits()
+            job = await start_job(command, env=env, use_pty=self.use_pty, limits=limits)
+            self.trace.emit('job.spawn', job=job_id, pid=job.pid, pty=self.use_pty,
+                            isolation=limits.mode if limits else None)
+            first_output = True
+            phase = pacman_parser.phase
+
+            # Stream output lines to the output panel. Transient segments are
+            # carriage-return progress redraws: they drive the progress bars
+            # but are not written to the log.
+            async for text, transient in job.lines():
+                if first_output:
+                    first_output = False
+                    self.trace.emit('job.first_output', job=job_id)
                 # Token parsing: ARCHER_PROGRESS: <pct>, ARCHER_STEP: i/n, ARCHER_STATUS: <text>
                 stripped = text.strip()
                 handled = False
@@ -947,6 +1223,8 @@ class ArcherTUIApp(App):
                     try:
                         pct = int(stripped.split(':',1)[1].strip())
                         progress_panel.set_pkg_progress(pct)
+                        batch.update(batch_job, pct / 100)
+                        reported.update(main=True, pkg=True)
                         handled = True
                     except Exception:
                         pass
@@ -957,6 +1235,8 @@ class ArcherTUIApp(App):
                         i = int(parts[0]); n = int(parts[1])
                         pct = int((i / max(1, n)) * 100)
                         progress_panel.set_pkg_progress(pct)
+                        batch.update(batch_job, pct / 100)
+                        reported.update(main=True, pkg=True)
                         handled = True
                     except Exception:
                         pass
@@ -964,30 +1244,52 @@ class ArcherTUIApp(App):
                     try:
                         status = stripped.split(':',1)[1].strip()
                         progress_panel.set_pkg_status(status)
-                        handled = True
+                        reported['status'] = handled = True
                     except Exception:
                         pass
 
+                # Package manager output drives the package bar. A script may
+                # run several transactions, so the job's share of the main bar
+                # follows the ETA estimate and ARCHER_* tokens when there are
+                # any; otherwise the transaction is the best measure there is
+                if not handled:
+                    update = pacman_parser.feed(stripped)
+                    if pacman_parser.phase != phase:
+                        phase = pacman_parser.phase
+                        self.trace.emit('job.phase', job=job_id, phase=phase)
+                    if update is not None:
+                        progress_panel.set_pkg_progress(update.current)
+                        progress_panel.set_pkg_status(update.status)
+                        reported.update(pkg=True, status=True)
+                        if prediction is None and not reported['main']:
+                            batch.update(batch_job, update.overall / 100)
+                        handled = True
+
                 # Heuristic percent parsing if no token
                 if not handled:
-                    import re
-                    m = re.search(r"(\d{1,3})\s?%", stripped)
+                    m = PERCENT_RE.search(stripped)
                     if m:
                         try:
                             pct = int(m.group(1))
                             if 0 <= pct <= 100:
                                 progress_panel.set_pkg_progress(pct)
-                                handled = True
+                                reported['pkg'] = handled = True
                         except Exception:
                             pass
 
+                if transient:
+                    continue
+
                 # Detect error tokens and fatal markers
                 if stripped.startswith('ARCHER_ERROR:'):
                     # Extract message and show non-fatal modal
                     err_msg = stripped.split(':',1)[1].strip()
                     try:
                         # Show non-fatal failure modal (user can close)
+                        asked = time.perf_counter()
                         await self._show_failure_modal_and_handle(err_msg, fatal=False)
+                        self.trace.emit('job.prompt', job=job_id, kind='error',
+                                        ms=(time.perf_counter() - asked) * 1000)
                     except Exception:
                         pass
 
@@ -995,15 +1297,17 @@ class ArcherTUIApp(App):
                     # Fatal condition: show modal offering Abort/Continue
                     err_msg = stripped.split(':',1)[1].strip() if ':' in stripped else 'Fatal error'
                     try:
+                        asked = time.perf_counter()
                         choice = await self._show_failure_modal_and_handle(err_msg, fatal=True)
+                        self.trace.emit('job.prompt', job=job_id, kind='fatal', choice=choice,
+                                        ms=(time.perf_counter() - asked) * 1000)
                         if choice == 'abort':
                             output.add_output('[red]Installation aborted by user after fatal error.[/red]')
-                            # Terminate the child process and stop streaming
-                            try:
-                                proc.kill()
-                            except Exception:
-                                pass
-                            progress_panel.hide_panel()
+                            # Stop the job's whole process tree and stop streaming
+                            rc = await job.terminate()
+                            self.trace.emit('job.terminated', job=job_id, rc=rc)
+                            await self._record_run(description, command, script_path, rc, job, pacman_parser)
+                            await self._warn_stale_lock()
                             return
                         # otherwise continue streaming
                     except Exception:
@@ -1012,7 +1316,8 @@ class ArcherTUIApp(App):
                 # Always write the output to the log panel
                 output.add_output(text)
 
-            rc = await proc.wait()
+            rc = await job.wait()
+            await self._record_run(description, command, script_path, rc, job, pacman_parser)
             if rc == 0:
                 output.add_output(f"[green]Completed: {description}[/green]")
             else:
@@ -1025,24 +1330,76 @@ class ArcherTUIApp(App):
 
         except Exception as e:
             output.add_output(f"[red]Exception running {description}: {e}[/red]")
+            self.trace.emit('job.error', job=job_id, error=str(e))
         finally:
-            progress_panel.hide_panel()
-            # Clean up temporary askpass helper if we created one
+            if job is not None and job.returncode is None:
+                # Cancelled (e.g. the app is quitting): do not leave the
+                # job's process group running
+                try:
+                    await job.terminate()
+                except Exception:
+                    job.kill()
+            if job is not None:
+                # Streaming may have stopped early; release the pty reader
+                job.close()
+            usage = job.usage if job is not None else None
+            self.trace.emit('job.end', job=job_id, rc=rc, usage=usage.as_dict() if usage else None)
+            if eta_timer is not None:
+                eta_timer.stop()
+            batch.finish(batch_job)
+            if own_batch:
+                self._finish_job_batch(batch)
+
+    async def _resolve_job_limits(self):
+        """JobLimits for this session's jobs, or None; probed once."""
+        if not self._job_limits_resolved:
+            self._job_limits_resolved = True
+            output = self.query_one("#output_panel", InstallationOutputPanel)
+            from .isolation import limits_for
             try:
-                if askpass_path and os.path.exists(askpass_path):
-                    try:
-                        os.remove(askpass_path)
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-            # Clear cached sudo password
+                # Probing for a systemd user manager runs a process
+                self.job_limits = await asyncio.to_thread(limits_for, self._isolate)
+            except ValueError as e:
+                output.add_output(f"[yellow]Job isolation disabled: {e}[/yellow]")
+            if self.job_limits is not None:
+                output.add_output(f"[dim]Jobs run with {self.job_limits.describe()}[/dim]")
+        return self.job_limits
+
+    async def _warn_stale_lock(self):
+        """Point out a pacman lock left behind by an aborted transaction."""
+        from .pacman_db import stale_lock
+        lock = await asyncio.to_thread(stale_lock)
+        if lock is not None:
+            self.query_one("#output_panel", InstallationOutputPanel).add_output(
+                f"[yellow]pacman's lock file was left behind; remove it with: sudo rm {lock}[/yellow]")
+
+    async def _record_run(self, description, command, script_path, rc, job, pacman_parser):
+        """Show a job's resource usage and append it to the run history."""
+        usage = job.usage
+        if usage is None:
+            return
+        usage.download_bytes = pacman_parser.download_bytes
+        output = self.query_one("#output_panel", InstallationOutputPanel)
+        summary = (
+            f"{usage.wall_s:.1f}s wall, {usage.cpu_s:.1f}s CPU, "
+            f"peak {usage.peak_rss_kib // 1024} MiB, "
+            f"{usage.read_bytes // (1024 * 1024)}/{usage.write_bytes // (1024 * 1024)} MiB read/written"
+        )
+        if usage.download_bytes:
+            summary += f", {usage.download_bytes / (1024 * 1024):.1f} MiB downloaded"
+        output.add_output(f"[dim]{summary}[/dim]")
+        try:
+            await asyncio.to_thread(self.run_history.record, description, command, script_path, rc, usage)
+        except Exception as e:
+            output.add_output(f"[yellow]Could not record run history: {e}[/yellow]")
+        # Scripts installed one by one count for Install All's skip check
+        # too; menu install.sh runs record their scripts themselves
+        if script_path and os.path.basename(script_path) != 'install.sh':
             try:
-                if getattr(self, '_sudo_password', None):
-                    try:
-                        self._sudo_password = None
-                    except Exception:
-                        pass
+                if rc == 0:
+                    await asyncio.to_thread(self.skip_cache.record, script_path)
+                else:
+                    await asyncio.to_thread(self.skip_cache.forget, script_path)
             except Exception:
                 pass
 
@@ -1052,13 +1409,7 @@ class ArcherTUIApp(App):
         modal = FailureModal(message, fatal=fatal)
         await self.mount(modal, after=self.query_one("#root_vertical"))
 
-        async def _wait_choice():
-            while True:
-                if getattr(modal, 'choice', None) is not None:
-                    return modal.choice
-                await asyncio.sleep(0.05)
-
-        choice = await _wait_choice()
+        choice = await modal.wait_for_choice()
         try:
             await modal.remove()
         except Exception:
@@ -1066,6 +1417,31 @@ class ArcherTUIApp(App):
         # Map modal choices to returned value
         return choice
 
+    async def _handle_prompt_request(self, kind: str, message: str) -> Optional[str]:
+        """Show a confirm/secret modal for a child script; None means declined."""
+        asked = time.perf_counter()
+        if kind == 'secret':
+            modal = SecretModal(message or "Password:")
+        else:
+            modal = ConfirmModal(message)
+        await self.mount(modal, after=self.query_one("#root_vertical"))
+        if kind == 'secret':
+            try:
+                modal.query_one('#secret_input').focus()
+            except Exception:
+                pass
+        choice = await modal.wait_for_choice()
+        try:
+            await modal.remove()
+        except Exception:
+            pass
+        # Jobs run one at a time, so the request belongs to the latest job
+        self.trace.emit('job.prompt', job=self._job_seq, kind=kind, choice=choice,
+                        ms=(time.perf_counter() - asked) * 1000)
+        if kind == 'secret':
+            return modal.value if choice == 'ok' else None
+        return '' if choice == 'yes' else None
+
     def _command_looks_like_needs_sudo(self, command: str) -> bool:
         """Heuristic: return True if the command or referenced scripts likely need sudo.
 
@@ -1097,34 +1473,15 @@ class ArcherTUIApp(App):
             # Ensure the password input receives focus so user typing goes into it
             try:
                 try:
-                    inp = modal.query_one('#sudo_input', Input)
+                    inp = modal.query_one('#sudo_input')
                     # focus the input so typed characters are captured (masked)
                     inp.focus()
                 except Exception:
                     pass
             except Exception:
                 pass
-            # Wait for a button press event by polling the modal's children
-            # We'll listen for button presses via events; set up a future.
-            fut = asyncio.get_event_loop().create_future()
-
-            async def _wait_for_choice():
-                # Busy-wait for modal button to set attribute
-                while True:
-                    try:
-                        btn = modal.query_one("#sudo_confirm")
-                    except Exception:
-                        btn = None
-                    try:
-                        cancel = modal.query_one("#sudo_cancel")
-                    except Exception:
-                        cancel = None
-                    # Check whether either was pressed by reading a custom attr
-                    if getattr(modal, 'choice', None) is not None:
-                        return modal.choice
-                    await asyncio.sleep(0.05)
-
-            choice = await _wait_for_choice()
+            # The modal resolves a future when a button is pressed
+            choice = await modal.wait_for_choice()
             # Remove modal
             await modal.remove()
             self._sudo_modal_active = False
@@ -1138,41 +1495,10 @@ class ArcherTUIApp(App):
                         output.add_output("[yellow]No sudo password entered.[/yellow]")
                         return False
 
-                    # Attempt to validate sudo credentials without leaking output
-                    # Use asyncio subprocess to avoid blocking the event loop
-                    proc = await asyncio.create_subprocess_exec(
-                        'sudo', '-S', '-v',
-                        stdin=asyncio.subprocess.PIPE,
-                        stdout=asyncio.subprocess.DEVNULL,
-                        stderr=asyncio.subprocess.DEVNULL,
-                    )
-                    try:
-                        # send password followed by newline
-                        await proc.communicate((pwd + '\n').encode('utf-8'))
-                    except Exception:
-                        # communicate may fail; ignore and continue to check returncode
-                        pass
-                    rc = await proc.wait()
-                    if rc == 0:
+                    # Validate with sudo -S -v; on success the broker keeps the
+                    # credentials for the rest of the session
+                    if await self.sudo_broker.validate(pwd):
                         output.add_output("[green]Sudo credentials obtained.[/green]")
-                        # Kick off a background refresher to keep the timestamp alive
-                        try:
-                            # spawn background refresher; it's fine to use subprocess.Popen here
-                            import subprocess as _sub
-                            _sub.Popen(['bash', '-c', "( while true; do sleep 60; sudo -n true 2>/dev/null || break; done ) &"], env=os.environ.copy())
-                        except Exception:
-                            pass
-                        # Mark session as validated so subsequent installs don't re-prompt
-                        try:
-                            self._sudo_validated = True
-                            # Cache the validated sudo password for askpass helper
-                            try:
-                                # store transiently on the app instance; cleared on exit
-                                self._sudo_password = pwd
-                            except Exception:
-                                pass
-                        except Exception:
-                            pass
                         return True
                     else:
                         output.add_output("[red]Invalid sudo password or cannot validate credentials.[/red]")
@@ -1186,6 +1512,17 @@ class ArcherTUIApp(App):
         finally:
             self._sudo_modal_active = False
 
+    async def _show_size_estimate(self, scripts: List[str]):
+        """Print what the selection will download and install, when known."""
+        from .pacman_db import estimate_scripts, summary_line
+        try:
+            result = await asyncio.to_thread(estimate_scripts, scripts)
+        except Exception as e:
+            self.trace.emit('estimate.error', error=str(e))
+            return
+        if result is not None:
+            self.query_one("#output_panel", InstallationOutputPanel).add_output(f"[dim]{summary_line(result)}[/dim]")
+
     async def _install_selected(self):
         """Install packages selected in the DynamicPackageTable sequentially."""
         package_panel = self.query_one("#package_panel", DynamicPackageTable)
@@ -1197,6 +1534,7 @@ class ArcherTUIApp(App):
             return
 
         # Each selected item is expected to be an option dict from ArcherMenu
+        jobs = []
         for opt in selected:
             display = opt.get('display', 'Unnamed')
             target = opt.get('target')
@@ -1217,7 +1555,18 @@ class ArcherTUIApp(App):
 
             # Build command to run the script in the archer directory
             cmd = f"cd '{self.archer_dir}' && bash '{target}'"
-            await self._run_install_command(display, cmd, target)
+            jobs.append((display, cmd, target))
+
+        if not jobs:
+            return
+        await self._show_size_estimate([target for _display, _cmd, target in jobs])
+        # One global bar across the whole selection, weighted by expected cost
+        batch = await self._start_job_batch([(display, target) for display, _cmd, target in jobs])
+        try:
+            for index, (display, cmd, target) in enumerate(jobs):
+                await self._run_install_command(display, cmd, target, batch=batch, batch_job=index)
+        finally:
+            self._finish_job_batch(batch)
 
     async def _install_all_for_current_menu(self):
         """Run the install.sh for the current menu (install_all semantics)."""
@@ -1243,7 +1592,10 @@ class ArcherTUIApp(App):
             output.add_output(f"[red]install.sh not found for {menu_key}: {install_sh}[/red]")
             return
 
-        cmd = f"cd '{self.archer_dir}' && bash '{install_sh}' --all"
+        # Scripts unchanged since their last successful run are skipped
+        # unless ARCHER_SKIP_UNCHANGED=0 (see archer.skip_cache)
+        from .skip_cache import SKIP_ENV
+        cmd = f"cd '{self.archer_dir}' && {SKIP_ENV}=\"${{{SKIP_ENV}:-1}}\" bash '{install_sh}' --all"
         await self._run_install_command(f"Install All: {menu_key}", cmd, install_sh)
 
     def on_button_pressed(self, event: Button.Pressed):
@@ -1309,65 +1661,10 @@ class ArcherTUIApp(App):
             return
 
 
-def check_terminal_dimensions():
-    """Check if terminal meets minimum dimension requirements"""
-    try:
-        terminal_size = shutil.get_terminal_size()
-        columns, rows = terminal_size.columns, terminal_size.lines
-
-        if columns < MIN_COLUMNS or rows < MIN_ROWS:
-            print(f"❌ Terminal too small: {columns}x{rows} (required {MIN_COLUMNS}x{MIN_ROWS})")
-            return False
-
-        print(f"✅ Terminal size OK: {columns}x{rows}")
-        return True
-    except Exception as e:
-        print(f"⚠️  Could not determine terminal size: {e}")
-        return True
-
-
 def main():
-    """Run the Archer TUI application with verbose startup logging"""
-    import argparse
-    import traceback
-
-    parser = argparse.ArgumentParser(description='Archer Linux Enhancement Suite - TUI')
-    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
-    parser.add_argument('--skip-size-check', action='store_true', help='Skip terminal size check')
-    args = parser.parse_args()
-
-    print("[archer-tui] Starting up...")
-    print(f"[archer-tui] Python: {sys.executable} {sys.version.splitlines()[0]}")
-    print(f"[archer-tui] CWD: {os.getcwd()}")
-    print(f"[archer-tui] ARGS: {sys.argv}")
-
-    # Check terminal dimensions unless skipped
-    if not args.skip_size_check:
-        ok = check_terminal_dimensions()
-        if not ok:
-            print("[archer-tui] Exiting due to terminal size")
-            sys.exit(1)
-
-    # Set up environment: default to project root (two levels up from bin/archer)
-    archer_dir = str(Path(__file__).resolve().parents[2])
-    os.environ['ARCHER_DIR'] = archer_dir
-    try:
-        os.chdir(archer_dir)
-    except Exception as e:
-        print(f"[archer-tui] Could not change directory to {archer_dir}: {e}")
-
-    try:
-        app = ArcherTUIApp()
-        print("[archer-tui] Running App...")
-        app.run()
-        print("[archer-tui] App exited normally")
-    except SystemExit as se:
-        print(f"[archer-tui] SystemExit: {se}")
-        raise
-    except Exception as e:
-        print("[archer-tui] Unhandled exception while running app:")
-        traceback.print_exc()
-        sys.exit(1)
+    """Run the Archer TUI application (delegates to the fast-start entry point)."""
+    from .tui import main as tui_main
+    return tui_main()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""SUDO_ASKPASS helper that asks the running Archer app for the password.
+
+sudo executes this program with the prompt as its only argument and reads
+the password from stdout. The password is fetched from the SudoBroker
+socket named by $ARCHER_ASKPASS_SOCKET; nothing is stored on disk.
+Exits non-zero when no broker is reachable so sudo fails instead of
+hanging.
+"""
+import os
+import socket
+import sys
+
+
+def main() -> int:
+    path = os.environ.get('ARCHER_ASKPASS_SOCKET')
+    if not path:
+        return 1
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(10)
+            sock.connect(path)
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+    except OSError:
+        return 1
+    if not data:
+        return 1
+    sys.stdout.write(data.decode('utf-8', errors='replace'))
+    sys.stdout.flush()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Global progress for a batch of installer jobs.
+
+A batch is every job started by one user action (the selected scripts,
+or a single Install All). Each job is weighted by its expected cost: the
+predicted duration from the run history (archer.eta) when there is one,
+otherwise the median of the known predictions, or DEFAULT_JOB_SECONDS
+when nothing in the batch has run before. The global fraction is the
+weighted mean of the job fractions, so several jobs may be in progress at
+once.
+
+Frames are rate limited: `frame()` returns a new value at most MAX_FPS
+times per second and only when something changed, so callers can poll it
+from a timer and feed the result straight to a progress bar.
+
+This module does not import Textual or Rich.
+"""
+import statistics
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Weight of a job nothing is known about, in seconds
+DEFAULT_JOB_SECONDS = 60.0
+# Upper bound on global progress redraws per second
+MAX_FPS = 10
+
+
+@dataclass
+class BatchJob:
+    description: str
+    prediction: Optional[object] = None  # archer.eta.Prediction
+    weight: float = 0.0
+    fraction: float = 0.0
+    done: bool = False
+
+
+class BatchProgress:
+    """Cost-weighted progress across the jobs of a batch."""
+
+    def __init__(self, max_fps: int = MAX_FPS):
+        self.jobs: List[BatchJob] = []
+        self.min_interval = 1.0 / max(1, max_fps)
+        self._dirty = True
+        self._last_frame = 0.0
+
+    def add(self, description: str, prediction=None) -> int:
+        """Add a job and return its index in the batch."""
+        self.jobs.append(BatchJob(description=description, prediction=prediction))
+        self._reweigh()
+        return len(self.jobs) - 1
+
+    def _reweigh(self):
+        known = [j.prediction.seconds for j in self.jobs if j.prediction is not None]
+        fallback = statistics.median(known) if known else DEFAULT_JOB_SECONDS
+        for job in self.jobs:
+            seconds = job.prediction.seconds if job.prediction is not None else fallback
+            job.weight = max(seconds, 1.0)
+        self._dirty = True
+
+    def prediction(self, index: int):
+        return self.jobs[index].prediction
+
+    def update(self, index: int, fraction: float):
+        """Report a job's own progress (0..1); it never moves backwards."""
+        job = self.jobs[index]
+        fraction = min(max(fraction, 0.0), 1.0)
+        if fraction > job.fraction:
+            job.fraction = fraction
+            self._dirty = True
+
+    def finish(self, index: int):
+        job = self.jobs[index]
+        job.fraction = 1.0
+        job.done = True
+        self._dirty = True
+
+    @property
+    def finished(self) -> int:
+        return sum(1 for j in self.jobs if j.done)
+
+    def fraction(self) -> float:
+        total = sum(j.weight for j in self.jobs)
+        if total <= 0:
+            return 0.0
+        return sum(j.weight * j.fraction for j in self.jobs) / total
+
+    def remaining_seconds(self) -> float:
+        """Expected seconds left, from the job weights."""
+        return sum(j.weight * (1.0 - j.fraction) for j in self.jobs)
+
+    def frame(self, now: Optional[float] = None) -> Optional[float]:
+        """Global fraction if a redraw is due, otherwise None."""
+        now = time.monotonic() if now is None else now
+        if not self._dirty or now - self._last_frame < self.min_interval:
+            return None
+        self._dirty = False
+        self._last_frame = now
+        return self.fraction()
+
+
+__all__ = ['BatchProgress', 'BatchJob', 'DEFAULT_JOB_SECONDS']
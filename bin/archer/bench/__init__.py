@@ -0,0 +1,97 @@
+"""Benchmarks for Archer's menu discovery, output handling and UI.
+
+Each benchmark module exposes `add_arguments(parser)` and `run(args)` and
+is registered in `BENCHMARKS`; run them with
+
+    python3 -m archer.bench <name> [options]
+
+Results are printed as a table and can be saved as JSON (`--json PATH`)
+so two runs can be compared.
+"""
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# name -> module path (relative to this package), imported on demand
+BENCHMARKS = {
+    'classify': '.classify',
+    'discovery': '.discovery',
+    'ingest': '.ingest',
+    'ui': '.ui',
+}
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def measure(fn: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """Time `fn` `repeat` times, then run it once more under tracemalloc.
+
+    Returns median/min seconds and the peak traced allocation in bytes.
+    Memory is measured in a separate pass because tracemalloc slows the
+    code under test.
+    """
+    samples: List[float] = []
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'peak_bytes': peak,
+    }
+
+
+def load_script_module(name: str, path: Path):
+    """Import a standalone script (e.g. `bin/archer-rich.py`) as a module."""
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def format_table(headers: List[str], rows: List[Tuple]) -> str:
+    widths = [len(h) for h in headers]
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(str(cell)))
+    lines = ['  '.join(str(h).ljust(w) if i == 0 else str(h).rjust(w) for i, (h, w) in enumerate(zip(headers, widths)))]
+    lines.append('  '.join('-' * w for w in widths))
+    for row in rows:
+        lines.append('  '.join(str(c).ljust(w) if i == 0 else str(c).rjust(w) for i, (c, w) in enumerate(zip(row, widths))))
+    return '\n'.join(lines)
+
+
+def fmt_ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f}"
+
+
+def fmt_kib(num_bytes: float) -> str:
+    return f"{num_bytes / 1024:.0f}"
+
+
+def write_json(path: Optional[str], name: str, results):
+    if not path:
+        return
+    target = Path(path).expanduser()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, 'w') as fh:
+        json.dump({'benchmark': name, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, fh, indent=2)
+    print(f"Results written to {target}")
+
+
+__all__ = ['BENCHMARKS', 'measure', 'load_script_module', 'format_table', 'write_json']
@@ -0,0 +1,24 @@
+"""Command line entry point: `python3 -m archer.bench <name> [options]`."""
+import argparse
+import importlib
+import sys
+
+from . import BENCHMARKS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m archer.bench', description='Archer benchmarks')
+    sub = parser.add_subparsers(dest='name', required=True)
+    modules = {}
+    for name, module_path in BENCHMARKS.items():
+        module = importlib.import_module(module_path, __package__)
+        modules[name] = module
+        p = sub.add_parser(name, help=(module.__doc__ or '').strip().splitlines()[0])
+        module.add_arguments(p)
+        p.add_argument('--json', metavar='PATH', help='Also write results as JSON')
+    args = parser.parse_args(argv)
+    return modules[args.name].run(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
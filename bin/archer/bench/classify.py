@@ -0,0 +1,279 @@
+"""Per-line cost of the archer-rich status classifiers.
+
+Classifies a synthetic installer log with the compiled rule tables in
+archer.line_classifier (a LineClassifier or KeywordChain, whichever
+`classifier()` picks) and with the if/elif keyword chains they replaced
+(kept below as the baseline), and reports ns/line for each of the three
+tables. Lines
+are drawn from a mix of kinds:
+
+- plain      compiler and log chatter matching no rule
+- build      compile lines naming a source file
+- download   downloads naming an archive
+- install    package installs naming a package
+- other      short pacman-style phase messages
+
+`agree` is the share of lines on which both implementations produce the
+same status; differences are the few deliberate fixes (e.g. '.config' is
+no longer taken for a C source file).
+"""
+import random
+import time
+from typing import Callable, Dict, List
+
+from . import format_table, write_json
+
+DEFAULT_LINES = 50000
+DEFAULT_MIX = 'plain=60,build=20,download=8,install=8,other=4'
+
+_TEMPLATES = {
+    'plain': ('[{i:5d}/9000] checking for header sys/param_{i}.h... yes',
+              'note: in expansion of macro HASH_{i} from include/util_{i}.h',
+              'test result: ok. {i} passed; 0 failed; 0 ignored'),
+    'build': ('gcc -O2 -c src/module_{i}.c -o build/module_{i}.o',
+              '[{i:3d}%] Building CXX object lib/CMakeFiles/core.dir/part_{i}.cpp.o',
+              'Compiling serde_derive v1.0.{i}'),
+    'download': ('Downloading https://mirror.example.org/pool/pkg-{i}.tar.zst',
+                 ' downloading pkg-{i}-1-x86_64.pkg.tar.zst...'),
+    'install': ('installing libfoo{i}...', 'Setting up python3-mod{i} (1.{i}) ...'),
+    'other': ('resolving dependencies...', 'checking keys in keyring', ':: Synchronizing package databases...',
+              'Configuring installation for target {i}'),
+}
+
+
+def generate_lines(count: int, mix: str, seed: int = 0) -> List[str]:
+    pairs = [kv.split('=') for kv in mix.split(',')]
+    kinds = [k for k, _ in pairs]
+    weights = [float(w) for _, w in pairs]
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        templates = _TEMPLATES[rng.choices(kinds, weights)[0]]
+        lines.append(templates[i % len(templates)].format(i=i))
+    return lines
+
+
+# -- baseline: the chains archer-rich.py used before line_classifier --------
+
+
+def legacy_nala(line: str) -> str:
+    line_lower = line.lower()
+    current_operation = ''
+    if any(keyword in line_lower for keyword in ['downloading', 'download']):
+
+        # Extract specific package/file being downloaded
+        if any(pkg in line_lower for pkg in ['http', 'ftp', '.tar', '.zip', '.gz', '.xz']):
+            # Extract filename from URL or path
+            words = line.split()
+            for word in words:
+                if any(ext in word.lower() for ext in ['.tar', '.zip', '.gz', '.xz', '.deb', '.rpm']):
+                    filename = word.split('/')[-1][:40]
+                    current_operation = f"Downloading {filename}..."
+                    break
+            else:
+                current_operation = "Downloading packages..."
+        else:
+            current_operation = "Downloading packages..."
+
+    elif any(keyword in line_lower for keyword in ['installing', 'install']):
+
+        # Extract specific package name being installed
+        import re
+        package_patterns = [
+            r'installing\s+(\w+[-\w]*)',
+            r'install:\s+(\w+[-\w]*)',
+            r'package\s+(\w+[-\w]*)',
+            r'setting up\s+(\w+[-\w]*)',
+            r'unpacking\s+(\w+[-\w]*)'
+        ]
+        for pattern in package_patterns:
+            match = re.search(pattern, line_lower)
+            if match:
+                package_name = match.group(1)[:20]
+                current_operation = f"Installing {package_name}..."
+                break
+        else:
+            current_operation = "Installing packages..."
+
+    elif any(keyword in line_lower for keyword in ['building', 'compiling', 'compile', 'make', 'gcc', 'clang']):
+
+        # Show specific file being compiled
+        if any(ext in line_lower for ext in ['.c', '.cpp', '.cc', '.cxx', '.h', '.hpp']):
+            words = line.split()
+            for word in words:
+                if any(ext in word.lower() for ext in ['.c', '.cpp', '.cc', '.cxx']):
+                    filename = word.split('/')[-1][:30]
+                    current_operation = f"Compiling {filename}..."
+                    break
+            else:
+                current_operation = "Building from source..."
+        elif 'makepkg' in line_lower:
+            current_operation = "Building package with makepkg..."
+        elif 'cargo' in line_lower and 'build' in line_lower:
+            current_operation = "Building Rust project..."
+        elif 'npm' in line_lower and any(cmd in line_lower for cmd in ['build', 'compile']):
+            current_operation = "Building Node.js project..."
+        else:
+            current_operation = "Building from source..."
+
+    elif any(keyword in line_lower for keyword in ['configuring', 'configure']):
+        current_operation = "Configuring installation..."
+
+    elif any(keyword in line_lower for keyword in ['extracting', 'extract']):
+        current_operation = "Extracting packages..."
+
+    elif any(keyword in line_lower for keyword in ['processing', 'process']):
+        current_operation = "Processing installation..."
+
+    elif any(keyword in line_lower for keyword in ['complete', 'finished', 'done', 'success']):
+        current_operation = "Completing installation..."
+
+    # More granular detection for specific operations
+    elif 'resolving dependencies' in line_lower:
+        current_operation = "Resolving dependencies..."
+    elif 'checking for conflicts' in line_lower:
+        current_operation = "Checking for conflicts..."
+    elif 'checking keys' in line_lower or 'validating' in line_lower:
+        current_operation = "Validating packages..."
+    elif 'loading packages' in line_lower:
+        current_operation = "Loading package files..."
+    elif 'checking integrity' in line_lower:
+        current_operation = "Checking package integrity..."
+    elif 'preparing' in line_lower:
+        current_operation = "Preparing installation..."
+    elif 'updating' in line_lower and 'database' in line_lower:
+        current_operation = "Updating package database..."
+    elif 'synchronizing' in line_lower:
+        current_operation = "Synchronizing package databases..."
+    elif 'retrieving' in line_lower:
+        current_operation = "Retrieving packages..."
+    return current_operation
+
+
+def legacy_script(line: str) -> str:
+    current_operation = ''
+    line_lower = line.lower()
+    if any(pattern in line_lower for pattern in ['installing', 'install ']):
+        if 'gfortran' in line_lower:
+            current_operation += "Installing GFortran compiler..."
+        elif 'lfortran' in line_lower:
+            current_operation = "Building LFortran (this may take 20-45 minutes)..."
+        elif any(pkg in line_lower for pkg in ['dlang', 'dmd', 'ldc']):
+            current_operation += "Installing D compiler..."
+        elif 'nim' in line_lower:
+            current_operation += "Installing Nim language..."
+        elif 'zig' in line_lower:
+            current_operation += "Installing Zig language..."
+        elif 'rust' in line_lower:
+            current_operation += "Installing Rust toolchain..."
+        elif 'go' in line_lower:
+            current_operation += "Installing Go language..."
+        elif 'postgresql' in line_lower:
+            current_operation += "Installing PostgreSQL database..."
+        elif 'mariadb' in line_lower or 'mysql' in line_lower:
+            current_operation += "Installing MariaDB database..."
+        elif 'redis' in line_lower:
+            current_operation += "Installing Redis cache..."
+        elif 'sqlite' in line_lower:
+            current_operation += "Installing SQLite database..."
+        elif 'mongodb' in line_lower:
+            current_operation += "Installing MongoDB database..."
+        elif 'dbeaver' in line_lower:
+            current_operation += "Installing DBeaver GUI client..."
+        elif 'dbmate' in line_lower:
+            current_operation += "Installing DBmate migration tool..."
+        else:
+            current_operation += "Installing packages..."
+    elif 'downloading' in line_lower:
+        current_operation += "Downloading packages..."
+    elif 'building' in line_lower or 'compiling' in line_lower:
+        # Special handling for LFortran build process
+        if 'lfortran' in line_lower or any(word in line_lower for word in ['bison', 'parser', 'grammar']):
+            current_operation += "Building LFortran (bison parser generation - please be patient)..."
+        else:
+            current_operation += "Building from source..."
+    elif 'configuring' in line_lower:
+        current_operation += "Configuring installation..."
+    elif 'complete' in line_lower or 'success' in line_lower:
+        current_operation += "Installation completing..."
+    elif 'mise install' in line_lower:
+        current_operation += "Installing via Mise..."
+    elif 'yay -s' in line_lower or 'pacman -s' in line_lower:
+        current_operation += "Installing from repositories..."
+    elif 'systemctl enable' in line_lower:
+        current_operation += "Enabling system services..."
+    elif 'service' in line_lower and 'start' in line_lower:
+        current_operation += "Starting services..."
+    return current_operation
+
+
+def legacy_simple(line: str) -> str:
+    current_operation = ''
+    line_lower = line.lower()
+    if 'downloading' in line_lower:
+        current_operation = "Downloading components..."
+    elif 'installing' in line_lower:
+        current_operation = "Installing packages..."
+    elif 'complete' in line_lower or 'success' in line_lower:
+        current_operation = "Completing installation..."
+    elif 'cargo install' in line_lower:
+        current_operation = "Installing Rust package..."
+    elif 'npm install' in line_lower:
+        current_operation = "Installing Node.js package..."
+    elif 'pip install' in line_lower:
+        current_operation = "Installing Python package..."
+    elif 'go install' in line_lower:
+        current_operation = "Installing Go package..."
+    return current_operation
+
+
+def _time_per_line(fn: Callable[[str], object], lines: List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - t0)
+    return best / max(1, len(lines))
+
+
+def _status(classify: Callable) -> Callable[[str], str]:
+    def status(line: str) -> str:
+        match = classify(line)
+        return '' if match is None else match.status
+    return status
+
+
+def add_arguments(parser):
+    parser.add_argument('--lines', type=int, default=DEFAULT_LINES, help=f'Lines to classify (default {DEFAULT_LINES})')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Line kinds and weights (default {DEFAULT_MIX})')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes, best kept (default 5)')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def run(args) -> int:
+    from ..line_classifier import classifier
+
+    unknown = {kv.split('=')[0] for kv in args.mix.split(',')} - set(_TEMPLATES)
+    if unknown:
+        print(f"Unknown line kinds in --mix: {', '.join(sorted(unknown))}")
+        return 2
+    lines = generate_lines(args.lines, args.mix, args.seed)
+    results: List[Dict] = []
+    rows = []
+    for table, legacy in (('nala', legacy_nala), ('script', legacy_script), ('simple', legacy_simple)):
+        compiled = classifier(table)
+        kind = type(compiled).__name__
+        before = _time_per_line(legacy, lines, args.repeat)
+        # Timed as archer-rich calls it; statuses are compared through a wrapper
+        after = _time_per_line(compiled.classify, lines, args.repeat)
+        status = _status(compiled.classify)
+        agree = sum(legacy(line) == status(line) for line in lines) / max(1, len(lines))
+        results.append({'table': table, 'classifier': kind, 'legacy_ns': before * 1e9, 'compiled_ns': after * 1e9,
+                        'agree': agree})
+        rows.append((table, kind, f"{before * 1e9:.0f}", f"{after * 1e9:.0f}", f"{before / after:.1f}x",
+                     f"{agree:.1%}"))
+    print(f"{args.lines} lines, mix {args.mix}")
+    print(format_table(['table', 'classifier', 'chain ns/line', 'compiled ns/line', 'speedup', 'agree'], rows))
+    write_json(args.json, 'classify', results)
+    return 0
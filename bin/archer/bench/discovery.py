@@ -0,0 +1,214 @@
+"""Menu discovery and TOML parsing over synthetic install trees.
+
+Generates `install/` trees with a given number of menus (directories with
+a menu.toml), maximum depth and scripts per menu, then measures:
+
+- lib.discover        archer.lib.ArcherMenu._discover_menus (TUI)
+- rich.discover       archer-rich.py ArcherMenu._discover_directory
+- parse_toml          install/system/parse_toml.py parse + process, every menu
+- lib.sub_menus       archer.lib.ArcherMenu.get_sub_menus, per call
+- lib.options         archer.lib.ArcherMenu.get_menu_options_filtered, per call
+- rich.sub_menus      archer-rich.py get_sub_menus, per call
+- rich.options        archer-rich.py get_menu_options_filtered, per call
+
+Per-call rows are measured over a fixed sample of menu keys (`--calls`)
+so large trees stay affordable; whole-tree rows scale with the tree.
+"""
+import io
+import math
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from . import REPO_ROOT, fmt_kib, fmt_ms, format_table, load_script_module, measure, write_json
+
+DEFAULT_SIZES = '10,100,1000,10000'
+WORDS = ('core', 'dev', 'media', 'net', 'themes', 'fonts', 'tools', 'db', 'games', 'office', 'shell', 'cloud')
+
+
+def generate_tree(root: Path, menus: int, depth: int = 3, scripts: int = 6, seed: int = 0) -> List[str]:
+    """Create `root/install` with `menus` menu directories; return their keys.
+
+    Menus are laid out breadth first with a branching factor chosen so the
+    tree is at most `depth` levels deep. Each menu gets between 1 and
+    `scripts` installer scripts (plus install.sh) and a menu.toml shaped
+    like the real ones, with a [display] override for every script.
+    """
+    rng = random.Random(seed)
+    install = root / 'install'
+    install.mkdir(parents=True)
+    _write_menu(install, 'Main Menu', [], rng, 'main')
+    branching = max(2, math.ceil(menus ** (1.0 / max(1, depth))))
+
+    keys: List[str] = []
+    frontier = [install]
+    counter = 0
+    while counter < menus:
+        next_frontier = []
+        for parent in frontier:
+            for _ in range(branching):
+                if counter >= menus:
+                    break
+                name = f"{WORDS[counter % len(WORDS)]}-{counter}"
+                path = parent / name
+                path.mkdir()
+                script_names = [f"{WORDS[rng.randrange(len(WORDS))]}-tool-{i}.sh" for i in range(rng.randint(1, scripts))]
+                for script in script_names + ['install.sh']:
+                    (path / script).write_text('#!/bin/bash\necho ok\n')
+                _write_menu(path, name.replace('-', ' ').title(), script_names, rng, 'submenu')
+                keys.append(str(path.relative_to(install)).replace(os.sep, '/'))
+                next_frontier.append(path)
+                counter += 1
+        frontier = next_frontier
+    return keys
+
+
+def _write_menu(path: Path, title: str, scripts: List[str], rng: random.Random, level: str):
+    lines = [
+        f'# {title}',
+        '',
+        '[menu]',
+        f'name = "{title}"',
+        f'description = "Synthetic menu {title}"',
+        'icon = "📦"',
+        '',
+        '[metadata]',
+        f'requires_network = {"true" if rng.random() < 0.5 else "false"}',
+        'estimated_time = "5-15 minutes"',
+        'categories = ["bench", "synthetic"]',
+        f'level = "{level}"',
+        '',
+        '[excludes]',
+        'files = []',
+        'directories = []',
+        '',
+        '[display]',
+    ]
+    for script in scripts:
+        lines.append(f'"{script}" = "{script[:-3].replace("-", " ").title()}"')
+    lines.append('"install.sh" = "Install All"')
+    (path / 'menu.toml').write_text('\n'.join(lines) + '\n')
+
+
+def _lib_menu(install: Path):
+    """archer.lib.ArcherMenu pointed at a synthetic install root."""
+    from ..lib import ArcherMenu, ArcherUI
+
+    # Skip __init__: it resolves the real install roots from bin/install_dirs.toml
+    menu = ArcherMenu.__new__(ArcherMenu)
+    menu.ui = ArcherUI(verbose=False)
+    menu.project_root = install.parent
+    menu.timings = {}
+    menu.install_roots = [install]
+    menu.install_root = install
+    menu.discovered_menus = {}
+    return menu
+
+
+def _rich_ui(rich_module, root: Path):
+    from rich.console import Console
+
+    ui = rich_module.ArcherUI(verbose=False)
+    ui.console = Console(file=io.StringIO())
+    ui.archer_dir = str(root)
+    return ui
+
+
+def _sample(keys: List[str], calls: int, seed: int) -> List[str]:
+    if len(keys) <= calls:
+        return list(keys)
+    return random.Random(seed).sample(keys, calls)
+
+
+def bench_size(menus: int, depth: int, scripts: int, repeat: int, calls: int, seed: int,
+               rich_module, parse_module) -> Dict:
+    tmp = Path(tempfile.mkdtemp(prefix='archer-bench-'))
+    try:
+        keys = generate_tree(tmp, menus, depth=depth, scripts=scripts, seed=seed)
+        install = tmp / 'install'
+        toml_paths = [str(install / 'menu.toml')] + [str(install / k / 'menu.toml') for k in keys]
+        sample = _sample(keys, calls, seed)
+        results: Dict[str, Dict] = {}
+
+        lib_menu = _lib_menu(install)
+        results['lib.discover'] = measure(lib_menu._discover_menus, repeat)
+        # get_sub_menus is asked about parents, i.e. keys that have children
+        parents = sorted({k.rsplit('/', 1)[0] for k in keys if '/' in k}) or sample
+        parent_sample = _sample(parents, calls, seed)
+        results['lib.sub_menus'] = _per_call(measure(lambda: [lib_menu.get_sub_menus(k) for k in parent_sample], repeat), parent_sample)
+        results['lib.options'] = _per_call(measure(lambda: [lib_menu.get_menu_options_filtered(k) for k in sample], repeat), sample)
+
+        if rich_module is not None:
+            ui = _rich_ui(rich_module, tmp)
+            rich_menu = rich_module.ArcherMenu(ui)
+
+            def rich_discover():
+                rich_menu.discovered_menus = {}
+                rich_menu._discover_directory(rich_menu.install_dir, '')
+
+            results['rich.discover'] = measure(rich_discover, repeat)
+            results['rich.sub_menus'] = _per_call(measure(lambda: [rich_menu.get_sub_menus(k) for k in parent_sample], repeat), parent_sample)
+            results['rich.options'] = _per_call(measure(lambda: [rich_menu.get_menu_options_filtered(k) for k in sample], repeat), sample)
+
+        if parse_module is not None:
+            def parse_all():
+                for path in toml_paths:
+                    data = parse_module.parse_toml_simplified(path)
+                    parse_module.process_menu_data(data, path)
+
+            results['parse_toml'] = measure(parse_all, repeat)
+
+        return {
+            'menus': menus,
+            'scripts': sum(1 for _ in install.rglob('*.sh')),
+            'depth': max(k.count('/') for k in keys) + 1 if keys else 0,
+            'results': results,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _per_call(result: Dict[str, float], keys: List[str]) -> Dict[str, float]:
+    n = max(1, len(keys))
+    result = dict(result)
+    result['calls'] = len(keys)
+    result['median_s'] /= n
+    result['min_s'] /= n
+    return result
+
+
+def add_arguments(parser):
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'Comma separated menu counts (default {DEFAULT_SIZES})')
+    parser.add_argument('--depth', type=int, default=3, help='Maximum menu depth (default 3)')
+    parser.add_argument('--scripts', type=int, default=6, help='Maximum scripts per menu (default 6)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement (default 5)')
+    parser.add_argument('--calls', type=int, default=200, help='Menu keys sampled for per-call rows (default 200)')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def run(args) -> int:
+    try:
+        rich_module = load_script_module('archer_rich', REPO_ROOT / 'bin' / 'archer-rich.py')
+    except ImportError as e:
+        print(f"Skipping archer-rich.py benchmarks: {e}")
+        rich_module = None
+    parse_module = load_script_module('archer_parse_toml', REPO_ROOT / 'install' / 'system' / 'parse_toml.py')
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    all_results = []
+    rows = []
+    for menus in sizes:
+        result = bench_size(menus, args.depth, args.scripts, args.repeat, args.calls, args.seed, rich_module, parse_module)
+        all_results.append(result)
+        for name, r in result['results'].items():
+            unit = 'per call' if 'calls' in r else 'tree'
+            rows.append((f"{menus}", name, unit, fmt_ms(r['median_s']), fmt_ms(r['min_s']), fmt_kib(r['peak_bytes'])))
+        print(f"[{menus} menus, {result['scripts']} scripts, depth {result['depth']}] done")
+
+    print()
+    print(format_table(['menus', 'operation', 'scope', 'median ms', 'min ms', 'peak KiB'], rows))
+    write_json(args.json, 'discovery', all_results)
+    return 0
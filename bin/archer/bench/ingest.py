@@ -0,0 +1,185 @@
+"""Output-ingestion throughput of ArcherTUIApp._run_install_command.
+
+A fake installer prints a configurable number of lines drawn from a mix
+of kinds:
+
+- plain      ordinary log lines
+- ansi       colour-coded log lines (SGR escapes)
+- progress   ARCHER_PROGRESS: / ARCHER_STATUS: tokens
+- pacman     pacman transaction rows (parsed by PacmanProgressParser)
+
+The app runs headless under Textual's pilot and the installer is started
+through the real `_run_install_command`, so the runner, progress parsing,
+progress widgets and the log panel are all on the measured path. Each run
+reports sustained lines/sec, event-loop lag (archer.profiling) and memory
+(peak RSS growth, and the tracemalloc peak with --trace-memory).
+
+`--rate` paces the installer (lines/sec) to check lag at a given volume
+instead of measuring the maximum.
+"""
+import asyncio
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict
+
+from . import fmt_kib, format_table, write_json
+
+DEFAULT_LINES = '1000,10000,50000'
+DEFAULT_MIX = 'plain=50,ansi=30,progress=15,pacman=5'
+
+FAKE_INSTALLER = r'''
+import random, sys, time
+with open(sys.argv[1]) as fh:
+    count, rate, seed, mix = fh.read().split()
+count, rate, seed = int(count), float(rate), int(seed)
+mix = [kv.split('=') for kv in mix.split(',')]
+kinds = [k for k, _ in mix]
+weights = [float(w) for _, w in mix]
+rng = random.Random(seed)
+out = sys.stdout
+pkg = 0
+start = time.perf_counter()
+for i in range(count):
+    kind = rng.choices(kinds, weights)[0]
+    if kind == 'ansi':
+        out.write(f"\x1b[1;3{i % 7 + 1}m==>\x1b[0m building target {i} \x1b[32mok\x1b[0m\n")
+    elif kind == 'progress':
+        if i % 2:
+            out.write(f"ARCHER_PROGRESS: {i * 100 // count}\n")
+        else:
+            out.write(f"ARCHER_STATUS: step {i}\n")
+    elif kind == 'pacman':
+        pkg = pkg % 50 + 1
+        out.write(f"({pkg}/50) installing bench-package-{pkg}\n")
+    else:
+        out.write(f"compiling src/module_{i % 97}.c -o build/module_{i % 97}.o\n")
+    if rate > 0:
+        delay = start + (i + 1) / rate - time.perf_counter()
+        if delay > 0:
+            out.flush()
+            time.sleep(delay)
+out.flush()
+'''
+
+
+def _rss_kib() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def _run_once(app, installer: Path, count: int, rate: float, mix: str, seed: int) -> Dict:
+    from ..profiling import SessionProfiler
+
+    # Parameters go through a file: a command line mentioning e.g. 'pacman'
+    # would make the app ask for sudo first
+    params = installer.with_name('params')
+    params.write_text(f"{count} {rate} {seed} {mix}\n")
+    command = f"{sys.executable} {installer} {params}"
+    profiler = SessionProfiler(time.perf_counter())
+    profiler.start()
+    t0 = time.perf_counter()
+    await app._run_install_command('ingest benchmark', command)
+    elapsed = time.perf_counter() - t0
+    await profiler.stop()
+    report = profiler.report()
+    return {
+        'elapsed_s': elapsed,
+        'lines_per_s': count / elapsed if elapsed > 0 else 0.0,
+        'loop_lag_ms': report['loop_lag_ms'],
+        'top_functions': report['sampling']['top_functions'][:10],
+    }
+
+
+async def _bench_volume(count: int, args, installer: Path) -> Dict:
+    from ..archer_tui_impl import ArcherTUIApp
+    from ..lib import ArcherMenu, ArcherUI
+
+    app = ArcherTUIApp(use_pty=args.pty, archer_menu=ArcherMenu(ArcherUI(verbose=False)))
+    runs = []
+    rss_before = _rss_kib()
+    traced_peak = None
+    async with app.run_test(size=(140, 45)) as pilot:
+        await pilot.pause()
+        for i in range(max(1, args.repeat)):
+            runs.append(await _run_once(app, installer, count, args.rate, args.mix, args.seed + i))
+            await pilot.pause()
+        if args.trace_memory:
+            tracemalloc.start()
+            try:
+                await _run_once(app, installer, count, args.rate, args.mix, args.seed)
+                traced_peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return {
+        'lines': count,
+        'lines_per_s': statistics.median(r['lines_per_s'] for r in runs),
+        'elapsed_s': statistics.median(r['elapsed_s'] for r in runs),
+        'lag_p95_ms': max(r['loop_lag_ms']['p95'] for r in runs),
+        'lag_max_ms': max(r['loop_lag_ms']['max'] for r in runs),
+        'rss_growth_kib': _rss_kib() - rss_before,
+        'traced_peak_bytes': traced_peak,
+        'runs': runs,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument('--lines', default=DEFAULT_LINES, help=f'Comma separated line counts (default {DEFAULT_LINES})')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Line kinds and weights (default {DEFAULT_MIX})')
+    parser.add_argument('--rate', type=float, default=0, help='Pace the installer at this many lines/sec (default: unpaced)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per line count (default 3)')
+    parser.add_argument('--pty', action='store_true', help='Run the installer under a pseudo-terminal')
+    parser.add_argument('--trace-memory', action='store_true', help='Add a tracemalloc pass (slower)')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def run(args) -> int:
+    kinds = {kv.split('=')[0] for kv in args.mix.split(',')}
+    unknown = kinds - {'plain', 'ansi', 'progress', 'pacman'}
+    if unknown:
+        print(f"Unknown line kinds in --mix: {', '.join(sorted(unknown))}")
+        return 2
+
+    tmp = Path(tempfile.mkdtemp(prefix='archer-bench-'))
+    installer = tmp / 'fake_installer.py'
+    installer.write_text(FAKE_INSTALLER)
+    # Keep the benchmark from picking up a real TUI prompt configuration
+    os.environ.pop('ARCHER_PROMPT_FIFO', None)
+    # Every run is recorded like a real job; keep the benchmark's rows (and
+    # host score) out of the user's history, where the ETA estimator reads
+    state_dir = os.environ.get('ARCHER_STATE_DIR')
+    os.environ['ARCHER_STATE_DIR'] = str(tmp / 'state')
+    results = []
+    rows = []
+    try:
+        for count in [int(s) for s in args.lines.split(',') if s.strip()]:
+            result = asyncio.run(_bench_volume(count, args, installer))
+            results.append(result)
+            peak = '-' if result['traced_peak_bytes'] is None else fmt_kib(result['traced_peak_bytes'])
+            rows.append((
+                str(count),
+                f"{result['lines_per_s']:.0f}",
+                f"{result['elapsed_s'] * 1000:.0f}",
+                f"{result['lag_p95_ms']:.1f}",
+                f"{result['lag_max_ms']:.1f}",
+                str(result['rss_growth_kib']),
+                peak,
+            ))
+    finally:
+        if state_dir is None:
+            os.environ.pop('ARCHER_STATE_DIR', None)
+        else:
+            os.environ['ARCHER_STATE_DIR'] = state_dir
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    mode = 'pty' if args.pty else 'pipe'
+    pace = f"{args.rate:.0f} lines/s" if args.rate else 'unpaced'
+    print(f"mix {args.mix}, {mode}, {pace}")
+    print(format_table(['lines', 'lines/s', 'elapsed ms', 'lag p95 ms', 'lag max ms', 'RSS +KiB', 'traced KiB'], rows))
+    write_json(args.json, 'ingest', results)
+    return 0
@@ -0,0 +1,162 @@
+"""Interaction latency of the TUI over large synthetic menus.
+
+Builds an install tree with `--tops` main topics, `--subs` sub-topics per
+topic and a fixed number of scripts per sub-topic, mounts ArcherTUIApp
+headlessly and scripts these interactions through Textual's pilot:
+
+- menu.select        _handle_menu_selection_by_row (sub-topics rebuilt)
+- subtopic.activate  _activate_subtopic_row (package table rebuilt)
+- package.toggle     space in the package table (DynamicPackageTable.on_key)
+- package.cursor     down arrow in the package table
+
+Latency is measured from the start of the interaction until the app has
+processed the resulting messages and refreshed the screen, and reported
+as percentiles per interaction. Run it for several `--scripts` values to
+see how table rebuilds scale with the number of packages.
+"""
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from . import format_table, write_json
+from .discovery import _lib_menu, _write_menu
+
+DEFAULT_SCRIPTS = '10,100,500'
+
+
+def generate_wide_tree(root: Path, tops: int, subs: int, scripts: int, seed: int = 0) -> Path:
+    """Create `root/install` with tops x subs menus of `scripts` scripts each."""
+    rng = random.Random(seed)
+    install = root / 'install'
+    install.mkdir(parents=True)
+    _write_menu(install, 'Main Menu', [], rng, 'main')
+    for t in range(tops):
+        top = install / f"topic-{t}"
+        top.mkdir()
+        _write_menu(top, f"Topic {t}", [], rng, 'submenu')
+        for s in range(subs):
+            sub = top / f"area-{s}"
+            sub.mkdir()
+            names = [f"package-{i:04d}.sh" for i in range(scripts)]
+            for name in names + ['install.sh']:
+                (sub / name).write_text('#!/bin/bash\necho ok\n')
+            _write_menu(sub, f"Area {s}", names, rng, 'submenu')
+    return install
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pct(p):
+        k = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+        return ordered[k] * 1000
+
+    return {
+        'count': len(ordered),
+        'p50_ms': pct(50),
+        'p95_ms': pct(95),
+        'p99_ms': pct(99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+async def _until_refreshed(app, rounds: int = 3) -> None:
+    """Wait until pending messages are handled and the screen has refreshed.
+
+    Every widget's queue is drained `rounds` times so messages posted while
+    handling (key forwarding, bubbling, table events) are included.
+    """
+    loop = asyncio.get_running_loop()
+    for _ in range(rounds):
+        pending = []
+        for node in [app, *app.screen.walk_children(with_self=True)]:
+            fut = loop.create_future()
+            if node.call_later(fut.set_result, None):
+                pending.append(fut)
+        await asyncio.gather(*pending)
+    done = loop.create_future()
+    app.call_after_refresh(lambda: done.done() or done.set_result(None))
+    await done
+
+
+def _press(app, key: str) -> None:
+    """Deliver a key the way the driver does, without the pilot's idle waits."""
+    from textual import events
+
+    app.post_message(events.Key(key, ' ' if key == 'space' else None))
+
+
+async def _bench_scripts(scripts: int, args) -> Dict[str, Dict]:
+    from textual.widgets import DataTable
+    from ..archer_tui_impl import ArcherTUIApp, DynamicPackageTable
+
+    tmp = Path(tempfile.mkdtemp(prefix='archer-bench-'))
+    try:
+        install = generate_wide_tree(tmp, args.tops, args.subs, scripts, args.seed)
+        menu = _lib_menu(install)
+        menu._discover_menus()
+        app = ArcherTUIApp(archer_menu=menu)
+        samples: Dict[str, List[float]] = {
+            'menu.select': [],
+            'subtopic.activate': [],
+            'package.toggle': [],
+            'package.cursor': [],
+        }
+        async with app.run_test(size=(140, 45)) as pilot:
+            await pilot.pause()
+            tops = len(app._menu_row_keys)
+            for i in range(args.iterations):
+                t0 = time.perf_counter()
+                app._handle_menu_selection_by_row(i % tops)
+                await _until_refreshed(app)
+                samples['menu.select'].append(time.perf_counter() - t0)
+
+                sub_row = i % max(1, len(app._subtopic_row_keys))
+                t0 = time.perf_counter()
+                app._activate_subtopic_row(sub_row)
+                await _until_refreshed(app)
+                samples['subtopic.activate'].append(time.perf_counter() - t0)
+
+                table = app.query_one('#package_panel', DynamicPackageTable).query_one('#package_table', DataTable)
+                table.focus()
+                await pilot.pause()
+                for key, name in (('down', 'package.cursor'), ('space', 'package.toggle')):
+                    for _ in range(args.presses):
+                        t0 = time.perf_counter()
+                        _press(app, key)
+                        await _until_refreshed(app)
+                        samples[name].append(time.perf_counter() - t0)
+        return {name: _percentiles(values) for name, values in samples.items() if values}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def add_arguments(parser):
+    parser.add_argument('--scripts', default=DEFAULT_SCRIPTS, help=f'Comma separated scripts per sub-topic (default {DEFAULT_SCRIPTS})')
+    parser.add_argument('--tops', type=int, default=12, help='Main topics (default 12)')
+    parser.add_argument('--subs', type=int, default=20, help='Sub-topics per topic (default 20)')
+    parser.add_argument('--iterations', type=int, default=20, help='Menu/sub-topic selections per size (default 20)')
+    parser.add_argument('--presses', type=int, default=5, help='Key presses per interaction and iteration (default 5)')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def run(args) -> int:
+    # Keep the benchmark from picking up a real TUI prompt configuration
+    os.environ.pop('ARCHER_PROMPT_FIFO', None)
+    results = []
+    rows = []
+    for scripts in [int(s) for s in args.scripts.split(',') if s.strip()]:
+        stats = asyncio.run(_bench_scripts(scripts, args))
+        results.append({'scripts': scripts, 'tops': args.tops, 'subs': args.subs, 'interactions': stats})
+        for name, s in stats.items():
+            rows.append((str(scripts), name, str(s['count']), f"{s['p50_ms']:.2f}", f"{s['p95_ms']:.2f}",
+                         f"{s['p99_ms']:.2f}", f"{s['max_ms']:.2f}"))
+    print(f"{args.tops} topics x {args.subs} sub-topics")
+    print(format_table(['scripts', 'interaction', 'n', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms'], rows))
+    write_json(args.json, 'ui', results)
+    return 0
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Duration predictions for installer jobs from the run history.
+
+`predict_duration()` looks up the latest successful runs of a script in
+archer.history and scales them to this machine: the CPU part of each run
+is multiplied by the ratio of the recording host's CPU score to ours, the
+rest (network, disk, waiting) is kept as measured. The median of the
+scaled runs is the prediction.
+
+`EtaClock` turns a prediction and the elapsed time into a progress
+fraction for scripts that print no progress of their own. It advances
+linearly up to ETA_LINEAR_CAP at the predicted duration, then creeps
+towards ETA_CEILING so an overrunning job never reads as finished.
+"""
+import math
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Runs considered per prediction
+HISTORY_RUNS = 10
+# Fraction shown when the predicted duration has elapsed
+ETA_LINEAR_CAP = 0.9
+# Fraction an overrunning job approaches but never reaches
+ETA_CEILING = 0.99
+
+
+@dataclass
+class Prediction:
+    """Expected duration of a job on this machine."""
+
+    seconds: float
+    runs: int
+
+
+def predict_duration(history, script: str, cpu_score: Optional[float] = None) -> Optional[Prediction]:
+    """Predict how long `script` will take here; None without history.
+
+    `history` is an archer.history.RunHistory. `cpu_score` defaults to
+    this host's score.
+    """
+    from .history import host_cpu_score
+
+    if not script:
+        return None
+    runs = history.durations(script, limit=HISTORY_RUNS)
+    if not runs:
+        return None
+    here = cpu_score or host_cpu_score()
+    scaled = []
+    for wall_s, cpu_s, score in runs:
+        cpu_s = min(cpu_s, wall_s)
+        factor = (score / here) if score and here else 1.0
+        scaled.append((wall_s - cpu_s) + cpu_s * factor)
+    return Prediction(seconds=statistics.median(scaled), runs=len(runs))
+
+
+class EtaClock:
+    """Estimated progress of a running job from its predicted duration."""
+
+    def __init__(self, prediction: Prediction, started: Optional[float] = None):
+        self.prediction = prediction
+        self.started = time.monotonic() if started is None else started
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def fraction(self) -> float:
+        expected = max(self.prediction.seconds, 0.001)
+        ratio = self.elapsed() / expected
+        if ratio <= 1.0:
+            return ETA_LINEAR_CAP * ratio
+        # Past the prediction: close half of the remaining gap per extra
+        # predicted duration
+        gap = ETA_CEILING - ETA_LINEAR_CAP
+        return ETA_CEILING - gap * math.pow(0.5, ratio - 1.0)
+
+    def remaining(self) -> float:
+        return max(0.0, self.prediction.seconds - self.elapsed())
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return "<1s"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+__all__ = ['Prediction', 'EtaClock', 'predict_duration', 'format_duration']
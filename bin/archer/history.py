@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Persistent history of installer runs.
+
+Every job the front ends run is stored with its exit code and resource
+usage (see runner.ResourceUsage) in a small SQLite database under the
+state directory (`lib.state_dir()/history.sqlite3`). Rows carry the host
+name and a CPU speed score for that host, so databases copied from
+several machines can be summarised together to find the installers that
+dominate provisioning time, and durations measured on one machine can be
+scaled to another (see archer.eta). Scripts inside the Archer checkout
+are stored relative to it, so the same installer has the same key on
+every machine.
+
+    python3 -m archer.history top --by wall
+    python3 -m archer.history top --db hostA.sqlite3 --db hostB.sqlite3
+    python3 -m archer.history recent
+"""
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    host TEXT NOT NULL,
+    description TEXT,
+    script TEXT,
+    command TEXT,
+    exit_code INTEGER,
+    wall_s REAL,
+    user_s REAL,
+    system_s REAL,
+    peak_rss_kib INTEGER,
+    read_bytes INTEGER,
+    write_bytes INTEGER,
+    download_bytes INTEGER,
+    cpu_score REAL
+);
+CREATE INDEX IF NOT EXISTS runs_script ON runs (script);
+"""
+
+RUN_COLUMNS = ('started', 'host', 'description', 'script', 'command', 'exit_code', 'wall_s', 'user_s',
+               'system_s', 'peak_rss_kib', 'read_bytes', 'write_bytes', 'download_bytes', 'cpu_score')
+# Pure-Python loop timed to score a host's single-core speed
+CPU_SCORE_LOOPS = 200000
+
+# `top --by` keys -> aggregate expression over a script's runs
+ORDER_BY = {
+    'wall': 'total_wall_s',
+    'cpu': 'total_cpu_s',
+    'rss': 'max_rss_kib',
+    'read': 'total_read_bytes',
+    'write': 'total_write_bytes',
+    'download': 'total_download_bytes',
+    'runs': 'runs',
+}
+
+
+def default_path() -> Path:
+    from .lib import state_dir
+    return state_dir() / 'history.sqlite3'
+
+
+def script_key(script: str) -> str:
+    """Stable name for a script: relative to $ARCHER_DIR when inside it."""
+    if not script:
+        return script
+    root = os.environ.get('ARCHER_DIR')
+    if root:
+        try:
+            return str(Path(script).resolve().relative_to(Path(root).resolve()))
+        except (ValueError, OSError):
+            pass
+    return script
+
+
+def _cpu_model() -> str:
+    try:
+        with open('/proc/cpuinfo') as fh:
+            for line in fh:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return ''
+
+
+def host_cpu_score() -> float:
+    """Single-core speed of this host (loops per second, higher is faster).
+
+    Measured once (about 50 ms) and cached in the state dir until the CPU
+    model changes.
+    """
+    from .lib import state_dir
+
+    cache = state_dir() / 'host.json'
+    model = _cpu_model()
+    try:
+        data = json.loads(cache.read_text())
+        if data.get('cpu_model') == model and data.get('cpu_score'):
+            return float(data['cpu_score'])
+    except (OSError, ValueError):
+        pass
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        total = 0
+        for i in range(CPU_SCORE_LOOPS):
+            total += i * i
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    score = CPU_SCORE_LOOPS / max(best, 1e-9)
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        cache.write_text(json.dumps({'cpu_model': model, 'cpu_score': score}))
+    except OSError:
+        pass
+    return score
+
+
+class RunHistory:
+    """Append-only store of job runs.
+
+    Connections are opened per call so `record()` can run in a worker
+    thread (`asyncio.to_thread`) without blocking the UI on disk I/O.
+    """
+
+    def __init__(self, path: Optional[os.PathLike] = None):
+        self.path = Path(path) if path else default_path()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def record(self, description: str, command: str, script: str, exit_code: Optional[int], usage) -> None:
+        """Store one finished job; `usage` is a runner.ResourceUsage."""
+        row = {
+            'started': time.time() - usage.wall_s,
+            'host': socket.gethostname(),
+            'description': description,
+            'script': script_key(script) or None,
+            'command': command,
+            'exit_code': exit_code,
+            'wall_s': usage.wall_s,
+            'user_s': usage.user_s,
+            'system_s': usage.system_s,
+            'peak_rss_kib': usage.peak_rss_kib,
+            'read_bytes': usage.read_bytes,
+            'write_bytes': usage.write_bytes,
+            'download_bytes': usage.download_bytes,
+            'cpu_score': host_cpu_score(),
+        }
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' * len(RUN_COLUMNS))})",
+                    [row[c] for c in RUN_COLUMNS],
+                )
+        finally:
+            conn.close()
+
+    def durations(self, script: str, limit: int = 10) -> List[Tuple[float, float, Optional[float]]]:
+        """(wall_s, cpu_s, cpu_score) of the latest successful runs of `script`.
+
+        `script` is matched like it was recorded: the script path, or the
+        description for commands that have no script.
+        """
+        if not self.path.exists():
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """SELECT wall_s, user_s + system_s, cpu_score FROM runs
+                   WHERE COALESCE(script, description) = ? AND exit_code = 0
+                   ORDER BY started DESC LIMIT ?""",
+                (script_key(script), limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(r[0], r[1] or 0.0, r[2]) for r in rows]
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute('SELECT * FROM runs ORDER BY started DESC LIMIT ?', (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+    def script_totals(self) -> List[Dict]:
+        """Per-script aggregates; mergeable across databases."""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute("""
+                SELECT COALESCE(script, description) AS script,
+                       COUNT(*) AS runs,
+                       SUM(exit_code != 0) AS failures,
+                       COUNT(DISTINCT host) AS hosts,
+                       SUM(wall_s) AS total_wall_s,
+                       SUM(user_s + system_s) AS total_cpu_s,
+                       MAX(peak_rss_kib) AS max_rss_kib,
+                       SUM(read_bytes) AS total_read_bytes,
+                       SUM(write_bytes) AS total_write_bytes,
+                       SUM(download_bytes) AS total_download_bytes
+                FROM runs GROUP BY 1
+            """).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+
+def merge_totals(per_db: List[List[Dict]]) -> List[Dict]:
+    """Combine script_totals() from several databases."""
+    merged: Dict[str, Dict] = {}
+    for totals in per_db:
+        for row in totals:
+            target = merged.get(row['script'])
+            if target is None:
+                merged[row['script']] = dict(row)
+                continue
+            for key, value in row.items():
+                if key == 'script' or value is None:
+                    continue
+                if key == 'max_rss_kib':
+                    target[key] = max(target[key] or 0, value)
+                else:
+                    # hosts is summed too: databases come from different machines
+                    target[key] = (target[key] or 0) + value
+    return list(merged.values())
+
+
+def _fmt_bytes(n: Optional[float]) -> str:
+    n = float(n or 0)
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if n < 1024 or unit == 'GiB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect the Archer run history')
+    parser.add_argument('--db', action='append', metavar='PATH', help='History database (repeatable; default: state dir)')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_top = sub.add_parser('top', help='Scripts ranked by total cost')
+    p_top.add_argument('--by', choices=sorted(ORDER_BY), default='wall')
+    p_top.add_argument('--limit', type=int, default=20)
+    p_recent = sub.add_parser('recent', help='Most recent runs')
+    p_recent.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    histories = [RunHistory(p) for p in (args.db or [None])]
+    missing = [str(h.path) for h in histories if not h.path.exists()]
+    if missing:
+        print(f"No history database at {', '.join(missing)}")
+        return 1
+
+    if args.cmd == 'recent':
+        runs = sorted((r for h in histories for r in h.recent(args.limit)), key=lambda r: -r['started'])[:args.limit]
+        for r in runs:
+            when = time.strftime('%Y-%m-%d %H:%M', time.localtime(r['started']))
+            print(f"{when}  {r['host']:<16} rc={r['exit_code']!s:<4} {r['wall_s']:>8.1f}s "
+                  f"cpu {r['user_s'] + r['system_s']:>7.1f}s  rss {r['peak_rss_kib'] // 1024:>5} MiB  "
+                  f"dl {_fmt_bytes(r['download_bytes']):>10}  {r['script'] or r['description']}")
+        return 0
+
+    key = ORDER_BY[args.by]
+    rows = merge_totals([h.script_totals() for h in histories])
+    rows.sort(key=lambda r: -(r[key] or 0))
+    print(f"{'runs':>5} {'fail':>4} {'hosts':>5} {'wall s':>9} {'cpu s':>8} {'max rss':>9} "
+          f"{'read':>10} {'write':>10} {'download':>10}  script")
+    for r in rows[:args.limit]:
+        print(f"{r['runs']:>5} {r['failures'] or 0:>4} {r['hosts']:>5} {r['total_wall_s'] or 0:>9.1f} "
+              f"{r['total_cpu_s'] or 0:>8.1f} {_fmt_bytes((r['max_rss_kib'] or 0) * 1024):>9} "
+              f"{_fmt_bytes(r['total_read_bytes']):>10} {_fmt_bytes(r['total_write_bytes']):>10} "
+              f"{_fmt_bytes(r['total_download_bytes']):>10}  {r['script']}")
+    return 0
+
+
+__all__ = ['RunHistory', 'merge_totals', 'host_cpu_score', 'script_key']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Run installer jobs with lower CPU, I/O and memory priority.
+
+Heavy builds (LFortran, Spack, AUR makepkg) otherwise compete with the
+front end for CPU and disk. With isolation on, `JobLimits.wrap(command)`
+rewrites a job's command line so it runs
+
+- scope: in a transient systemd user scope
+  (`systemd-run --user --scope`) with CPUWeight, IOWeight and MemoryHigh
+  set. The kernel then favours the UI and other cgroups under load, and
+  the job is throttled, not killed, when it exceeds its memory share.
+- nice: under `nice` and, when available, `ionice` best-effort at the
+  lowest priority. There is no memory limit in this mode.
+
+Modes are chosen with ARCHER_ISOLATE or --isolate:
+
+    off     run jobs as before (default)
+    auto    scope when a systemd user manager is reachable, else nice
+    scope   / nice   force one mode (scope falls back to nice if unusable)
+
+`systemd-run --scope` execs the command in place, so the job stays the
+leader of its process group and Job.terminate() still stops the whole
+tree. Processes started through sudo stay in the scope's cgroup.
+
+Check what would be used with
+
+    python3 -m archer.isolation [MODE]
+"""
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+ISOLATE_ENV = 'ARCHER_ISOLATE'
+MODES = ('off', 'auto', 'scope', 'nice')
+
+# Relative weights; systemd's default for every other unit is 100
+CPU_WEIGHT = 50
+IO_WEIGHT = 50
+# Share of physical memory a job may use before it is throttled
+MEMORY_HIGH_FRACTION = 0.75
+# Niceness and ionice best-effort level (0-7, 7 lowest) for nice mode
+NICE = 10
+IONICE_LEVEL = 7
+
+
+def _mem_total_bytes() -> Optional[int]:
+    try:
+        with open('/proc/meminfo') as fh:
+            for line in fh:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+@lru_cache(maxsize=None)
+def scope_available() -> bool:
+    """Whether `systemd-run --user --scope` works in this session.
+
+    Probed once by running `true` in a scope; it fails without a user
+    manager (containers, plain su/ssh sessions without lingering).
+    """
+    if shutil.which('systemd-run') is None:
+        return False
+    try:
+        probe = subprocess.run(
+            ['systemd-run', '--user', '--scope', '--quiet', '--collect', 'true'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return probe.returncode == 0
+
+
+@dataclass
+class JobLimits:
+    """How jobs are isolated; `mode` is 'scope' or 'nice' once resolved."""
+
+    mode: str = 'nice'
+    cpu_weight: int = CPU_WEIGHT
+    io_weight: int = IO_WEIGHT
+    # Bytes; None means MEMORY_HIGH_FRACTION of physical memory
+    memory_high: Optional[int] = None
+    nice: int = NICE
+
+    def _memory_high(self) -> Optional[int]:
+        if self.memory_high is not None:
+            return self.memory_high
+        total = _mem_total_bytes()
+        return int(total * MEMORY_HIGH_FRACTION) if total else None
+
+    def prefix(self) -> List[str]:
+        """Argument vector the job's shell is run under."""
+        if self.mode == 'scope':
+            argv = ['systemd-run', '--user', '--scope', '--quiet', '--collect',
+                    '-p', f'CPUWeight={self.cpu_weight}', '-p', f'IOWeight={self.io_weight}']
+            memory = self._memory_high()
+            if memory:
+                argv += ['-p', f'MemoryHigh={memory}']
+            return argv + ['--']
+        argv = ['nice', '-n', str(self.nice)]
+        if shutil.which('ionice'):
+            argv += ['ionice', '-c', '2', '-n', str(IONICE_LEVEL)]
+        return argv
+
+    def wrap(self, command: str) -> str:
+        """Shell command running `command` under these limits."""
+        return shlex.join(self.prefix() + ['/bin/sh', '-c', command])
+
+    def describe(self) -> str:
+        if self.mode == 'scope':
+            memory = self._memory_high()
+            limit = f", MemoryHigh {memory // (1024 * 1024)} MiB" if memory else ''
+            return f"systemd user scope (CPUWeight {self.cpu_weight}, IOWeight {self.io_weight}{limit})"
+        ionice = ', ionice best-effort 7' if shutil.which('ionice') else ''
+        return f"nice {self.nice}{ionice}"
+
+
+def limits_for(setting: Optional[str] = None) -> Optional[JobLimits]:
+    """Resolve a mode (default: $ARCHER_ISOLATE) to JobLimits, None for off."""
+    if setting is None:
+        setting = os.environ.get(ISOLATE_ENV, 'off')
+    setting = (setting or 'off').strip().lower()
+    if setting in ('', '0', 'off', 'no', 'false'):
+        return None
+    if setting in ('1', 'yes', 'true', 'on'):
+        setting = 'auto'
+    if setting not in MODES:
+        raise ValueError(f"unknown isolation mode {setting!r} (choose from {', '.join(MODES)})")
+    if setting in ('auto', 'scope') and scope_available():
+        return JobLimits(mode='scope')
+    return JobLimits(mode='nice')
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show how Archer would isolate installer jobs')
+    parser.add_argument('mode', nargs='?', choices=MODES, help=f'Isolation mode (default ${ISOLATE_ENV} or off)')
+    args = parser.parse_args(argv)
+    limits = limits_for(args.mode)
+    if limits is None:
+        print('off: jobs run without limits')
+        return 0
+    print(limits.describe())
+    print(limits.wrap('<command>'))
+    return 0
+
+
+__all__ = ['ISOLATE_ENV', 'JobLimits', 'MODES', 'limits_for', 'scope_available']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
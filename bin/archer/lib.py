@@ -16,14 +16,24 @@ not a full reimplementation of the project's original `archer` module.
 """
 from pathlib import Path
 import os
-import shlex
-import asyncio
-import subprocess
-from typing import Dict, List, Tuple, Optional
 import time
+from typing import Dict, List, Tuple, Optional
 import tomllib
 
 
+def state_dir() -> Path:
+    """Directory for Archer's local state (profiles, history, caches).
+
+    Honours $ARCHER_STATE_DIR, then $XDG_STATE_HOME/archer, and defaults to
+    ~/.local/state/archer. The directory is not created here.
+    """
+    explicit = os.environ.get('ARCHER_STATE_DIR')
+    if explicit:
+        return Path(explicit).expanduser()
+    base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return Path(base) / 'archer'
+
+
 class ArcherUI:
     """Minimal UI helper used by the TUI and ArcherMenu.
 
@@ -42,6 +52,8 @@ class ArcherUI:
         """
         if self.verbose:
             print(f"[ArcherUI] Running: {description} -> {command}")
+        # Imported here so menu discovery does not pay for it at startup
+        import subprocess
         try:
             # Run the command synchronously; capture output and print timestamps.
             proc = subprocess.run(command, shell=True, check=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
@@ -71,12 +83,19 @@ class ArcherMenu:
         self.ui = ui or ArcherUI(verbose=False)
         # Resolve project root (two levels up from this file: bin/archer -> project)
         self.project_root = Path(__file__).resolve().parents[2]
+        # Wall-clock seconds spent in each startup step (used by --profile)
+        self.timings: Dict[str, float] = {}
         # Resolve install roots from config file or defaults
+        t0 = time.perf_counter()
         self.install_roots = self._load_install_roots_from_config()
+        t1 = time.perf_counter()
         # For backwards compatibility, set primary install_root to first found
         self.install_root = self.install_roots[0] if self.install_roots else (self.project_root / 'install')
         self.discovered_menus: Dict[str, Dict] = {}
         self._discover_menus()
+        t2 = time.perf_counter()
+        self.timings['config_load'] = t1 - t0
+        self.timings['discovery'] = t2 - t1
 
     def _discover_menus(self):
         """Discover install directories and record menu keys.
@@ -262,4 +281,4 @@ class ArcherMenu:
 
 # Provide a module-level convenience: when users `from archer import ArcherMenu, ArcherUI`
 # they can import from this file if the project's import path points here.
-__all__ = ['ArcherMenu', 'ArcherUI']
+__all__ = ['ArcherMenu', 'ArcherUI', 'state_dir']
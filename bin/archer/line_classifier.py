@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Table-driven classification of installer output lines.
+
+The Rich front end turns arbitrary script output into a short status such
+as "Downloading packages..." or "Compiling foo.c...". The rules used to be
+long if/elif chains of `any(word in line_lower ...)`; here they are tables
+of `Rule`s compiled once into a `LineClassifier`:
+
+- every keyword of every rule goes into one regular expression, factored
+  as a prefix trie and scanned once per line to collect which keywords
+  occur;
+- each rule is a conjunction of terms (a term matches when any of its
+  keywords occurs), checked as a bit mask, first matching rule wins;
+- rules can capture a name (archive, source file, package) with a
+  precompiled pattern; a rule with `status=None` only applies when the
+  capture succeeds.
+
+Tables without captures (a few keywords per rule) are instead compiled
+to a `KeywordChain`, generated if/elif source in the shape of the old
+chains, which beats the scan there.
+
+The classifier does no I/O and keeps no per-stream state, so one instance
+per rule table is shared by every view. Rule order matches the order of
+the original chains.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+# Names shown in statuses are truncated to these lengths
+MAX_FILE_NAME = 40
+MAX_SOURCE_NAME = 30
+MAX_PACKAGE_NAME = 20
+# Memoised keyword masks per classifier
+MAX_CANDIDATE_SETS = 4096
+
+# Precompiled captures, applied to the lowercased line. Word captures only
+# start at the beginning of a word so a miss costs one pass over the line
+CAPTURES = {
+    'archive': (re.compile(r'(?<!\S)\S*?\.(?:tar|zip|gz|xz|deb|rpm)\S*'), MAX_FILE_NAME),
+    'source': (re.compile(r'(?<!\S)\S*?\.(?:cpp|cxx|cc|c)\b\S*'), MAX_SOURCE_NAME),
+    'package': (re.compile(r'(?:installing|install:|package|setting up|unpacking)\s+(\w[-\w]*)'), MAX_PACKAGE_NAME),
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One classification rule.
+
+    `terms` are alternatives of keywords; all terms must match. `status`
+    is used when there is no capture or it failed (None: skip the rule),
+    `detail` formats a successful capture as `{name}`.
+    """
+
+    phase: str
+    status: Optional[str]
+    terms: Tuple[Tuple[str, ...], ...]
+    capture: Optional[str] = None
+    detail: str = ''
+
+
+class Classification(NamedTuple):
+    phase: str
+    status: str
+    name: str = ''
+
+
+def rule(phase: str, status: Optional[str], *terms, capture: Optional[str] = None, detail: str = '') -> Rule:
+    """Build a Rule; each term is a keyword or a tuple of alternative keywords."""
+    return Rule(phase, status, tuple((t,) if isinstance(t, str) else tuple(t) for t in terms), capture, detail)
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Regular expression matching any of `words`, factored as a prefix trie.
+
+    re tries alternatives one by one at every position; sharing prefixes
+    means one character test rules out a whole subtree, and optional
+    suffixes are greedy so the longest keyword wins.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        end = node.get('', False)
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+        return body
+
+    return build(trie)
+
+
+class LineClassifier:
+    """Compiled form of an ordered rule table."""
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        keyword_bits: Dict[str, int] = {}
+        # (mask, capture pattern, name limit, rule, result without capture)
+        self._table: List[Tuple] = []
+        bit = 0
+        for r in self.rules:
+            mask = 0
+            for term in r.terms:
+                for keyword in term:
+                    keyword_bits[keyword] = keyword_bits.get(keyword, 0) | (1 << bit)
+                mask |= 1 << bit
+                bit += 1
+            pattern, limit = CAPTURES[r.capture] if r.capture else (None, 0)
+            static = Classification(r.phase, r.status) if r.status is not None else None
+            self._table.append((mask, pattern, limit, r, static))
+
+        # A match on a keyword also satisfies every keyword contained in it
+        # ('installing' implies 'install', 'makepkg' implies 'make'), since
+        # the scanner reports non-overlapping, longest matches
+        self._bits: Dict[str, int] = {}
+        for keyword in keyword_bits:
+            bits = 0
+            for other, other_bits in keyword_bits.items():
+                if other in keyword:
+                    bits |= other_bits
+            self._bits[keyword] = bits
+        self._scan = re.compile(trie_pattern(keyword_bits))
+        # Which rules apply depends only on the keyword mask; real output
+        # produces few distinct masks, so the rule walk is memoised
+        self._candidates: Dict[int, List[Tuple]] = {}
+
+    def keyword_mask(self, line_lower: str) -> int:
+        hits = 0
+        bits = self._bits
+        for keyword in self._scan.findall(line_lower):
+            hits |= bits[keyword]
+        return hits
+
+    def _select(self, hits: int) -> List[Tuple]:
+        """Rules that can apply given the keywords found, in order."""
+        candidates = []
+        for mask, pattern, limit, r, static in self._table:
+            if hits & mask == mask:
+                candidates.append((pattern, limit, r, static))
+                if pattern is None and static is not None:
+                    break
+        if len(self._candidates) >= MAX_CANDIDATE_SETS:
+            self._candidates.clear()
+        self._candidates[hits] = candidates
+        return candidates
+
+    def classify(self, line: str, lower: bool = True) -> Optional[Classification]:
+        """Classify one line; None when no rule applies."""
+        text = line.lower() if lower else line
+        hits = self.keyword_mask(text)
+        if not hits:
+            return None
+        candidates = self._candidates.get(hits)
+        if candidates is None:
+            candidates = self._select(hits)
+        for pattern, limit, r, static in candidates:
+            if pattern is not None:
+                m = pattern.search(text)
+                if m is not None:
+                    name = m.group(m.lastindex or 0).rsplit('/', 1)[-1][:limit]
+                    return Classification(r.phase, r.detail.format(name=name), name)
+            if static is not None:
+                return static
+        return None
+
+
+def _any_in(term: Tuple[str, ...]) -> str:
+    return ' or '.join(f"{keyword!r} in text" for keyword in term)
+
+
+class KeywordChain:
+    """Ordered rule table compiled to an if/elif chain of substring tests.
+
+    Equivalent to LineClassifier for tables without captures, and faster
+    for them: `in` tests run at C speed, while the trie scan pays a regex
+    pass and a findall list on every line. The chain is generated as
+    Python source (kept in `source`) in the shape of the hand-written
+    chains it replaces; consecutive rules sharing their first term are
+    nested under one test of it.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        if any(r.capture or r.status is None for r in self.rules):
+            raise ValueError('KeywordChain rules cannot capture names')
+        # Results are bound by name; keywords are embedded as literals
+        results: Dict[str, Classification] = {}
+        lines = ['def classify(line, lower=True):',
+                 '    text = line.lower() if lower else line']
+        lead = None
+        for r in self.rules:
+            name = f"_r{len(results)}"
+            results[name] = Classification(r.phase, r.status)
+            if r.terms[0] != lead:
+                lead = r.terms[0]
+                lines.append(f"    if {_any_in(lead)}:")
+            rest = r.terms[1:]
+            if rest:
+                lines.append('        if ' + ' and '.join(f"({_any_in(term)})" for term in rest) + f": return {name}")
+            else:
+                lines.append(f"        return {name}")
+        lines.append('    return None')
+        self.source = '\n'.join(lines) + '\n'
+        namespace = dict(results)
+        exec(compile(self.source, f"<KeywordChain {len(self.rules)} rules>", 'exec'), namespace)
+        # Same signature and result as LineClassifier.classify
+        self.classify: Callable[..., Optional[Classification]] = namespace['classify']
+
+
+# -- rule tables ----------------------------------------------------------------
+
+_INSTALL = ('installing', 'install ')
+
+# ArcherUI.show_script_progress: long-running scripts (languages, databases)
+SCRIPT_RULES = [
+    rule('installing', 'Installing GFortran compiler...', _INSTALL, 'gfortran'),
+    rule('installing', 'Building LFortran (this may take 20-45 minutes)...', _INSTALL, 'lfortran'),
+    rule('installing', 'Installing D compiler...', _INSTALL, ('dlang', 'dmd', 'ldc')),
+    rule('installing', 'Installing Nim language...', _INSTALL, 'nim'),
+    rule('installing', 'Installing Zig language...', _INSTALL, 'zig'),
+    rule('installing', 'Installing Rust toolchain...', _INSTALL, 'rust'),
+    rule('installing', 'Installing Go language...', _INSTALL, 'go'),
+    rule('installing', 'Installing PostgreSQL database...', _INSTALL, 'postgresql'),
+    rule('installing', 'Installing MariaDB database...', _INSTALL, ('mariadb', 'mysql')),
+    rule('installing', 'Installing Redis cache...', _INSTALL, 'redis'),
+    rule('installing', 'Installing SQLite database...', _INSTALL, 'sqlite'),
+    rule('installing', 'Installing MongoDB database...', _INSTALL, 'mongodb'),
+    rule('installing', 'Installing DBeaver GUI client...', _INSTALL, 'dbeaver'),
+    rule('installing', 'Installing DBmate migration tool...', _INSTALL, 'dbmate'),
+    rule('installing', 'Installing packages...', _INSTALL),
+    rule('downloading', 'Downloading packages...', 'downloading'),
+    rule('building', 'Building LFortran (bison parser generation - please be patient)...',
+         ('building', 'compiling'), ('lfortran', 'bison', 'parser', 'grammar')),
+    rule('building', 'Building from source...', ('building', 'compiling')),
+    rule('configuring', 'Configuring installation...', 'configuring'),
+    rule('complete', 'Installation completing...', ('complete', 'success')),
+    rule('installing', 'Installing via Mise...', 'mise install'),
+    rule('installing', 'Installing from repositories...', ('yay -s', 'pacman -s')),
+    rule('services', 'Enabling system services...', 'systemctl enable'),
+    rule('services', 'Starting services...', 'service', 'start'),
+]
+
+# ArcherUI.show_simple_progress: quick single-tool installs
+SIMPLE_RULES = [
+    rule('downloading', 'Downloading components...', 'downloading'),
+    rule('installing', 'Installing packages...', 'installing'),
+    rule('complete', 'Completing installation...', ('complete', 'success')),
+    rule('installing', 'Installing Rust package...', 'cargo install'),
+    rule('installing', 'Installing Node.js package...', 'npm install'),
+    rule('installing', 'Installing Python package...', 'pip install'),
+    rule('installing', 'Installing Go package...', 'go install'),
+]
+
+_BUILD = ('building', 'compiling', 'compile', 'make', 'gcc', 'clang')
+
+# ArcherUI.show_nala_progress: generic fallback when pacman rows are absent
+NALA_RULES = [
+    rule('downloading', 'Downloading packages...', ('downloading', 'download'),
+         capture='archive', detail='Downloading {name}...'),
+    rule('installing', 'Installing packages...', ('installing', 'install'),
+         capture='package', detail='Installing {name}...'),
+    rule('building', None, _BUILD, capture='source', detail='Compiling {name}...'),
+    rule('building', 'Building package with makepkg...', _BUILD, 'makepkg'),
+    rule('building', 'Building Rust project...', _BUILD, 'cargo', 'build'),
+    rule('building', 'Building Node.js project...', _BUILD, 'npm', ('build', 'compile')),
+    rule('building', 'Building from source...', _BUILD),
+    rule('configuring', 'Configuring installation...', ('configuring', 'configure')),
+    rule('extracting', 'Extracting packages...', ('extracting', 'extract')),
+    rule('processing', 'Processing installation...', ('processing', 'process')),
+    rule('complete', 'Completing installation...', ('complete', 'finished', 'done', 'success')),
+    rule('resolving', 'Resolving dependencies...', 'resolving dependencies'),
+    rule('checking', 'Checking for conflicts...', 'checking for conflicts'),
+    rule('checking', 'Validating packages...', ('checking keys', 'validating')),
+    rule('checking', 'Loading package files...', 'loading packages'),
+    rule('checking', 'Checking package integrity...', 'checking integrity'),
+    rule('preparing', 'Preparing installation...', 'preparing'),
+    rule('syncing', 'Updating package database...', 'updating', 'database'),
+    rule('syncing', 'Synchronizing package databases...', 'synchronizing'),
+    rule('downloading', 'Retrieving packages...', 'retrieving'),
+]
+
+_classifiers: Dict[str, Union[LineClassifier, KeywordChain]] = {}
+TABLES = {'script': SCRIPT_RULES, 'simple': SIMPLE_RULES, 'nala': NALA_RULES}
+
+
+def classifier(table: str) -> Union[LineClassifier, KeywordChain]:
+    """Shared classifier for one of TABLES.
+
+    Tables with captures are compiled to a LineClassifier; plain keyword
+    tables use a KeywordChain, which is faster for them (see
+    `python3 -m archer.bench classify`).
+    """
+    compiled = _classifiers.get(table)
+    if compiled is None:
+        rules = TABLES[table]
+        chain = not any(r.capture for r in rules)
+        compiled = _classifiers[table] = KeywordChain(rules) if chain else LineClassifier(rules)
+    return compiled
+
+
+__all__ = ['Classification', 'KeywordChain', 'LineClassifier', 'Rule', 'SCRIPT_RULES', 'SIMPLE_RULES', 'NALA_RULES',
+           'TABLES', 'classifier', 'rule']
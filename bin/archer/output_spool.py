@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Bounded in-memory tail plus on-disk spool of a command's output.
+
+Progress views only ever show the last few lines of a command, but a
+failed multi-hour build is much easier to diagnose with its whole log.
+`OutputSpool` keeps a fixed-size ring of recent lines in memory and
+appends every line to a log file under `<state dir>/logs/`, so memory use
+does not grow with the length of the build.
+
+The log is written through an ordinary buffered file, so a line costs a
+deque append and a buffered write. Spooling is best effort: if the log
+cannot be written the spool carries on with the tail only. Older logs are
+pruned so at most MAX_LOGS are kept.
+
+List recent logs, or print the latest one, with
+
+    python3 -m archer.output_spool list
+    python3 -m archer.output_spool last [-n LINES]
+"""
+import os
+import re
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Optional
+
+# Lines kept in memory for the live view and failure reports
+TAIL_LINES = 50
+# Logs kept in the spool directory; the oldest are removed first
+MAX_LOGS = 50
+
+
+def log_dir() -> Path:
+    from .lib import state_dir
+    return state_dir() / 'logs'
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')[:60] or 'output'
+
+
+class OutputSpool:
+    """Tail ring and full log of one command's output."""
+
+    def __init__(self, description: str, tail: int = TAIL_LINES, directory: Optional[os.PathLike] = None,
+                 enabled: bool = True):
+        self.description = description
+        self.tail = deque(maxlen=tail)
+        self.lines = 0
+        self.directory = Path(directory) if directory else log_dir()
+        self.path: Optional[Path] = None
+        self._fh = None
+        if enabled:
+            self._open()
+
+    def _open(self):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_slug(self.description)}.log"
+            self._fh = open(self.path, 'w', encoding='utf-8', errors='replace')
+        except OSError:
+            self.path = None
+            self._fh = None
+
+    def append(self, line: str):
+        """Record one output line (without its trailing newline)."""
+        self.tail.append(line)
+        self.lines += 1
+        if self._fh is not None:
+            try:
+                self._fh.write(line)
+                self._fh.write('\n')
+            except OSError:
+                self._drop_log()
+
+    def last(self, count: int) -> List[str]:
+        """The last `count` non-empty lines."""
+        lines = [line for line in self.tail if line.strip()]
+        return lines[-count:] if count else []
+
+    def _drop_log(self):
+        try:
+            self._fh.close()
+        except OSError:
+            pass
+        self._fh = None
+        self.path = None
+
+    def close(self, keep: bool = True):
+        """Finish the log; `keep=False` removes it (e.g. after success)."""
+        if self._fh is None:
+            return
+        try:
+            self._fh.close()
+        except OSError:
+            pass
+        self._fh = None
+        if not keep and self.path is not None:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+            self.path = None
+        prune(self.directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def recent_logs(directory: Optional[os.PathLike] = None) -> List[Path]:
+    """Spooled logs, newest first."""
+    directory = Path(directory) if directory else log_dir()
+    try:
+        logs = [p for p in directory.iterdir() if p.suffix == '.log']
+    except OSError:
+        return []
+    return sorted(logs, key=lambda p: p.name, reverse=True)
+
+
+def prune(directory: Optional[os.PathLike] = None, keep: int = MAX_LOGS):
+    for path in recent_logs(directory)[keep:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect spooled command output')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('list', help='Recent logs, newest first')
+    p_last = sub.add_parser('last', help='Print the most recent log')
+    p_last.add_argument('-n', '--lines', type=int, default=0, help='Only the last N lines')
+    args = parser.parse_args(argv)
+
+    logs = recent_logs()
+    if args.cmd == 'list':
+        for path in logs:
+            print(f"{path.stat().st_size:>10}  {path}")
+        return 0
+    if not logs:
+        print(f"No logs in {log_dir()}")
+        return 1
+    with open(logs[0], errors='replace') as fh:
+        lines = deque(fh, maxlen=args.lines) if args.lines else fh.readlines()
+    sys.stdout.writelines(lines)
+    return 0
+
+
+__all__ = ['OutputSpool', 'TAIL_LINES', 'MAX_LOGS', 'log_dir', 'prune', 'recent_logs']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
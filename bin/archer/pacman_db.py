@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Install size estimates read straight from pacman's databases.
+
+`SyncIndex` parses the sync databases (`<dbpath>/sync/<repo>.db`, tar
+archives of `desc` files) into a name/provides/groups index; `LocalDb`
+reads the installed packages from `<dbpath>/local`. Both are cached as
+pickles under `lib.state_dir()/cache/` and reused until a database file
+(or the local directory) changes mtime, so a repeated estimate costs a
+few stat() calls and one unpickle instead of decompressing every repo.
+
+`estimate()` resolves the dependency closure of a set of package or
+group names the way `pacman -S --needed` would (first repo in
+pacman.conf order wins, provides and groups are followed, anything
+already installed is satisfied) and reports what would be downloaded
+and installed:
+
+    python3 -m archer.pacman_db estimate git base-devel neovim
+
+The database path defaults to DBPath in /etc/pacman.conf or
+/var/lib/pacman; ARCHER_PACMAN_DBPATH overrides it.
+"""
+import io
+import os
+import pickle
+import re
+import subprocess
+import sys
+import tarfile
+from collections import deque
+from dataclasses import astuple, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PACMAN_CONF = '/etc/pacman.conf'
+DEFAULT_DBPATH = '/var/lib/pacman'
+DEFAULT_CACHEDIR = '/var/cache/pacman/pkg'
+# Bump when the cached index layout changes
+INDEX_VERSION = 1
+
+_CONSTRAINT_RE = re.compile(r'[<>=].*$')
+
+
+def _strip_constraint(dep: str) -> str:
+    """'glibc>=2.38' -> 'glibc', 'sh: shell' -> 'sh'."""
+    return _CONSTRAINT_RE.sub('', dep.split(':', 1)[0]).strip()
+
+
+def _pacman_conf() -> Tuple[Optional[str], Optional[str], List[str]]:
+    """(DBPath, CacheDir, repos in order) from pacman.conf, where set."""
+    dbpath = cachedir = None
+    repos: List[str] = []
+    try:
+        with open(PACMAN_CONF) as fh:
+            for line in fh:
+                line = line.split('#', 1)[0].strip()
+                if line.startswith('[') and line.endswith(']'):
+                    section = line[1:-1]
+                    if section != 'options':
+                        repos.append(section)
+                elif '=' in line:
+                    key, value = (s.strip() for s in line.split('=', 1))
+                    if key == 'DBPath':
+                        dbpath = value
+                    elif key == 'CacheDir' and cachedir is None:
+                        cachedir = value
+    except OSError:
+        pass
+    return dbpath, cachedir, repos
+
+
+def default_dbpath() -> Path:
+    explicit = os.environ.get('ARCHER_PACMAN_DBPATH')
+    if explicit:
+        return Path(explicit)
+    dbpath, _cachedir, _repos = _pacman_conf()
+    return Path(dbpath or DEFAULT_DBPATH)
+
+
+def _parse_desc(text: str) -> Dict[str, List[str]]:
+    fields: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in text.splitlines():
+        if line.startswith('%') and line.endswith('%'):
+            current = fields.setdefault(line[1:-1], [])
+        elif line and current is not None:
+            current.append(line)
+    return fields
+
+
+@dataclass
+class SyncPackage:
+    name: str
+    version: str
+    repo: str
+    filename: str = ''
+    download_size: int = 0
+    installed_size: int = 0
+    depends: List[str] = field(default_factory=list)
+    provides: List[str] = field(default_factory=list)
+    groups: List[str] = field(default_factory=list)
+
+
+def _open_db(path: Path) -> tarfile.TarFile:
+    try:
+        return tarfile.open(path, 'r:*')
+    except tarfile.ReadError:
+        # zstd-compressed databases; tarfile only reads them from Python 3.14
+        data = subprocess.run(['zstd', '-dcq', str(path)], check=True, capture_output=True).stdout
+        return tarfile.open(fileobj=io.BytesIO(data), mode='r:')
+
+
+def _read_sync_db(path: Path, repo: str) -> List[SyncPackage]:
+    # Entries are <name>-<version>/desc; databases written by older
+    # repo-add keep DEPENDS/PROVIDES in a separate <name>-<version>/depends
+    entries: Dict[str, Dict[str, List[str]]] = {}
+    with _open_db(path) as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            entry, _, kind = member.name.rpartition('/')
+            if kind not in ('desc', 'depends'):
+                continue
+            fields = _parse_desc(tar.extractfile(member).read().decode('utf-8', 'replace'))
+            entries.setdefault(entry, {}).update(fields)
+    packages = []
+    for fields in entries.values():
+        if not fields.get('NAME'):
+            continue
+        packages.append(SyncPackage(
+            name=fields['NAME'][0],
+            version=(fields.get('VERSION') or [''])[0],
+            repo=repo,
+            filename=(fields.get('FILENAME') or [''])[0],
+            download_size=int((fields.get('CSIZE') or ['0'])[0]),
+            installed_size=int((fields.get('ISIZE') or ['0'])[0]),
+            depends=fields.get('DEPENDS', []),
+            provides=fields.get('PROVIDES', []),
+            groups=fields.get('GROUPS', []),
+        ))
+    return packages
+
+
+def _stamp(paths: Iterable[Path]) -> List[Tuple[str, int, int]]:
+    stamp = []
+    for path in paths:
+        try:
+            st = path.stat()
+            stamp.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append((str(path), 0, -1))
+    return stamp
+
+
+def _load_cached(name: str, stamp) -> Optional[object]:
+    from .lib import state_dir
+    try:
+        with open(state_dir() / 'cache' / name, 'rb') as fh:
+            version, cached_stamp, value = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        return None
+    return value if version == INDEX_VERSION and cached_stamp == stamp else None
+
+
+def _store_cached(name: str, stamp, value) -> None:
+    from .lib import state_dir
+    target = state_dir() / 'cache' / name
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix('.tmp')
+        with open(tmp, 'wb') as fh:
+            pickle.dump((INDEX_VERSION, stamp, value), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
+class SyncIndex:
+    """All packages of the sync databases, indexed for dependency lookups."""
+
+    def __init__(self, dbpath: Optional[os.PathLike] = None, use_cache: bool = True):
+        self.dbpath = Path(dbpath) if dbpath else default_dbpath()
+        _dbpath, _cachedir, conf_repos = _pacman_conf()
+        present = {p.stem: p for p in sorted((self.dbpath / 'sync').glob('*.db'))}
+        # pacman.conf order decides which repo wins; unknown repos go last
+        self.repos = [r for r in conf_repos if r in present] + [r for r in present if r not in conf_repos]
+        paths = [present[r] for r in self.repos]
+        stamp = _stamp(paths)
+        cached = _load_cached('sync-index.pickle', stamp) if use_cache else None
+        if cached is None:
+            packages: Dict[str, SyncPackage] = {}
+            for repo, path in zip(self.repos, paths):
+                for pkg in _read_sync_db(path, repo):
+                    packages.setdefault(pkg.name, pkg)
+            providers: Dict[str, List[str]] = {}
+            groups: Dict[str, List[str]] = {}
+            for pkg in packages.values():
+                for provided in pkg.provides:
+                    providers.setdefault(_strip_constraint(provided), []).append(pkg.name)
+                for group in pkg.groups:
+                    groups.setdefault(group, []).append(pkg.name)
+            # Plain tuples: the cache must load whether this module runs
+            # as archer.pacman_db or as __main__
+            rows = [astuple(pkg) for pkg in packages.values()]
+            if use_cache:
+                _store_cached('sync-index.pickle', stamp, (rows, providers, groups))
+        else:
+            rows, providers, groups = cached
+            packages = {row[0]: SyncPackage(*row) for row in rows}
+        self.packages, self.providers, self.groups = packages, providers, groups
+
+    def find(self, dep: str) -> Optional[SyncPackage]:
+        """The package pacman would pick for a dependency string."""
+        name = _strip_constraint(dep)
+        if name in self.packages:
+            return self.packages[name]
+        candidates = self.providers.get(name)
+        return self.packages[candidates[0]] if candidates else None
+
+
+class LocalDb:
+    """Names (and provided names) of the installed packages."""
+
+    def __init__(self, dbpath: Optional[os.PathLike] = None, use_cache: bool = True):
+        local = (Path(dbpath) if dbpath else default_dbpath()) / 'local'
+        # Installs and removals add or delete entries, changing the dir mtime
+        stamp = _stamp([local])
+        cached = _load_cached('local-index.pickle', stamp) if use_cache else None
+        if cached is None:
+            installed: Dict[str, str] = {}
+            provided = set()
+            try:
+                entries = list(local.iterdir())
+            except OSError:
+                entries = []
+            for entry in entries:
+                try:
+                    fields = _parse_desc((entry / 'desc').read_text(errors='replace'))
+                except OSError:
+                    continue
+                if fields.get('NAME'):
+                    installed[fields['NAME'][0]] = (fields.get('VERSION') or [''])[0]
+                    provided.update(_strip_constraint(p) for p in fields.get('PROVIDES', []))
+            cached = (installed, provided)
+            if use_cache:
+                _store_cached('local-index.pickle', stamp, cached)
+        self.installed, self.provided = cached
+
+    def satisfies(self, dep: str) -> bool:
+        name = _strip_constraint(dep)
+        return name in self.installed or name in self.provided
+
+
+@dataclass
+class Estimate:
+    """What `pacman -S --needed <names>` would do."""
+
+    install: List[SyncPackage] = field(default_factory=list)
+    # Requested names that are already installed
+    satisfied: List[str] = field(default_factory=list)
+    # Names not found in any sync database (AUR packages, typos)
+    unknown: List[str] = field(default_factory=list)
+    # Packages of `install` already in the package cache
+    cached_files: List[str] = field(default_factory=list)
+
+    @property
+    def download_bytes(self) -> int:
+        cached = set(self.cached_files)
+        return sum(p.download_size for p in self.install if p.name not in cached)
+
+    @property
+    def installed_bytes(self) -> int:
+        return sum(p.installed_size for p in self.install)
+
+
+def estimate(names: Iterable[str], index: Optional[SyncIndex] = None, local: Optional[LocalDb] = None,
+             cachedir: Optional[str] = None) -> Estimate:
+    """Resolve the dependency closure of `names` against the sync databases."""
+    index = index or SyncIndex()
+    local = local or LocalDb(index.dbpath)
+    if cachedir is None:
+        cachedir = _pacman_conf()[1] or DEFAULT_CACHEDIR
+    result = Estimate()
+    queue: deque = deque()
+    for name in names:
+        if name in index.groups and name not in index.packages:
+            queue.extend(index.groups[name])
+        else:
+            queue.append(name)
+    requested = set(queue)
+    seen = set()
+    while queue:
+        dep = queue.popleft()
+        name = _strip_constraint(dep)
+        if name in seen:
+            continue
+        seen.add(name)
+        if local.satisfies(dep):
+            if name in requested:
+                result.satisfied.append(name)
+            continue
+        pkg = index.find(dep)
+        if pkg is None:
+            result.unknown.append(name)
+            continue
+        if pkg.name != name and pkg.name in seen:
+            continue
+        seen.add(pkg.name)
+        result.install.append(pkg)
+        if pkg.filename and os.path.exists(os.path.join(cachedir, pkg.filename)):
+            result.cached_files.append(pkg.name)
+        queue.extend(pkg.depends)
+    return result
+
+
+def estimate_scripts(scripts: Iterable[str], extra: Iterable[str] = ()) -> Optional[Estimate]:
+    """Estimate the packages installer scripts install unconditionally.
+
+    Uses the same static analysis as install profiles; returns None when
+    there are no sync databases or nothing to estimate.
+    """
+    from .profiles import analyze_script
+
+    if not available():
+        return None
+    names = set(extra)
+    for script in scripts:
+        names.update(analyze_script(script).packages)
+    if not names:
+        return None
+    return estimate(sorted(names))
+
+
+def summary_line(result: Estimate) -> str:
+    text = (f"{len(result.install)} packages to install, {_fmt_size(result.download_bytes)} to download, "
+            f"{_fmt_size(result.installed_bytes)} installed")
+    if result.satisfied:
+        text += f", {len(result.satisfied)} already installed"
+    if result.unknown:
+        text += f", {len(result.unknown)} not in the repos"
+    return text
+
+
+def _fmt_size(n: float) -> str:
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if n < 1024 or unit == 'GiB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def describe(result: Estimate, verbose: bool = False) -> str:
+    lines = [
+        f"to install   {len(result.install):>5} packages",
+        f"download     {_fmt_size(result.download_bytes):>12}"
+        + (f"  ({len(result.cached_files)} already in the package cache)" if result.cached_files else ''),
+        f"installed    {_fmt_size(result.installed_bytes):>12}",
+        f"satisfied    {len(result.satisfied):>5} requested packages already installed",
+    ]
+    if result.unknown:
+        lines.append(f"not in repos {len(result.unknown):>5}: {' '.join(sorted(result.unknown))}")
+    if verbose:
+        for pkg in sorted(result.install, key=lambda p: -p.download_size):
+            lines.append(f"  {pkg.repo + '/' + pkg.name:<40} {pkg.version:<20} "
+                         f"{_fmt_size(pkg.download_size):>10} {_fmt_size(pkg.installed_size):>10}")
+    return '\n'.join(lines)
+
+
+def stale_lock(dbpath: Optional[os.PathLike] = None) -> Optional[Path]:
+    """pacman's db.lck if it exists while no pacman process is running.
+
+    A transaction killed before it could clean up leaves the lock behind
+    and every later pacman call fails until it is removed.
+    """
+    lock = Path(dbpath or default_dbpath()) / 'db.lck'
+    if not lock.exists():
+        return None
+    try:
+        pids = [name for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return None
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/comm') as fh:
+                if fh.read().strip() == 'pacman':
+                    return None
+        except OSError:
+            continue
+    return lock
+
+
+def available() -> bool:
+    """True when there are sync databases to estimate from."""
+    return any((default_dbpath() / 'sync').glob('*.db'))
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Estimate pacman downloads from the sync databases')
+    parser.add_argument('--dbpath', help='pacman database directory (default from pacman.conf)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-read the databases')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_est = sub.add_parser('estimate', help='Download and installed size of packages and groups')
+    p_est.add_argument('names', nargs='+')
+    p_est.add_argument('-v', '--verbose', action='store_true', help='List every package')
+    args = parser.parse_args(argv)
+
+    index = SyncIndex(args.dbpath, use_cache=not args.no_cache)
+    if not index.repos:
+        print(f"No sync databases in {index.dbpath / 'sync'}")
+        return 1
+    local = LocalDb(index.dbpath, use_cache=not args.no_cache)
+    print(describe(estimate(args.names, index, local), verbose=args.verbose))
+    return 0
+
+
+__all__ = ['Estimate', 'LocalDb', 'SyncIndex', 'SyncPackage', 'available', 'estimate', 'estimate_scripts', 'stale_lock',
+           'summary_line']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""State-machine parser for pacman / yay transaction output.
+
+Feeds one output line at a time and reports where the current transaction
+is: which phase it is in, how far the whole transaction has progressed and
+how far the current package (download or install) has progressed.
+
+Handles both output styles pacman produces:
+
+- with a terminal: `(2/5) installing foo   [#####-----]  50%` and download
+  rows such as ` foo-1.0-1-x86_64   1.2 MiB  3.4 MiB/s 00:01 [###---]  45%`
+- without a terminal (pipes): `installing foo...` and ` foo-1.0 downloading...`,
+  where package totals come from the `Packages (N)` summary line.
+
+The parser does no I/O and keeps a constant amount of state, so it can be
+used by the Textual TUI, the Rich front end or any headless runner.
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Lines longer than this are never pacman progress rows; skip them outright
+# so a pathological line (minified JS, base64 blobs) cannot cost more than a
+# length check.
+MAX_LINE_LENGTH = 1024
+
+# Portion of the global bar assigned to each transaction phase (start, end).
+PHASE_SPANS = {
+    'resolving': (0, 5),
+    'downloading': (5, 45),
+    'checking': (45, 55),
+    'installing': (55, 95),
+    'hooks': (95, 100),
+    'done': (100, 100),
+}
+
+# Verbs pacman prints for per-package operations
+INSTALL_VERBS = ('installing', 'upgrading', 'reinstalling', 'downgrading', 'removing')
+CHECK_VERBS = ('checking', 'loading')
+
+_COUNTER_RE = re.compile(r'^\(\s*(\d+)/(\d+)\)\s+(.*)$')
+_BAR_RE = re.compile(r'\[[#\-oc. C]*\]\s+(\d{1,3})%$')
+_PACKAGES_RE = re.compile(r'^Packages \((\d+)\)')
+_TOTAL_DL_RE = re.compile(r'^Total \(\s*(\d+)/(\d+)\)')
+_NOTTY_DL_RE = re.compile(r'^(\S+) downloading\.\.\.$')
+_TTY_DL_RE = re.compile(r'^(\S+)\s+\d')
+_AUR_BUILD_RE = re.compile(r'^==> Making package: (\S+)')
+_DOWNLOAD_SIZE_RE = re.compile(r'^Total Download Size:\s+([\d.]+)\s*([KMGT]?i?B)$')
+
+_SIZE_UNITS = {'B': 1, 'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'TiB': 1024 ** 4}
+
+
+def parse_size(value: str, unit: str) -> int:
+    """Convert a pacman size such as ('12.5', 'MiB') to bytes."""
+    try:
+        return int(float(value) * _SIZE_UNITS.get(unit, 1))
+    except ValueError:
+        return 0
+
+
+@dataclass
+class ProgressUpdate:
+    """Snapshot reported after a line changed the parser state."""
+
+    phase: str
+    overall: int
+    current: int
+    status: str
+    package: str = ''
+
+
+class PacmanProgressParser:
+    """Incremental parser turning pacman/yay output into progress updates.
+
+    Call `feed(line)` for every output line (with or without trailing
+    newline or carriage return). It returns a `ProgressUpdate` when the line
+    was recognised, or None so callers can fall back to other heuristics.
+    """
+
+    def __init__(self):
+        # Bytes pacman announced it would download ("Total Download Size"),
+        # summed over every transaction fed to this parser; never reset
+        self.download_bytes = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the current transaction."""
+        self.phase = 'idle'
+        self.total_packages = 0
+        self.download_index = 0
+        self.download_total = 0
+        self.install_index = 0
+        self.package = ''
+        self.current = 0
+        self.overall = 0
+
+    # -- helpers -----------------------------------------------------------
+    def _span(self, phase: str, fraction: float) -> int:
+        start, end = PHASE_SPANS[phase]
+        fraction = min(max(fraction, 0.0), 1.0)
+        value = int(start + (end - start) * fraction)
+        # Never move the global bar backwards within a transaction
+        if value > self.overall:
+            self.overall = value
+        return self.overall
+
+    def _update(self, phase: str, fraction: float, current: int, status: str) -> ProgressUpdate:
+        self.phase = phase
+        self.current = min(max(current, 0), 100)
+        return ProgressUpdate(
+            phase=phase,
+            overall=self._span(phase, fraction),
+            current=self.current,
+            status=status,
+            package=self.package,
+        )
+
+    @staticmethod
+    def _trailing_percent(text: str) -> Optional[int]:
+        if not text.endswith('%'):
+            return None
+        m = _BAR_RE.search(text)
+        if not m:
+            return None
+        pct = int(m.group(1))
+        return pct if pct <= 100 else None
+
+    # -- main entry point ----------------------------------------------------
+    def feed(self, line: str) -> Optional[ProgressUpdate]:
+        """Consume one line of output and return an update if it was recognised."""
+        if not line or len(line) > MAX_LINE_LENGTH:
+            return None
+        text = line.strip()
+        if not text:
+            return None
+
+        head = text[0]
+
+        # "(i/n) verb target ..." rows: package operations, checks and hooks
+        if head == '(':
+            return self._feed_counter(text)
+
+        if head == ':':
+            return self._feed_banner(text)
+
+        if text.startswith('resolving dependencies'):
+            self.reset()
+            self.package = ''
+            return self._update('resolving', 0.5, 0, 'Resolving dependencies...')
+
+        if text.startswith('looking for conflicting'):
+            return self._update('resolving', 1.0, 0, 'Looking for conflicting packages...')
+
+        m = _PACKAGES_RE.match(text)
+        if m:
+            self.total_packages = int(m.group(1))
+            return self._update('resolving', 1.0, 0, f"{self.total_packages} packages to process")
+
+        if text.startswith('Total Download Size:'):
+            m = _DOWNLOAD_SIZE_RE.match(text)
+            if m:
+                self.download_bytes += parse_size(m.group(1), m.group(2))
+            return None
+
+        if text.startswith('Total ('):
+            m = _TOTAL_DL_RE.match(text)
+            if m:
+                done, total = int(m.group(1)), int(m.group(2))
+                self.download_total = total
+                pct = self._trailing_percent(text)
+                fraction = (pct / 100.0) if pct is not None else done / max(1, total)
+                return self._update('downloading', fraction, self.current, f"Downloading {done}/{total}")
+            return None
+
+        if self.phase in ('downloading', 'resolving') and not text.startswith(('==>', '->')):
+            dl = self._feed_download(text)
+            if dl is not None:
+                return dl
+
+        # Non-tty per-package messages: "installing foo..."
+        first, _, rest = text.partition(' ')
+        if first in INSTALL_VERBS and rest.endswith('...'):
+            self.install_index += 1
+            self.package = rest[:-3].strip()
+            total = max(self.total_packages, self.install_index)
+            return self._update(
+                'installing', self.install_index / total, 0,
+                f"({self.install_index}/{total}) {first} {self.package}",
+            )
+        if first in CHECK_VERBS and rest.endswith('...'):
+            return self._update('checking', 0.5, 0, f"{first.capitalize()} {rest[:-3]}")
+
+        if head == '=':
+            m = _AUR_BUILD_RE.match(text)
+            if m:
+                self.package = m.group(1)
+                return self._update(self.phase if self.phase in PHASE_SPANS else 'resolving', 0.0, 0, f"Building {self.package}")
+
+        return None
+
+    def _feed_banner(self, text: str) -> Optional[ProgressUpdate]:
+        if text.startswith(':: Retrieving packages'):
+            if self.phase in ('hooks', 'done'):
+                # A follow-up transaction in the same script
+                self.reset()
+            self.download_index = 0
+            return self._update('downloading', 0.0, 0, 'Retrieving packages...')
+        if text.startswith(':: Processing package changes'):
+            return self._update('installing', 0.0, 0, 'Processing package changes...')
+        if text.startswith(':: Running post-transaction hooks'):
+            return self._update('hooks', 0.0, 0, 'Running post-transaction hooks...')
+        if text.startswith(':: Running pre-transaction hooks'):
+            return self._update('checking', 1.0, 0, 'Running pre-transaction hooks...')
+        if text.startswith(':: Synchronizing package databases'):
+            self.reset()
+            return self._update('resolving', 0.0, 0, 'Synchronizing package databases...')
+        return None
+
+    def _feed_counter(self, text: str) -> Optional[ProgressUpdate]:
+        m = _COUNTER_RE.match(text)
+        if not m:
+            return None
+        index, total, body = int(m.group(1)), int(m.group(2)), m.group(3)
+        pct = self._trailing_percent(body)
+        if pct is not None:
+            body = body[:body.rfind('[')].rstrip()
+        verb, _, target = body.partition(' ')
+        target = target.rstrip('.').strip()
+
+        if verb in INSTALL_VERBS:
+            if self.phase in ('hooks', 'done'):
+                self.reset()
+            if total > self.total_packages:
+                self.total_packages = total
+            self.install_index = index
+            self.package = target
+            current = pct if pct is not None else 0
+            # Count the finished part of the current package towards the total
+            fraction = (index - 1 + current / 100.0) / max(1, total)
+            return self._update('installing', fraction, current, f"({index}/{total}) {verb} {target}")
+
+        if verb in CHECK_VERBS:
+            current = pct if pct is not None else 0
+            return self._update('checking', 0.5, current, f"({index}/{total}) {body}")
+
+        if self.phase in ('hooks', 'done'):
+            # Post-transaction hooks: "(1/5) Arming ConditionNeedsUpdate..."
+            fraction = index / max(1, total)
+            phase = 'done' if index >= total else 'hooks'
+            return self._update(phase, fraction, int(fraction * 100), f"({index}/{total}) {body.rstrip('.')}")
+
+        return None
+
+    def _feed_download(self, text: str) -> Optional[ProgressUpdate]:
+        m = _NOTTY_DL_RE.match(text)
+        if m:
+            self.download_index += 1
+            self.package = m.group(1)
+            total = max(self.total_packages, self.download_index)
+            return self._update(
+                'downloading', (self.download_index - 1) / total, 0,
+                f"Downloading {self.package}",
+            )
+        pct = self._trailing_percent(text)
+        if pct is None:
+            return None
+        m = _TTY_DL_RE.match(text)
+        if not m:
+            return None
+        name = m.group(1)
+        if name != self.package:
+            self.download_index += 1
+            self.package = name
+        total = max(self.download_total, self.total_packages, self.download_index)
+        fraction = (self.download_index - 1 + pct / 100.0) / total
+        return self._update('downloading', fraction, pct, f"Downloading {name}")
+
+
+__all__ = ['PacmanProgressParser', 'ProgressUpdate', 'PHASE_SPANS', 'parse_size']
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Adaptive job concurrency driven by pressure-stall information.
+
+`PressureSampler` reads the cumulative stall counters in
+/proc/pressure/{cpu,memory,io} and turns them into the share of time
+tasks were stalled since the previous sample. These deltas react much
+faster than the kernel's avg10 figures. The load average per CPU is
+sampled as well, but only drives the limit on kernels without PSI.
+
+`AdaptiveLimit` is an asyncio gate whose limit follows the samples:
+
+- memory thrashing (memory 'full' stall above MEM_FULL_HIGH) halves it;
+- CPU or I/O saturation lowers it by one;
+- when everything is below the low-water marks and jobs are queued
+  behind the limit, it grows by one.
+
+Without PSI, load above LOAD_HIGH per CPU lowers the limit by one and
+load below LOAD_LOW lets it grow.
+
+Every change is followed by a cooldown so the effect of the last change
+shows up in the next samples. The one-minute load average trails a
+change for about a minute, so a load-driven change waits LOAD_WINDOW
+seconds rather than COOLDOWN_SAMPLES samples; otherwise the limit would
+keep dropping on load left by jobs that already finished. Lowering the
+limit never stops running jobs; it only holds back new ones.
+
+Watch what the controller sees with
+
+    python3 -m archer.pressure [seconds]
+"""
+import asyncio
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+PSI_DIR = '/proc/pressure'
+# Seconds between samples while a batch runs
+SAMPLE_INTERVAL = 1.0
+# Samples to wait after a change before the next one
+COOLDOWN_SAMPLES = 3
+# Seconds the load average needs to reflect a change (its window)
+LOAD_WINDOW = 60.0
+# Jobs started before the first adjustment
+START_JOBS = 2
+
+# Percent of time stalled: above *_HIGH the limit goes down, below *_LOW
+# (all of them) it may go up
+CPU_SOME_HIGH = 60.0
+CPU_SOME_LOW = 25.0
+IO_FULL_HIGH = 20.0
+IO_SOME_LOW = 10.0
+MEM_FULL_HIGH = 5.0
+MEM_SOME_LOW = 1.0
+# One-minute load average per CPU
+LOAD_HIGH = 1.5
+LOAD_LOW = 0.9
+
+
+def _read_totals(resource: str) -> Optional[Dict[str, int]]:
+    """{'some': usec, 'full': usec} stalled since boot, or None without PSI."""
+    try:
+        with open(os.path.join(PSI_DIR, resource)) as fh:
+            text = fh.read()
+    except OSError:
+        return None
+    totals = {}
+    for line in text.splitlines():
+        kind, _, rest = line.partition(' ')
+        for field in rest.split():
+            if field.startswith('total='):
+                totals[kind] = int(field[6:])
+    return totals
+
+
+@dataclass
+class Pressure:
+    """Percent of wall time stalled over the last interval (None: unknown)."""
+
+    cpu_some: Optional[float] = None
+    memory_some: Optional[float] = None
+    memory_full: Optional[float] = None
+    io_some: Optional[float] = None
+    io_full: Optional[float] = None
+    # One-minute load average divided by the number of CPUs
+    load: float = 0.0
+
+    @property
+    def psi(self) -> bool:
+        """Whether stall figures are known (PSI available and sampled)."""
+        return any(value is not None for value in
+                   (self.cpu_some, self.memory_some, self.memory_full, self.io_some, self.io_full))
+
+    def describe(self) -> str:
+        def pct(value):
+            return '-' if value is None else f"{value:.0f}%"
+        return (f"cpu {pct(self.cpu_some)}, mem {pct(self.memory_some)}/{pct(self.memory_full)}, "
+                f"io {pct(self.io_some)}/{pct(self.io_full)}, load {self.load:.2f}")
+
+
+class PressureSampler:
+    """Stall percentages since the previous call of `sample()`."""
+
+    def __init__(self):
+        self.cpus = os.cpu_count() or 1
+        self._last: Dict[str, Tuple[float, Dict[str, int]]] = {}
+        self.sample()
+
+    def _delta(self, resource: str, now: float) -> Dict[str, float]:
+        totals = _read_totals(resource)
+        if totals is None:
+            return {}
+        previous = self._last.get(resource)
+        self._last[resource] = (now, totals)
+        if previous is None or now <= previous[0]:
+            return {}
+        elapsed_us = (now - previous[0]) * 1e6
+        return {kind: min(100.0, max(0.0, (value - previous[1].get(kind, value)) * 100.0 / elapsed_us))
+                for kind, value in totals.items()}
+
+    def sample(self) -> Pressure:
+        now = time.monotonic()
+        cpu = self._delta('cpu', now)
+        memory = self._delta('memory', now)
+        io = self._delta('io', now)
+        try:
+            load = os.getloadavg()[0] / self.cpus
+        except OSError:
+            load = 0.0
+        return Pressure(
+            cpu_some=cpu.get('some'),
+            memory_some=memory.get('some'),
+            memory_full=memory.get('full'),
+            io_some=io.get('some'),
+            io_full=io.get('full'),
+            load=load,
+        )
+
+
+def _above(value: Optional[float], limit: float) -> bool:
+    return value is not None and value > limit
+
+
+def _below(value: Optional[float], limit: float) -> bool:
+    return value is None or value < limit
+
+
+class AdaptiveLimit:
+    """Concurrency gate whose limit follows system pressure.
+
+    Use as `async with gate:` around each job; `start()` begins sampling
+    and `stop()` ends it. `on_change(limit, pressure, reason)` is called
+    whenever the limit moves.
+    """
+
+    def __init__(self, max_jobs: int, min_jobs: int = 1, start: Optional[int] = None,
+                 sampler: Optional[PressureSampler] = None, interval: float = SAMPLE_INTERVAL,
+                 on_change: Optional[Callable[[int, Pressure, str], None]] = None):
+        self.max_jobs = max(1, max_jobs)
+        self.min_jobs = max(1, min(min_jobs, self.max_jobs))
+        self.limit = min(self.max_jobs, max(self.min_jobs, START_JOBS if start is None else start))
+        self.active = 0
+        self.waiting = 0
+        self.sampler = sampler
+        self.interval = interval
+        self.on_change = on_change
+        self._cooldown = 0
+        self._cond = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        async with self._cond:
+            self.waiting += 1
+            try:
+                await self._cond.wait_for(lambda: self.active < self.limit)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def decide(self, pressure: Pressure) -> Tuple[int, str]:
+        """New limit for `pressure` and why; the current limit if unchanged."""
+        limit = self.limit
+        if _above(pressure.memory_full, MEM_FULL_HIGH):
+            return max(self.min_jobs, limit // 2), 'memory thrashing'
+        if _above(pressure.cpu_some, CPU_SOME_HIGH):
+            return max(self.min_jobs, limit - 1), 'cpu saturated'
+        if _above(pressure.io_full, IO_FULL_HIGH):
+            return max(self.min_jobs, limit - 1), 'io saturated'
+        if pressure.psi:
+            calm = (_below(pressure.cpu_some, CPU_SOME_LOW) and _below(pressure.memory_some, MEM_SOME_LOW)
+                    and _below(pressure.io_some, IO_SOME_LOW))
+        else:
+            # Load average fallback
+            if pressure.load > LOAD_HIGH:
+                return max(self.min_jobs, limit - 1), 'load high'
+            calm = pressure.load < LOAD_LOW
+        # Only grow when the limit is what holds jobs back
+        if calm and self.waiting and self.active >= limit:
+            return min(self.max_jobs, limit + 1), 'headroom'
+        return limit, ''
+
+    def cooldown_samples(self, pressure: Pressure) -> int:
+        """Samples to skip after a change decided on `pressure`."""
+        if pressure.psi:
+            return COOLDOWN_SAMPLES
+        return max(COOLDOWN_SAMPLES, math.ceil(LOAD_WINDOW / self.interval))
+
+    async def adjust(self, pressure: Pressure):
+        if self._cooldown:
+            self._cooldown -= 1
+            return
+        limit, reason = self.decide(pressure)
+        if limit == self.limit:
+            return
+        async with self._cond:
+            self.limit = limit
+            self._cond.notify_all()
+        self._cooldown = self.cooldown_samples(pressure)
+        if self.on_change is not None:
+            self.on_change(limit, pressure, reason)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.adjust(self.sampler.sample())
+
+    def start(self):
+        if self._task is None:
+            if self.sampler is None:
+                self.sampler = PressureSampler()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+def available() -> bool:
+    """Whether the kernel exposes pressure-stall information."""
+    return os.path.exists(os.path.join(PSI_DIR, 'cpu'))
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Print what the adaptive job limit sees')
+    parser.add_argument('seconds', nargs='?', type=float, default=10.0)
+    args = parser.parse_args(argv)
+    if not available():
+        print(f"No {PSI_DIR}; only the load average is used")
+    sampler = PressureSampler()
+    deadline = time.monotonic() + args.seconds
+    while time.monotonic() < deadline:
+        time.sleep(SAMPLE_INTERVAL)
+        print(sampler.sample().describe(), flush=True)
+    return 0
+
+
+__all__ = ['AdaptiveLimit', 'Pressure', 'PressureSampler', 'available']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""Declarative install profiles and their compiled execution plans.
+
+A profile is a TOML file in `<ARCHER_DIR>/profiles/` (or any path) that
+lists what a machine should get:
+
+    [profile]
+    name = "Developer Workstation"
+    description = "Compilers, editors and containers"
+
+    [install]
+    packages = ["git", "base-devel"]     # extra pacman packages
+    aur = []                             # extra AUR packages
+    targets = [                          # archer.run target names and globs
+        "development/system-programming/rust",
+        "development/database-tools/*",
+    ]
+
+    [after]                              # optional ordering constraints
+    "development/devops-mobile/docker" = ["system/hardware/gpu-drivers"]
+
+`compile_plan()` resolves the targets against the discovered menus and
+reads every script once to build an execution plan:
+
+- package sets are merged: literal `install_with_retries`, `pacman -S`
+  and `yay`/`paru -S` arguments of all scripts, plus the profile's own
+  packages, are installed in one pacman and one AUR transaction up front;
+- prerequisites are deduplicated: a script that another selected target
+  already runs (menu install.sh files and wrapper scripts call others
+  with `bash "$SCRIPT_DIR/x.sh"`) is not run again on its own;
+- scripts are split into stages. `[after]` constraints order the stages;
+  within a stage, scripts that never call a package manager run in
+  parallel and the rest run one at a time. Merging packages does not make
+  a script safe to run alongside others: `pacman -S --needed` takes the
+  database lock even when everything is already installed, so two such
+  scripts at once fail with "unable to lock database".
+
+Plans are cached as JSON under `lib.state_dir()/plans/` and reused until
+the profile, a planned script or a directory a target was resolved from
+changes.
+
+    python3 -m archer.profiles show developer
+    archer.sh run --profile developer
+"""
+import hashlib
+import json
+import os
+import re
+import shlex
+import sys
+import tomllib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Bump when the plan format or the analysis changes
+PLAN_VERSION = 2
+
+_PACKAGE_CALL_RE = re.compile(
+    r"\b(?:install_with_retries|(?:sudo\s+)?pacman\s+-S\w*|(?P<aur>yay|paru)\s+-S\w*)\s+([^;&|)#\n]*)")
+_NESTED_SCRIPT_RE = re.compile(r"""\bbash\s+["']?([^"'\s;&|)]+\.sh)""")
+# Anything that takes pacman's database lock, also inside quoted command
+# strings such as `execute_with_progress "sudo pacman -S $pkg"`
+_PACKAGE_MANAGER_RE = re.compile(r"\b(?:pacman\s+-[DRSU]|yay\b|paru\b|makepkg\b|pacstrap\b)")
+# common-funcs.sh helpers that run pacman or an AUR helper
+_PACKAGE_HELPERS_RE = re.compile(
+    r"\b(?:install_with_retries|install_packages|install_aur_packages|install_aur_helper|update_system|"
+    r"refresh_databases|enable_multilib|setup_mise|check_system_requirements|check_kde_installed)\b")
+# Lines that only print text, e.g. hints such as `log_info "run: sudo pacman -Syu"`
+_MESSAGE_LINE_RE = re.compile(r"^\s*(?:echo|printf|log_\w+|print_\w+)\b")
+_AUR_HELPERS = ('yay', 'paru')
+_QUOTED_RE = re.compile(r""""[^"]*"|'[^']*'""")
+_BLOCK_RE = re.compile(r"\b(then|elif|fi|do|done|case|esac)\b")
+
+
+class ProfileError(ValueError):
+    """The profile file is missing or invalid."""
+
+
+@dataclass
+class Profile:
+    name: str
+    path: str
+    description: str = ''
+    targets: List[str] = field(default_factory=list)
+    packages: List[str] = field(default_factory=list)
+    aur: List[str] = field(default_factory=list)
+    after: Dict[str, List[str]] = field(default_factory=dict)
+
+
+@dataclass
+class ScriptInfo:
+    """What static analysis found in one installer script."""
+
+    packages: List[str] = field(default_factory=list)
+    aur: List[str] = field(default_factory=list)
+    nested: List[str] = field(default_factory=list)
+    # Calls a package manager (merged or not) or runs other scripts, so it
+    # must not run alongside other scripts
+    exclusive: bool = False
+
+
+def profile_dirs() -> List[Path]:
+    root = os.environ.get('ARCHER_DIR') or str(Path(__file__).resolve().parents[2])
+    return [Path(root) / 'profiles']
+
+
+def find_profile(name: str) -> Path:
+    """Path of profile `name`: a file path or a name in profile_dirs()."""
+    candidate = Path(name)
+    if candidate.suffix == '.toml' and candidate.exists():
+        return candidate.resolve()
+    for directory in profile_dirs():
+        path = directory / f"{name}.toml"
+        if path.exists():
+            return path.resolve()
+    raise ProfileError(f"no profile named {name!r} (looked in {', '.join(str(d) for d in profile_dirs())})")
+
+
+def load_profile(path: Path) -> Profile:
+    try:
+        with open(path, 'rb') as fh:
+            data = tomllib.load(fh)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ProfileError(f"cannot read profile {path}: {e}") from e
+    meta = data.get('profile', {})
+    install = data.get('install', {})
+    profile = Profile(
+        name=meta.get('name', path.stem),
+        path=str(path),
+        description=meta.get('description', ''),
+        targets=list(install.get('targets', [])),
+        packages=list(install.get('packages', [])),
+        aur=list(install.get('aur', [])),
+        after={k: list(v) for k, v in data.get('after', {}).items()},
+    )
+    if not profile.targets and not profile.packages and not profile.aur:
+        raise ProfileError(f"profile {path} installs nothing")
+    return profile
+
+
+def _strip_comments(text: str) -> str:
+    return '\n'.join(line for line in text.splitlines() if not line.lstrip().startswith('#'))
+
+
+def _block_depth(text: str, depth: int) -> int:
+    """`depth` after the if/loop/case keywords in `text` (quotes ignored)."""
+    for word in _BLOCK_RE.findall(_QUOTED_RE.sub('""', text)):
+        if word in ('then', 'do', 'case'):
+            depth += 1
+        elif word in ('elif', 'fi', 'done', 'esac'):
+            depth = max(0, depth - 1)
+    return depth
+
+
+def _calls_package_manager(text: str) -> bool:
+    """Whether any line of `text` may take pacman's database lock."""
+    for line in text.splitlines():
+        if _MESSAGE_LINE_RE.match(line):
+            continue
+        if _PACKAGE_MANAGER_RE.search(line) or _PACKAGE_HELPERS_RE.search(line):
+            return True
+    return False
+
+
+def _unconditional_calls(text: str):
+    """Package manager calls that run whenever the script runs.
+
+    Calls inside if/case/loop bodies depend on the machine or on answers
+    to prompts (GPU vendor, editor choice...), so they are not merged;
+    the condition of an `if` itself still counts as unconditional.
+    Yields (match, conditional).
+    """
+    depth = 0
+    for line in text.splitlines():
+        for m in _PACKAGE_CALL_RE.finditer(line):
+            before = line[:m.start()]
+            if before.count('"') % 2 or before.count("'") % 2:
+                # Inside a string, e.g. a hint printed for the user
+                continue
+            yield m, _block_depth(before, depth) > 0
+        depth = _block_depth(line, depth)
+
+
+def analyze_script(path: str) -> ScriptInfo:
+    """Find the packages and nested scripts an installer script uses."""
+    info = ScriptInfo()
+    try:
+        text = _strip_comments(Path(path).read_text(errors='replace'))
+    except OSError:
+        info.exclusive = True
+        return info
+    for m, conditional in _unconditional_calls(text):
+        if conditional:
+            info.exclusive = True
+            continue
+        try:
+            words = shlex.split(m.group(2), posix=True)
+        except ValueError:
+            info.exclusive = True
+            continue
+        aur = bool(m.group('aur'))
+        if words and words[0] in _AUR_HELPERS:
+            aur, words = True, words[1:]
+        elif words and words[0] in ('pacman', 'pacstrap'):
+            # install_with_retries pacman pkg...: the helper name is not a package
+            if words[0] == 'pacstrap':
+                info.exclusive = True
+                continue
+            words = words[1:]
+        for word in words:
+            if word.startswith('-'):
+                continue
+            if any(c in word for c in '$`*?{'):
+                info.exclusive = True
+                continue
+            (info.aur if aur else info.packages).append(word)
+    # Even a merged call runs pacman again when the script runs
+    if _calls_package_manager(text):
+        info.exclusive = True
+    for m in _NESTED_SCRIPT_RE.finditer(text):
+        info.nested.append(os.path.basename(m.group(1)))
+    if info.nested:
+        info.exclusive = True
+    info.packages = sorted(set(info.packages))
+    info.aur = sorted(set(info.aur))
+    return info
+
+
+@dataclass
+class PlanStep:
+    name: str
+    script: str = ''
+    command: str = ''
+
+
+@dataclass
+class PlanStage:
+    steps: List[PlanStep]
+    parallel: bool = False
+
+
+@dataclass
+class Plan:
+    profile: str
+    key: str
+    packages: List[str]
+    aur: List[str]
+    stages: List[PlanStage]
+    # target name -> why it is not run on its own
+    dropped: Dict[str, str] = field(default_factory=dict)
+    # (path, mtime_ns, size) the plan was compiled from
+    depends: List[Tuple[str, int, int]] = field(default_factory=list)
+
+    def to_json(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'Plan':
+        stages = [PlanStage(steps=[PlanStep(**s) for s in st['steps']], parallel=st['parallel'])
+                  for st in data['stages']]
+        return cls(profile=data['profile'], key=data['key'], packages=data['packages'], aur=data['aur'],
+                   stages=stages, dropped=data.get('dropped', {}),
+                   depends=[tuple(d) for d in data.get('depends', [])])
+
+
+def _stat(path: str) -> Tuple[str, int, int]:
+    try:
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (path, 0, -1)
+
+
+def _profile_key(profile_path: Path) -> str:
+    digest = hashlib.sha256(profile_path.read_bytes())
+    digest.update(f"v{PLAN_VERSION}".encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_path(profile_path: Path) -> Path:
+    from .lib import state_dir
+    return state_dir() / 'plans' / f"{profile_path.stem}.json"
+
+
+def load_cached_plan(profile_path: Path) -> Optional[Plan]:
+    """The cached plan for a profile if nothing it depends on changed."""
+    try:
+        plan = Plan.from_json(json.loads(cache_path(profile_path).read_text()))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if plan.key != _profile_key(profile_path):
+        return None
+    if any(_stat(path) != (path, mtime, size) for path, mtime, size in plan.depends):
+        return None
+    return plan
+
+
+def _stages(order: List[str], after: Dict[str, List[str]], infos: Dict[str, ScriptInfo],
+            scripts: Dict[str, str]) -> List[PlanStage]:
+    """Layer targets by [after] constraints, then split parallel/exclusive."""
+    level: Dict[str, int] = {}
+
+    def depth(name: str, visiting: Set[str]) -> int:
+        if name in level:
+            return level[name]
+        if name in visiting:
+            raise ProfileError(f"[after] constraints form a cycle through {name}")
+        visiting.add(name)
+        deps = [d for d in after.get(name, []) if d in scripts]
+        level[name] = 1 + max((depth(d, visiting) for d in deps), default=-1)
+        visiting.discard(name)
+        return level[name]
+
+    for name in order:
+        depth(name, set())
+    stages: List[PlanStage] = []
+    for lvl in range(max(level.values(), default=-1) + 1):
+        names = [n for n in order if level[n] == lvl]
+        quick = [PlanStep(n, scripts[n]) for n in names if not infos[n].exclusive]
+        slow = [PlanStep(n, scripts[n]) for n in names if infos[n].exclusive]
+        if len(quick) == 1:
+            # Nothing to run alongside it
+            slow, quick = quick + slow, []
+        if quick:
+            stages.append(PlanStage(quick, parallel=True))
+        if slow:
+            stages.append(PlanStage(slow, parallel=False))
+    return stages
+
+
+def compile_plan(profile: Profile, menu) -> Plan:
+    """Resolve a profile against `menu` (a lib.ArcherMenu) into a Plan."""
+    from .run import resolve_targets
+
+    try:
+        targets = resolve_targets(menu, profile.targets) if profile.targets else []
+    except ValueError as e:
+        raise ProfileError(f"{profile.path}: {e}") from e
+    for name, deps in profile.after.items():
+        for dep in [name, *deps]:
+            if not any(t.name == dep for t in targets):
+                raise ProfileError(f"{profile.path}: [after] names {dep!r}, which is not a target of the profile")
+
+    scripts = {t.name: t.script for t in targets}
+    infos = {t.name: analyze_script(t.script) for t in targets}
+
+    # A target another selected target runs by itself is dropped: scripts
+    # under a selected menu (its install.sh installs all of them) and
+    # scripts a selected wrapper calls
+    dropped: Dict[str, str] = {}
+    for t in targets:
+        directory = os.path.dirname(t.script)
+        for other in targets:
+            if other is t or other.name in dropped:
+                continue
+            other_dir = os.path.dirname(other.script)
+            if other.is_menu and directory.startswith(other_dir + os.sep) or \
+                    other.is_menu and not t.is_menu and directory == other_dir:
+                dropped[t.name] = f"run by {other.name}"
+                break
+            if os.path.basename(t.script) in infos[other.name].nested and \
+                    other_dir in (directory, os.path.dirname(directory)):
+                dropped[t.name] = f"run by {other.name}"
+                break
+    order = [t.name for t in targets if t.name not in dropped]
+    after = {name: [d for d in deps if d not in dropped] for name, deps in profile.after.items() if name not in dropped}
+
+    packages = sorted(set(profile.packages).union(*(infos[n].packages for n in order)))
+    aur = sorted(set(profile.aur).union(*(infos[n].aur for n in order)) - set(packages))
+
+    stages: List[PlanStage] = []
+    install: List[PlanStep] = []
+    if packages:
+        install.append(PlanStep('packages/pacman', command='sudo pacman -S --needed --noconfirm '
+                                + ' '.join(shlex.quote(p) for p in packages)))
+    if aur:
+        install.append(PlanStep('packages/aur', command='helper=$(command -v paru || command -v yay) && '
+                                '"$helper" -S --needed --noconfirm ' + ' '.join(shlex.quote(p) for p in aur)))
+    if install:
+        # Sequential: both transactions take the pacman lock
+        stages.append(PlanStage(install, parallel=False))
+    stages.extend(_stages(order, after, infos, scripts))
+
+    # The planner itself: a changed analysis recompiles cached plans
+    depends: Set[str] = {profile.path, str(Path(__file__).resolve())}
+    for t in targets:
+        depends.add(t.script)
+        # Directories the target was resolved from, up to the install root
+        parent = Path(t.script).parent
+        for root in getattr(menu, 'install_roots', []):
+            if str(parent).startswith(str(root)):
+                while True:
+                    depends.add(str(parent))
+                    if parent == root or parent == parent.parent:
+                        break
+                    parent = parent.parent
+    return Plan(profile=profile.name, key=_profile_key(Path(profile.path)), packages=packages, aur=aur,
+                stages=stages, dropped=dropped, depends=sorted(_stat(p) for p in depends))
+
+
+def plan_for(name: str, menu_factory=None, use_cache: bool = True) -> Tuple[Plan, bool]:
+    """Return (plan, from_cache) for profile `name`.
+
+    `menu_factory` builds the ArcherMenu; it is only called when the
+    plan has to be compiled.
+    """
+    path = find_profile(name)
+    if use_cache:
+        plan = load_cached_plan(path)
+        if plan is not None:
+            return plan, True
+    if menu_factory is None:
+        from .lib import ArcherMenu, ArcherUI
+        menu_factory = lambda: ArcherMenu(ArcherUI(verbose=False))  # noqa: E731
+    plan = compile_plan(load_profile(path), menu_factory())
+    target = cache_path(path)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix('.tmp')
+        tmp.write_text(json.dumps(plan.to_json(), indent=1))
+        os.replace(tmp, target)
+    except OSError:
+        pass
+    return plan, False
+
+
+def describe(plan: Plan) -> str:
+    lines = [f"profile {plan.profile}"]
+    if plan.packages:
+        lines.append(f"  pacman ({len(plan.packages)}): {' '.join(plan.packages)}")
+    if plan.aur:
+        lines.append(f"  aur ({len(plan.aur)}): {' '.join(plan.aur)}")
+    for index, stage in enumerate(plan.stages, 1):
+        mode = 'parallel' if stage.parallel else 'sequential'
+        lines.append(f"  stage {index} ({mode}):")
+        for step in stage.steps:
+            lines.append(f"    {step.name}")
+    for name, reason in plan.dropped.items():
+        lines.append(f"  skipped {name}: {reason}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect Archer install profiles')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_show = sub.add_parser('show', help='Print the execution plan of a profile')
+    p_show.add_argument('profile')
+    p_show.add_argument('--no-cache', action='store_true', help='Recompile even if a cached plan is valid')
+    p_show.add_argument('--json', action='store_true')
+    sub.add_parser('list', help='List available profiles')
+    args = parser.parse_args(argv)
+
+    if args.cmd == 'list':
+        for directory in profile_dirs():
+            for path in sorted(directory.glob('*.toml')):
+                try:
+                    profile = load_profile(path)
+                except ProfileError as e:
+                    print(f"{path.stem:<16} (invalid: {e})")
+                    continue
+                print(f"{path.stem:<16} {profile.name} - {profile.description}")
+        return 0
+
+    try:
+        plan, cached = plan_for(args.profile, use_cache=not args.no_cache)
+    except ProfileError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(plan.to_json(), indent=1))
+    else:
+        print(describe(plan))
+        print(f"  ({'cached plan' if cached else 'compiled'})")
+    return 0
+
+
+__all__ = ['Plan', 'PlanStage', 'PlanStep', 'Profile', 'ProfileError', 'analyze_script',
+           'compile_plan', 'find_profile', 'load_profile', 'plan_for']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
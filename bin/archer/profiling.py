@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Startup and interaction profiling for archer-tui (`--profile`).
+
+A SessionProfiler records:
+
+- startup phase timings: imports, install-root config load, menu
+  discovery, mount and first paint;
+- event-loop lag for the whole session (how late a periodic timer fires,
+  i.e. how long the UI could not respond);
+- a sampling profile of the thread running the event loop, kept as folded
+  stacks ("file:function;file:function count") that flamegraph tools read
+  directly.
+
+The report is a JSON file with stable keys so two runs (e.g. before and
+after a change) can be compared:
+
+    python3 -m archer.profiling compare old.json new.json
+"""
+import asyncio
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPORT_FORMAT = 1
+# Interval of the stack sampler and the loop-lag probe, in seconds
+SAMPLE_INTERVAL = 0.01
+LAG_INTERVAL = 0.05
+# Keep at most this many lag samples (newest win)
+MAX_LAG_SAMPLES = 20000
+MAX_STACK_DEPTH = 64
+# Phases reported in this order
+PHASES = ('imports', 'config_load', 'discovery', 'mount', 'first_paint')
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SessionProfiler:
+    """Collects phase timings, loop lag and stack samples for one session."""
+
+    def __init__(self, started_at: float, sample_interval: float = SAMPLE_INTERVAL):
+        self.started_at = started_at
+        self.sample_interval = sample_interval
+        self.phases: Dict[str, float] = {}
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self._lags: deque = deque(maxlen=MAX_LAG_SAMPLES)
+        self._lag_max = 0.0
+        self._lag_task: Optional[asyncio.Task] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target_thread: Optional[int] = None
+        self._session_start: Optional[float] = None
+        self._session_end: Optional[float] = None
+
+    # -- phases ---------------------------------------------------------------
+    def record(self, phase: str, seconds: float):
+        """Record the duration of a startup phase in seconds."""
+        self.phases[phase] = seconds
+
+    def mark_since_start(self, phase: str):
+        """Record a phase as the time elapsed since process start."""
+        self.phases[phase] = time.perf_counter() - self.started_at
+
+    # -- session sampling -----------------------------------------------------
+    def start(self):
+        """Start sampling; call from the thread running the event loop."""
+        if self._sampler is not None:
+            return
+        self._session_start = time.perf_counter()
+        self._target_thread = threading.get_ident()
+        self._lag_task = asyncio.get_running_loop().create_task(self._probe_lag())
+        self._sampler = threading.Thread(target=self._sample_stacks, name='archer-profiler', daemon=True)
+        self._sampler.start()
+
+    async def _probe_lag(self):
+        while True:
+            t = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag = time.perf_counter() - t - LAG_INTERVAL
+            if lag < 0:
+                lag = 0.0
+            self._lags.append(lag)
+            if lag > self._lag_max:
+                self._lag_max = lag
+
+    def _sample_stacks(self):
+        tid = self._target_thread
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(tid)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.reverse()
+            self.stacks[';'.join(labels)] += 1
+            self.sample_count += 1
+
+    async def stop(self):
+        """Stop sampling; safe to call more than once."""
+        if self._session_end is None and self._session_start is not None:
+            self._session_end = time.perf_counter()
+        self._stop.set()
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._lag_task = None
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+
+    # -- reporting ------------------------------------------------------------
+    def _function_counts(self, limit: int = 30) -> List[Dict]:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            labels = stack.split(';')
+            self_counts[labels[-1]] += count
+            for label in set(labels):
+                total_counts[label] += count
+        top = sorted(total_counts.items(), key=lambda kv: (-self_counts[kv[0]], -kv[1]))[:limit]
+        return [{'function': name, 'self': self_counts[name], 'total': total} for name, total in top]
+
+    def report(self) -> Dict:
+        lags = sorted(self._lags)
+        session_s = 0.0
+        if self._session_start is not None:
+            session_s = (self._session_end or time.perf_counter()) - self._session_start
+        try:
+            import textual
+            textual_version = getattr(textual, '__version__', None)
+        except Exception:
+            textual_version = None
+        return {
+            'format': REPORT_FORMAT,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'archer_revision': _git_revision(),
+            'python': platform.python_version(),
+            'textual': textual_version,
+            'phases_ms': {name: round(self.phases[name] * 1000, 2) for name in PHASES if name in self.phases},
+            'session_s': round(session_s, 3),
+            'loop_lag_ms': {
+                'samples': len(lags),
+                'p50': round(_percentile(lags, 50) * 1000, 2),
+                'p95': round(_percentile(lags, 95) * 1000, 2),
+                'p99': round(_percentile(lags, 99) * 1000, 2),
+                'max': round(self._lag_max * 1000, 2),
+            },
+            'sampling': {
+                'interval_ms': self.sample_interval * 1000,
+                'samples': self.sample_count,
+                'top_functions': self._function_counts(),
+                'stacks': dict(self.stacks.most_common()),
+            },
+        }
+
+    def write(self, path: Optional[str] = None) -> Path:
+        """Write the JSON report and return its path."""
+        if path:
+            target = Path(path).expanduser()
+        else:
+            from .lib import state_dir
+            target = state_dir() / 'profiles' / time.strftime('archer-tui-%Y%m%d-%H%M%S.json')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'w') as fh:
+            json.dump(self.report(), fh, indent=2)
+        return target
+
+
+def _git_revision() -> Optional[str]:
+    """Short commit id of the checkout, read without running git."""
+    git_dir = Path(__file__).resolve().parents[2] / '.git'
+    try:
+        head = (git_dir / 'HEAD').read_text().strip()
+        if head.startswith('ref: '):
+            ref = head[5:]
+            ref_file = git_dir / ref
+            if ref_file.exists():
+                return ref_file.read_text().strip()[:12]
+            packed = git_dir / 'packed-refs'
+            if packed.exists():
+                for line in packed.read_text().splitlines():
+                    if line.endswith(' ' + ref):
+                        return line.split(' ', 1)[0][:12]
+            return None
+        return head[:12]
+    except OSError:
+        return None
+
+
+def compare(old: Dict, new: Dict) -> str:
+    """Render a side-by-side comparison of two profile reports."""
+    rows = [f"{'metric':<24}{'old':>12}{'new':>12}{'delta':>12}"]
+
+    def row(name, a, b):
+        if a is None and b is None:
+            return
+        delta = '' if a is None or b is None else f"{b - a:+.1f}"
+        fa = '-' if a is None else f"{a:.1f}"
+        fb = '-' if b is None else f"{b:.1f}"
+        rows.append(f"{name:<24}{fa:>12}{fb:>12}{delta:>12}")
+
+    for phase in PHASES:
+        row(f"{phase} (ms)", old.get('phases_ms', {}).get(phase), new.get('phases_ms', {}).get(phase))
+    for key in ('p50', 'p95', 'p99', 'max'):
+        row(f"loop lag {key} (ms)", old.get('loop_lag_ms', {}).get(key), new.get('loop_lag_ms', {}).get(key))
+    return '\n'.join(rows)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect archer-tui --profile reports')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_show = sub.add_parser('show', help='Print phase timings and top functions of a report')
+    p_show.add_argument('report')
+    p_cmp = sub.add_parser('compare', help='Compare two reports')
+    p_cmp.add_argument('old')
+    p_cmp.add_argument('new')
+    args = parser.parse_args(argv)
+
+    if args.cmd == 'compare':
+        with open(args.old) as fa, open(args.new) as fb:
+            print(compare(json.load(fa), json.load(fb)))
+        return 0
+
+    with open(args.report) as fh:
+        report = json.load(fh)
+    for phase in PHASES:
+        value = report.get('phases_ms', {}).get(phase)
+        if value is not None:
+            print(f"{phase + ' (ms)':<24}{value:>12.1f}")
+    for key, value in report.get('loop_lag_ms', {}).items():
+        print(f"{'loop lag ' + key:<24}{value:>12}")
+    print()
+    print(f"{'self':>6} {'total':>6}  function")
+    for entry in report.get('sampling', {}).get('top_functions', []):
+        print(f"{entry['self']:>6} {entry['total']:>6}  {entry['function']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""FIFO-based prompt channel between installer scripts and the running TUI.
+
+Installer scripts ask questions through `confirm_action` and
+`archer_prompt_secret` in common-funcs.sh. When they run under the TUI,
+those helpers send the request to the already-running app instead of
+starting a second Textual application.
+
+Named pipes are used because bash can talk to them without starting any
+extra process. Protocol (one request per line, tab separated):
+
+    <kind>\\t<reply-fifo>\\t<message>\\n      kind is 'confirm' or 'secret'
+
+The client creates `<reply-fifo>` inside the channel directory, holds it
+open for reading, writes the request and reads one reply line:
+
+    ok\\t<value>\\n      confirmed / secret entered
+    cancel\\t\\n         declined
+
+Requests are answered one at a time so only one modal is on screen.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+from typing import Awaitable, Callable, Dict, Optional
+
+PROMPT_ENV = 'ARCHER_PROMPT_FIFO'
+PROMPT_KINDS = ('confirm', 'secret')
+# Requests longer than this are dropped; writes up to PIPE_BUF are atomic
+MAX_REQUEST_BYTES = 4096
+
+# handler(kind, message) -> value, or None when the user declined
+PromptHandler = Callable[[str, str], Awaitable[Optional[str]]]
+
+
+class PromptChannel:
+    """Serve prompt requests from child scripts with an async handler."""
+
+    def __init__(self, handler: PromptHandler):
+        self.handler = handler
+        self.fifo_path: Optional[str] = None
+        self._dir: Optional[str] = None
+        self._fd: Optional[int] = None
+        self._buf = bytearray()
+        self._lock = asyncio.Lock()
+        self._tasks = set()
+
+    async def start(self):
+        if self._fd is not None:
+            return
+        self._dir = tempfile.mkdtemp(prefix='archer-prompt-')
+        os.chmod(self._dir, 0o700)
+        self.fifo_path = os.path.join(self._dir, 'requests')
+        os.mkfifo(self.fifo_path, 0o600)
+        # O_RDWR keeps a writer open ourselves, so the FIFO never reports EOF
+        # between clients and opening it never blocks.
+        self._fd = os.open(self.fifo_path, os.O_RDWR | os.O_NONBLOCK)
+        asyncio.get_running_loop().add_reader(self._fd, self._on_readable)
+
+    def child_env(self) -> Dict[str, str]:
+        if self.fifo_path is None:
+            return {}
+        return {PROMPT_ENV: self.fifo_path}
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, MAX_REQUEST_BYTES)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            return
+        self._buf.extend(data)
+        while True:
+            nl = self._buf.find(b'\n')
+            if nl == -1:
+                if len(self._buf) > MAX_REQUEST_BYTES:
+                    self._buf.clear()
+                return
+            line = bytes(self._buf[:nl]).decode('utf-8', errors='replace')
+            del self._buf[:nl + 1]
+            task = asyncio.create_task(self._serve(line))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _reply_path_ok(self, path: str) -> bool:
+        # Only answer into FIFOs inside our private directory
+        try:
+            return os.path.dirname(os.path.realpath(path)) == os.path.realpath(self._dir)
+        except Exception:
+            return False
+
+    async def _serve(self, line: str):
+        parts = line.split('\t', 2)
+        if len(parts) != 3:
+            return
+        kind, reply_path, message = parts
+        if kind not in PROMPT_KINDS or not self._reply_path_ok(reply_path):
+            return
+        async with self._lock:
+            try:
+                value = await self.handler(kind, message)
+            except Exception:
+                value = None
+        if value is None:
+            reply = 'cancel\t\n'
+        else:
+            reply = 'ok\t' + value.replace('\n', ' ') + '\n'
+        try:
+            fd = os.open(reply_path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            # Client went away before we answered
+            return
+        try:
+            os.write(fd, reply.encode('utf-8'))
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._fd is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._fd)
+            except Exception:
+                pass
+            os.close(self._fd)
+            self._fd = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self.fifo_path = None
+
+
+__all__ = ['PromptChannel', 'PROMPT_ENV']
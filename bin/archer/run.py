@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""Headless batch runner for unattended provisioning.
+
+Runs installer scripts without Textual or Rich: targets are resolved
+against ArcherMenu discovery, each job is streamed through archer.runner
+and its output is written as plain prefixed lines (or JSON lines with
+--format jsonl). Jobs are recorded in the run history like in the TUI.
+
+    python3 -m archer.run development/system-programming/rust 'development/database-tools/*'
+    archer.sh run -j 2 development/editors/neovim development/terminals
+    archer.sh run --profile developer
+
+Targets:
+
+    menu/key/script    one script (install/menu/key/script.sh)
+    menu/key           the menu's install.sh (Install All)
+    menu/key/*         every script of the menu; glob patterns match one
+                       path component per '*' and only select scripts
+
+--dry-run only prints the plan and, where pacman's sync databases are
+available, what its packages would download and install (archer.pacman_db).
+
+--profile runs the cached execution plan of an install profile (see
+archer.profiles) stage by stage instead of a target list.
+
+Scripts run with ARCHER_NONINTERACTIVE=1, so confirmations take their
+defaults. Scripts that need root use sudo as usual: run as root, rely on
+NOPASSWD rules, or pass --sudo ask / --sudo stdin to validate once and
+serve the password to every job through archer.sudo_broker.
+
+--isolate runs every job in a systemd user scope with reduced CPU and I/O
+weight and a memory ceiling, or under nice/ionice (archer.isolation).
+
+-j auto adapts the number of concurrent jobs (in a profile: of its
+parallel stages) to the machine: starting at two, it grows while CPU,
+memory and I/O pressure stay low and shrinks when they stall, up to one
+job per CPU (archer.pressure).
+
+Scripts unchanged since their last successful run (same content, same
+referenced environment, same installed package versions) are skipped,
+including those run by a menu's install.sh; --force runs them anyway
+(archer.skip_cache).
+"""
+import asyncio
+import fnmatch
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .lib import ArcherMenu, ArcherUI
+from .pacman_progress import PacmanProgressParser
+from .runner import ResourceUsage, start_job
+
+# Exit code when at least one job failed or was skipped
+EXIT_FAILED = 1
+# Jobs per parallel stage of a profile when -j is not given
+PROFILE_JOBS = 4
+# -j value that sizes parallel stages from system pressure
+AUTO_JOBS = 'auto'
+GLOB_CHARS = '*?['
+
+
+@dataclass
+class Target:
+    """A runnable unit: a script or a menu's install.sh."""
+
+    name: str
+    script: str
+    is_menu: bool = False
+    # Shell command to run instead of the script (profile package steps)
+    command: str = ''
+
+
+@dataclass
+class RunResult:
+    target: Target
+    rc: Optional[int] = None
+    usage: Optional[ResourceUsage] = None
+    skipped: bool = False
+    error: str = ''
+    # Not run: unchanged since its last successful run
+    unchanged: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.rc == 0
+
+
+def available_targets(menu: ArcherMenu) -> Dict[str, Target]:
+    """Every target name the menus provide, menus before their scripts."""
+    targets: Dict[str, Target] = {}
+    for menu_key in sorted(menu.discovered_menus):
+        meta = menu.discovered_menus[menu_key]
+        if meta.get('install'):
+            targets[menu_key] = Target(menu_key, meta['install'], is_menu=True)
+        _, _, options = menu.get_menu_options_filtered(menu_key)
+        for option in options:
+            name = f"{menu_key}/{Path(option['target']).stem}"
+            targets.setdefault(name, Target(name, option['target']))
+    return targets
+
+
+def _glob_match(name: str, pattern: str) -> bool:
+    parts, pattern_parts = name.split('/'), pattern.split('/')
+    return len(parts) == len(pattern_parts) and all(
+        fnmatch.fnmatchcase(p, q) for p, q in zip(parts, pattern_parts))
+
+
+def resolve_targets(menu: ArcherMenu, patterns: List[str]) -> List[Target]:
+    """Expand target names and globs in order, without duplicates.
+
+    Raises ValueError naming the patterns that matched nothing.
+    """
+    available = available_targets(menu)
+    resolved: List[Target] = []
+    seen = set()
+    unmatched = []
+    for pattern in patterns:
+        pattern = pattern.strip('/')
+        if any(c in pattern for c in GLOB_CHARS):
+            matches = [t for name, t in available.items() if not t.is_menu and _glob_match(name, pattern)]
+        else:
+            matches = [available[pattern]] if pattern in available else []
+        if not matches:
+            unmatched.append(pattern)
+        for target in matches:
+            if target.name not in seen:
+                seen.add(target.name)
+                resolved.append(target)
+    if unmatched:
+        raise ValueError(f"no such target: {', '.join(unmatched)}")
+    return resolved
+
+
+class TextReporter:
+    """`name | line` output, one line per event, safe to interleave."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.width = 0
+
+    def _write(self, text: str):
+        self.stream.write(text + '\n')
+        self.stream.flush()
+
+    def plan(self, targets: List[Target]):
+        self.width = max((len(t.name) for t in targets), default=0)
+        for t in targets:
+            self._write(f"plan  {t.name:<{self.width}}  {t.script or t.command}")
+
+    def estimate(self, result):
+        from .pacman_db import summary_line
+        self._write(f"size  {summary_line(result)}")
+
+    def stage(self, index: int, count: int, targets: List[Target], jobs: int):
+        self._write(f"stage {index}/{count} {len(targets)} job(s), {jobs} at a time")
+
+    def concurrency(self, limit: int, max_jobs: int, reason: str, pressure=None):
+        seen = f" ({pressure.describe()})" if pressure is not None else ''
+        self._write(f"jobs  {limit} of {max_jobs} at a time: {reason}{seen}")
+
+    def start(self, target: Target):
+        self._write(f"start {target.name}")
+
+    def line(self, target: Target, text: str):
+        self._write(f"{target.name:<{self.width}} | {text}")
+
+    def progress(self, target: Target, percent: int, status: str):
+        pass
+
+    def end(self, result: RunResult):
+        if result.skipped:
+            self._write(f"skip  {result.target.name}{': ' + result.error if result.error else ''}")
+            return
+        if result.unchanged:
+            self._write(f"skip  {result.target.name}: unchanged since last successful run")
+            return
+        usage = result.usage
+        timing = f" {usage.wall_s:.1f}s wall {usage.cpu_s:.1f}s cpu" if usage else ''
+        state = 'ok   ' if result.ok else 'FAIL '
+        self._write(f"{state} {result.target.name} rc={result.rc}{timing}{' ' + result.error if result.error else ''}")
+
+    def summary(self, results: List[RunResult], elapsed: float):
+        failed = [r for r in results if not r.ok and not r.skipped]
+        skipped = [r for r in results if r.skipped]
+        unchanged = sum(r.unchanged for r in results)
+        self._write(f"done  {len(results) - len(failed) - len(skipped)} ok"
+                    f"{f' ({unchanged} unchanged)' if unchanged else ''}, {len(failed)} failed, "
+                    f"{len(skipped)} skipped in {elapsed:.1f}s")
+
+
+class JsonReporter:
+    """One JSON object per line: plan, start, line, progress, end, summary."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def _emit(self, event: str, **fields):
+        fields = {'event': event, 'time': round(time.time(), 3), **fields}
+        self.stream.write(json.dumps(fields, separators=(',', ':')) + '\n')
+        self.stream.flush()
+
+    def plan(self, targets: List[Target]):
+        self._emit('plan', targets=[{'name': t.name, 'script': t.script or None, 'command': t.command or None,
+                                     'menu': t.is_menu} for t in targets])
+
+    def estimate(self, result):
+        self._emit('estimate', install=[p.name for p in result.install], satisfied=result.satisfied,
+                   unknown=result.unknown, download_bytes=result.download_bytes,
+                   installed_bytes=result.installed_bytes)
+
+    def stage(self, index: int, count: int, targets: List[Target], jobs: int):
+        self._emit('stage', index=index, count=count, targets=[t.name for t in targets], jobs=jobs)
+
+    def concurrency(self, limit: int, max_jobs: int, reason: str, pressure=None):
+        self._emit('concurrency', limit=limit, max_jobs=max_jobs, reason=reason,
+                   pressure=asdict(pressure) if pressure is not None else None)
+
+    def start(self, target: Target):
+        self._emit('start', target=target.name, script=target.script)
+
+    def line(self, target: Target, text: str):
+        self._emit('line', target=target.name, text=text)
+
+    def progress(self, target: Target, percent: int, status: str):
+        self._emit('progress', target=target.name, percent=percent, status=status)
+
+    def end(self, result: RunResult):
+        self._emit('end', target=result.target.name, rc=result.rc, skipped=result.skipped,
+                   unchanged=result.unchanged, error=result.error or None, usage=result.usage.as_dict() if result.usage else None)
+
+    def summary(self, results: List[RunResult], elapsed: float):
+        self._emit('summary', ok=sum(r.ok for r in results), failed=sum(not r.ok and not r.skipped for r in results),
+                   skipped=sum(r.skipped for r in results), unchanged=sum(r.unchanged for r in results),
+                   elapsed_s=round(elapsed, 3))
+
+
+REPORTERS: Dict[str, Callable] = {'text': TextReporter, 'jsonl': JsonReporter}
+
+
+@dataclass
+class BatchRunner:
+    """Run targets with bounded parallelism and report as they go."""
+
+    archer_dir: str
+    reporter: object
+    jobs: int = 1
+    fail_fast: bool = False
+    use_pty: bool = False
+    env: Dict[str, str] = field(default_factory=dict)
+    history: Optional[object] = None  # archer.history.RunHistory
+    # archer.isolation.JobLimits, or None to run jobs unrestricted
+    limits: Optional[object] = None
+    # Treat `jobs` as a ceiling and follow system pressure below it
+    adaptive: bool = False
+    # archer.skip_cache.SkipCache recording successful scripts, or None
+    skip_cache: Optional[object] = None
+    # Skip scripts the cache reports unchanged
+    skip_unchanged: bool = False
+    _failed: bool = field(default=False, init=False)
+
+    def _cacheable(self, target: Target) -> bool:
+        return (self.skip_cache is not None and bool(target.script) and not target.is_menu
+                and not target.command)
+
+    async def run_one(self, target: Target) -> RunResult:
+        result = RunResult(target)
+        if self.skip_unchanged and self._cacheable(target):
+            try:
+                unchanged, _reason = await asyncio.to_thread(self.skip_cache.check, target.script, self.env)
+            except Exception:
+                unchanged = False
+            if unchanged:
+                result.rc, result.unchanged = 0, True
+                self.reporter.end(result)
+                return result
+        command = target.command or f"bash '{target.script}'"
+        command = f"cd '{self.archer_dir}' && {command}"
+        parser = PacmanProgressParser()
+        last_percent = -1
+        self.reporter.start(target)
+        job = None
+        try:
+            job = await start_job(command, env=self.env, use_pty=self.use_pty, limits=self.limits)
+            async for text, transient in job.lines():
+                update = parser.feed(text.strip())
+                if update is not None and update.overall != last_percent:
+                    last_percent = update.overall
+                    self.reporter.progress(target, update.overall, update.status)
+                if not transient:
+                    self.reporter.line(target, text)
+            result.rc = await job.wait()
+            result.usage = job.usage
+        except Exception as e:
+            result.error = str(e)
+        finally:
+            if job is not None and job.returncode is None:
+                # Interrupted: jobs run in their own session and do not see
+                # the terminal's SIGINT, so stop their process tree here
+                await job.terminate()
+            if job is not None:
+                job.close()
+        if result.usage is not None:
+            result.usage.download_bytes = parser.download_bytes
+            if self.history is not None:
+                try:
+                    await asyncio.to_thread(self.history.record, target.name, command, target.script,
+                                            result.rc, result.usage)
+                except Exception as e:
+                    result.error = f"history not recorded: {e}"
+        if result.rc is not None and self._cacheable(target):
+            try:
+                if result.ok:
+                    await asyncio.to_thread(self.skip_cache.record, target.script, self.env)
+                else:
+                    await asyncio.to_thread(self.skip_cache.forget, target.script)
+            except Exception:
+                pass
+        self.reporter.end(result)
+        return result
+
+    def _slots(self, count: int):
+        jobs = max(1, min(self.jobs, count))
+        if not self.adaptive or jobs == 1:
+            return asyncio.Semaphore(jobs)
+        from .pressure import AdaptiveLimit
+
+        def changed(limit, pressure, reason):
+            self.reporter.concurrency(limit, jobs, reason, pressure)
+        gate = AdaptiveLimit(max_jobs=jobs, on_change=changed)
+        self.reporter.concurrency(gate.limit, jobs, 'start')
+        return gate
+
+    async def run(self, targets: List[Target]) -> List[RunResult]:
+        slots = self._slots(len(targets))
+
+        async def guarded(target: Target) -> RunResult:
+            async with slots:
+                if self._failed and self.fail_fast:
+                    result = RunResult(target, skipped=True, error='earlier job failed')
+                    self.reporter.end(result)
+                    return result
+                result = await self.run_one(target)
+                if not result.ok:
+                    self._failed = True
+                return result
+
+        adaptive = not isinstance(slots, asyncio.Semaphore)
+        if adaptive:
+            slots.start()
+        try:
+            return list(await asyncio.gather(*(guarded(t) for t in targets)))
+        finally:
+            if adaptive:
+                await slots.stop()
+
+
+def child_env(archer_dir: str) -> Dict[str, str]:
+    env = os.environ.copy()
+    env['ARCHER_DIR'] = archer_dir
+    env.setdefault('ARCHER_NONINTERACTIVE', '1')
+    env.setdefault('AUTO_CONFIRM', '1')
+    # No front end is listening for prompts
+    env.pop('ARCHER_PROMPT_FIFO', None)
+    return env
+
+
+async def _run(args, stages: List[Tuple[List[Target], int]], archer_dir: str) -> int:
+    """Run `(targets, jobs)` stages in order."""
+    from .sudo_broker import SudoBroker
+
+    reporter = REPORTERS[args.format]()
+    planned = [t for targets, _jobs in stages for t in targets]
+    reporter.plan(planned)
+    if args.dry_run:
+        from .pacman_db import estimate_scripts
+        # Profile package steps carry their merged package list in the command
+        packages = [word for t in planned if t.command.startswith('sudo pacman -S')
+                    for word in t.command.split()[3:] if not word.startswith('-')]
+        result = estimate_scripts([t.script for t in planned if t.script and not t.is_menu], packages)
+        if result is not None:
+            reporter.estimate(result)
+        return 0
+
+    env = child_env(archer_dir)
+    broker = SudoBroker()
+    try:
+        if args.sudo != 'none':
+            if args.sudo == 'ask':
+                import getpass
+                password = getpass.getpass('[archer-run] sudo password: ')
+            else:
+                password = sys.stdin.readline().rstrip('\n')
+            if not await broker.validate(password):
+                print('[archer-run] Could not validate sudo credentials', file=sys.stderr)
+                return EXIT_FAILED
+            env.update(broker.child_env())
+
+        history = None
+        if not args.no_history:
+            from .history import RunHistory
+            history = RunHistory()
+        from .isolation import limits_for
+        from .skip_cache import SKIP_ENV, SkipCache, enabled
+        # Menu install.sh runs check their scripts in execute_with_progress
+        skip_unchanged = not args.force and enabled(default=True)
+        env[SKIP_ENV] = '1' if skip_unchanged else '0'
+        runner = BatchRunner(archer_dir=archer_dir, reporter=reporter, fail_fast=args.fail_fast,
+                             use_pty=args.pty, env=env, history=history, limits=limits_for(args.isolate),
+                             adaptive=args.jobs == AUTO_JOBS, skip_cache=SkipCache(),
+                             skip_unchanged=skip_unchanged)
+        started = time.monotonic()
+        results: List[RunResult] = []
+        for index, (targets, jobs) in enumerate(stages, 1):
+            if len(stages) > 1:
+                reporter.stage(index, len(stages), targets, jobs)
+            runner.jobs = jobs
+            results.extend(await runner.run(targets))
+        reporter.summary(results, time.monotonic() - started)
+        return 0 if all(r.ok for r in results) else EXIT_FAILED
+    finally:
+        await broker.close()
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run Archer installers without a user interface')
+    parser.add_argument('targets', nargs='*', metavar='TARGET', help='Menu key, menu/script or glob (see --list)')
+    parser.add_argument('-j', '--jobs', type=_jobs_arg, metavar='N|auto',
+                        help='Jobs to run at once (default 1, since package managers hold a global lock; '
+                             f'{PROFILE_JOBS} in the parallel stages of a profile). '
+                             "'auto' adapts it to CPU, memory and I/O pressure")
+    parser.add_argument('--profile', metavar='NAME', help='Run an install profile (see python3 -m archer.profiles)')
+    parser.add_argument('--format', choices=sorted(REPORTERS), default='text', help='Output format (default text)')
+    parser.add_argument('--fail-fast', action='store_true', help='Do not start new jobs after a failure')
+    parser.add_argument('--force', action='store_true',
+                        help='Run scripts even if unchanged since their last successful run')
+    parser.add_argument('--dry-run', action='store_true', help='Print the resolved targets and exit')
+    parser.add_argument('--list', action='store_true', help='List available targets and exit')
+    parser.add_argument('--pty', action='store_true', help='Run jobs under a pseudo-terminal')
+    parser.add_argument('--isolate', nargs='?', const='auto', choices=('off', 'auto', 'scope', 'nice'),
+                        help='Run jobs with lower CPU/IO priority and a memory limit '
+                             '(default auto; also ARCHER_ISOLATE, see archer.isolation)')
+    parser.add_argument('--sudo', choices=('none', 'ask', 'stdin'), default='none',
+                        help='Validate sudo once and serve it to jobs: prompt (ask) or read a line from stdin')
+    parser.add_argument('--no-history', action='store_true', help='Do not record runs in the history')
+    args = parser.parse_args(argv)
+
+    archer_dir = os.environ.get('ARCHER_DIR') or str(Path(__file__).resolve().parents[2])
+    if args.profile:
+        if args.targets or args.list:
+            parser.error('--profile takes no targets')
+        return asyncio.run(_run(args, _profile_stages(args), archer_dir))
+
+    menu = ArcherMenu(ArcherUI(verbose=False))
+
+    if args.list:
+        for name, target in available_targets(menu).items():
+            print(f"{name:<60} {'install all' if target.is_menu else 'script'}")
+        return 0
+    if not args.targets:
+        parser.error('no targets given (see --list)')
+    try:
+        targets = resolve_targets(menu, args.targets)
+    except ValueError as e:
+        parser.error(str(e))
+    return asyncio.run(_run(args, [(targets, _max_jobs(args.jobs, 1))], archer_dir))
+
+
+def _jobs_arg(value: str):
+    if value == AUTO_JOBS:
+        return value
+    try:
+        jobs = int(value)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        import argparse
+        raise argparse.ArgumentTypeError(f"expected a positive number or '{AUTO_JOBS}', got {value!r}")
+    return jobs
+
+
+def _max_jobs(jobs, default: int) -> int:
+    """Concurrency ceiling for a -j value (None: `default`, auto: one per CPU)."""
+    if jobs == AUTO_JOBS:
+        return os.cpu_count() or 1
+    return jobs or default
+
+
+def _profile_stages(args) -> List[Tuple[List[Target], int]]:
+    from .profiles import ProfileError, plan_for
+
+    try:
+        plan, _cached = plan_for(args.profile)
+    except ProfileError as e:
+        print(f"[archer-run] {e}", file=sys.stderr)
+        sys.exit(EXIT_FAILED)
+    jobs = _max_jobs(args.jobs, PROFILE_JOBS)
+    return [([Target(step.name, step.script, command=step.command) for step in stage.steps],
+             jobs if stage.parallel else 1) for stage in plan.stages]
+
+
+__all__ = ['BatchRunner', 'RunResult', 'Target', 'available_targets', 'resolve_targets']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""Streaming job runner shared by the Archer front ends.
+
+Starts an installer command and yields its output as it is produced. Two
+execution modes are available:
+
+- pipe mode (default): stdout/stderr are a pipe, which is what installers
+  have always seen from the TUI.
+- pty mode: the job runs with a pseudo-terminal on stdout/stderr. Programs
+  such as pacman, curl and cargo then keep line-buffered output and draw
+  their carriage-return progress rows, so progress arrives as a stream
+  instead of in bursts when a block buffer fills.
+
+Output is split on both '\\n' and '\\r'. Segments terminated by a bare '\\r'
+are progress redraws and are reported as transient so callers can update a
+progress bar without logging every frame.
+
+Every job also accounts for the resources it used (`Job.usage`, filled in
+by `Job.wait()`): wall time, CPU time, peak RSS and bytes read/written.
+While the job runs its process tree is sampled from /proc: CPU time is
+the sum of utime, stime, cutime and cstime over the live tree (a reaped
+process's time moves into its parent's cutime/cstime, so the sum only
+grows), which is per job and readable for processes run through sudo.
+Peak RSS and per-process I/O are sampled the same way. The
+getrusage(RUSAGE_CHILDREN) delta also catches processes that lived
+between two samples, but it is process wide, so it is only used for a
+job during which no other job ran (batch runs start several at once).
+
+Each job runs in its own session, and therefore its own process group,
+so the whole tree it starts (pacman, makepkg, compilers) can be stopped
+together: `Job.terminate()` sends SIGTERM to the group, gives it
+TERM_GRACE seconds to exit and then sends SIGKILL. Being in a separate
+session also means a Ctrl-C in the controlling terminal no longer reaches
+jobs directly; front ends terminate them when they are cancelled.
+
+This module does not import Textual or Rich.
+"""
+import asyncio
+import os
+import re
+import resource
+import signal
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Bytes requested per read from the job's output
+CHUNK_SIZE = 65536
+# A single line longer than this is flushed as-is to bound memory
+MAX_LINE_BYTES = 65536
+# Terminal size reported to jobs running under a pty
+PTY_COLUMNS = 120
+PTY_ROWS = 40
+# Pause reading from the pty when this many chunks are waiting
+PTY_HIGH_WATER = 64
+
+# Seconds between /proc samples of a running job's process tree
+SAMPLE_INTERVAL = 0.5
+# Units of ru_inblock / ru_oublock
+RUSAGE_BLOCK_BYTES = 512
+
+# Seconds a job's process group gets to exit after SIGTERM before SIGKILL
+TERM_GRACE = 5.0
+# Seconds between checks for a terminating group
+TERM_POLL = 0.05
+# Seconds between /proc scans for zombies once kill() says the group exists
+GROUP_SCAN_INTERVAL = 0.5
+
+# CSI / OSC escape sequences (colours, cursor movement, erase-line)
+ANSI_RE = re.compile(r'\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])')
+
+
+def strip_ansi(text: str) -> str:
+    """Remove terminal escape sequences from a line of output."""
+    if '\x1b' not in text:
+        return text
+    return ANSI_RE.sub('', text)
+
+
+class LineSplitter:
+    """Incrementally split a byte stream into lines and progress redraws.
+
+    `feed(data)` returns a list of `(text, transient)` tuples. `transient` is
+    True for segments ended by a bare carriage return, i.e. a progress row
+    the program is about to overwrite.
+    """
+
+    def __init__(self, encoding: str = 'utf-8'):
+        self._buf = bytearray()
+        self._encoding = encoding
+        # True when the previous chunk ended with '\r' and we have not yet
+        # seen whether a '\n' follows it.
+        self._pending_cr = False
+        self._last_cr_text = ''
+
+    def _decode(self, raw) -> str:
+        return bytes(raw).decode(self._encoding, errors='replace')
+
+    def feed(self, data: bytes) -> List[Tuple[str, bool]]:
+        out: List[Tuple[str, bool]] = []
+        if self._pending_cr:
+            self._pending_cr = False
+            if data[:1] == b'\n':
+                # '\r\n' split across chunks: the segment was already
+                # emitted as transient; re-emit it as the final line.
+                data = data[1:]
+                out.append((self._last_cr_text, False))
+        buf = self._buf
+        buf.extend(data)
+        start = 0
+        n = len(buf)
+        while start < n:
+            nl = buf.find(b'\n', start)
+            cr = buf.find(b'\r', start)
+            if nl == -1 and cr == -1:
+                break
+            if cr != -1 and (nl == -1 or cr < nl):
+                if cr + 1 == n:
+                    # Cannot tell yet whether this is '\r\n'
+                    self._last_cr_text = self._decode(buf[start:cr])
+                    out.append((self._last_cr_text, True))
+                    self._pending_cr = True
+                    start = n
+                    break
+                if buf[cr + 1] == 0x0A:
+                    out.append((self._decode(buf[start:cr]), False))
+                    start = cr + 2
+                else:
+                    out.append((self._decode(buf[start:cr]), True))
+                    start = cr + 1
+            else:
+                out.append((self._decode(buf[start:nl]), False))
+                start = nl + 1
+        del buf[:start]
+        if len(buf) > MAX_LINE_BYTES:
+            out.append((self._decode(buf), False))
+            buf.clear()
+        return out
+
+    def flush(self) -> List[Tuple[str, bool]]:
+        """Return whatever is left once the stream has ended."""
+        out: List[Tuple[str, bool]] = []
+        if self._pending_cr:
+            self._pending_cr = False
+            out.append((self._last_cr_text, False))
+        if self._buf:
+            out.append((self._decode(self._buf), False))
+            self._buf.clear()
+        return out
+
+
+class _PtyReader:
+    """Read the master side of a pty from the event loop.
+
+    Linux reports EIO on the master once every slave descriptor is closed;
+    that is treated as end of stream.
+    """
+
+    def __init__(self, fd: int):
+        self._fd = fd
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._paused = False
+        self._eof = False
+        self._closed = False
+        self._loop.add_reader(fd, self._on_readable)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, CHUNK_SIZE)
+        except OSError:
+            data = b''
+        if not data:
+            self._eof = True
+            self._loop.remove_reader(self._fd)
+            self._queue.put_nowait(b'')
+            return
+        self._queue.put_nowait(data)
+        if self._queue.qsize() >= PTY_HIGH_WATER:
+            self._paused = True
+            self._loop.remove_reader(self._fd)
+
+    async def read(self) -> bytes:
+        data = await self._queue.get()
+        if self._paused and not self._eof and self._queue.qsize() < PTY_HIGH_WATER // 2:
+            self._paused = False
+            self._loop.add_reader(self._fd, self._on_readable)
+        return data
+
+    def close(self):
+        """Stop reading and close the master; safe to call more than once."""
+        if self._closed:
+            return
+        # The fd number may be reused once closed, so it is closed only once
+        self._closed = True
+        try:
+            self._loop.remove_reader(self._fd)
+        except Exception:
+            pass
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+def _open_pty() -> Tuple[int, int]:
+    """Open a pty pair sized for progress bars, without CRLF translation."""
+    import fcntl
+    import pty
+    import struct
+    import termios
+
+    master, slave = pty.openpty()
+    try:
+        attrs = termios.tcgetattr(slave)
+        # Keep '\n' as-is so the splitter does not see '\r\n' everywhere
+        attrs[1] &= ~termios.ONLCR
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack('HHHH', PTY_ROWS, PTY_COLUMNS, 0, 0))
+    except Exception:
+        pass
+    return master, slave
+
+
+@dataclass
+class ResourceUsage:
+    """Resources consumed by a job and every process it started."""
+
+    wall_s: float = 0.0
+    user_s: float = 0.0
+    system_s: float = 0.0
+    peak_rss_kib: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    # Filled in by callers that know what was fetched (e.g. pacman output)
+    download_bytes: int = 0
+
+    @property
+    def cpu_s(self) -> float:
+        return self.user_s + self.system_s
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+_PAGE_KIB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+
+
+def _proc_children(pid: int) -> List[int]:
+    children: List[int] = []
+    try:
+        tids = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return children
+    for tid in tids:
+        try:
+            with open(f'/proc/{pid}/task/{tid}/children') as fh:
+                children.extend(int(c) for c in fh.read().split())
+        except (OSError, ValueError):
+            continue
+    return children
+
+
+def _proc_io(pid: int) -> Optional[Tuple[int, int]]:
+    """(read_bytes, write_bytes) of a process, including reaped children.
+
+    Unreadable for processes of other users (e.g. running under sudo).
+    """
+    try:
+        with open(f'/proc/{pid}/io') as fh:
+            fields = dict(line.split(': ', 1) for line in fh.read().splitlines() if ': ' in line)
+        return int(fields.get('read_bytes', 0)), int(fields.get('write_bytes', 0))
+    except (OSError, ValueError):
+        return None
+
+
+def _proc_rss_kib(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/statm') as fh:
+            return int(fh.read().split()[1]) * _PAGE_KIB
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def _proc_cpu_ticks(pid: int) -> Optional[Tuple[int, int]]:
+    """(user, system) clock ticks of a process and its reaped children."""
+    try:
+        with open(f'/proc/{pid}/stat') as fh:
+            fields = fh.read().rsplit(')', 1)[1].split()
+        # Fields after the command name start at state; utime is field 14
+        utime, stime, cutime, cstime = (int(f) for f in fields[11:15])
+    except (OSError, ValueError, IndexError):
+        return None
+    return utime + cutime, stime + cstime
+
+
+def _group_running(pgid: int) -> bool:
+    """Whether process group `pgid` has a member that is not a zombie."""
+    try:
+        pids = [name for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        # No /proc: trust kill(), which also counts zombies
+        return True
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as fh:
+                fields = fh.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        # Fields after the command name: state, ppid, pgrp, ...
+        if len(fields) > 2 and fields[2] == str(pgid) and fields[0] != 'Z':
+            return True
+    return False
+
+
+class _UsageTracker:
+    """Samples a job's process tree and computes its ResourceUsage."""
+
+    # Trackers of the jobs currently running in this process
+    _active = set()
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._started = time.perf_counter()
+        self._rusage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._peak_rss_kib = 0
+        self._read_bytes = 0
+        self._write_bytes = 0
+        self._user_ticks = 0
+        self._system_ticks = 0
+        # Set when another job ran at the same time, making the
+        # RUSAGE_CHILDREN delta useless for this one
+        self.overlapped = bool(self._active)
+        for other in self._active:
+            other.overlapped = True
+        self._active.add(self)
+        self._task: Optional[asyncio.Task] = None
+        if os.path.isdir('/proc/self/task'):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def sample(self):
+        """Sum RSS and I/O over the live tree rooted at the job."""
+        rss = 0
+        read = write = 0
+        user = system = 0
+        stack = [self.pid]
+        seen = set()
+        while stack:
+            pid = stack.pop()
+            if pid in seen:
+                continue
+            seen.add(pid)
+            rss += _proc_rss_kib(pid)
+            ticks = _proc_cpu_ticks(pid)
+            if ticks is not None:
+                user += ticks[0]
+                system += ticks[1]
+            io = _proc_io(pid)
+            if io is not None:
+                read += io[0]
+                write += io[1]
+            stack.extend(_proc_children(pid))
+        # Exited children are folded into their parent's counters when
+        # reaped, so the live-tree sum only grows
+        self._peak_rss_kib = max(self._peak_rss_kib, rss)
+        self._user_ticks = max(self._user_ticks, user)
+        self._system_ticks = max(self._system_ticks, system)
+        self._read_bytes = max(self._read_bytes, read)
+        self._write_bytes = max(self._write_bytes, write)
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+    def finish(self) -> ResourceUsage:
+        """Stop sampling; call once the job has been reaped."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._active.discard(self)
+        usage = ResourceUsage(
+            wall_s=time.perf_counter() - self._started,
+            user_s=self._user_ticks / _CLK_TCK,
+            system_s=self._system_ticks / _CLK_TCK,
+            peak_rss_kib=self._peak_rss_kib,
+            read_bytes=self._read_bytes,
+            write_bytes=self._write_bytes,
+        )
+        if self.overlapped:
+            return usage
+        before = self._rusage
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        # ru_maxrss is the largest child ever reaped; it only says something
+        # about this job when it grew
+        if after.ru_maxrss > before.ru_maxrss:
+            usage.peak_rss_kib = max(usage.peak_rss_kib, after.ru_maxrss)
+        usage.user_s = max(usage.user_s, after.ru_utime - before.ru_utime)
+        usage.system_s = max(usage.system_s, after.ru_stime - before.ru_stime)
+        usage.read_bytes = max(usage.read_bytes, (after.ru_inblock - before.ru_inblock) * RUSAGE_BLOCK_BYTES)
+        usage.write_bytes = max(usage.write_bytes, (after.ru_oublock - before.ru_oublock) * RUSAGE_BLOCK_BYTES)
+        return usage
+
+
+class Job:
+    """A running installer command and its output stream."""
+
+    def __init__(self, proc: asyncio.subprocess.Process, pty_reader: Optional[_PtyReader] = None):
+        self.proc = proc
+        self._pty_reader = pty_reader
+        self._tracker = _UsageTracker(proc.pid)
+        # Set by wait() once the job has exited
+        self.usage: Optional[ResourceUsage] = None
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.proc.returncode
+
+    async def _read_chunk(self) -> bytes:
+        if self._pty_reader is not None:
+            return await self._pty_reader.read()
+        assert self.proc.stdout is not None
+        return await self.proc.stdout.read(CHUNK_SIZE)
+
+    async def lines(self) -> AsyncIterator[Tuple[str, bool]]:
+        """Yield `(text, transient)` for each line or progress redraw.
+
+        Text is decoded, stripped of trailing whitespace and, in pty mode,
+        of terminal escape sequences.
+        """
+        splitter = LineSplitter()
+        clean = strip_ansi if self._pty_reader is not None else (lambda s: s)
+        try:
+            while True:
+                chunk = await self._read_chunk()
+                if not chunk:
+                    break
+                for text, transient in splitter.feed(chunk):
+                    yield clean(text).rstrip(), transient
+            # Output closed: the job is exiting, take a last look at the tree
+            self._tracker.sample()
+            for text, transient in splitter.flush():
+                yield clean(text).rstrip(), transient
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the pty reader.
+
+        Callers that leave `async for ... in job.lines()` early do not close
+        the generator, so kill(), terminate() and wait() call this too.
+        """
+        if self._pty_reader is not None:
+            self._pty_reader.close()
+
+    async def wait(self) -> int:
+        if self.proc.returncode is None:
+            # Last look before the shell is reaped and its times disappear
+            self._tracker.sample()
+        rc = await self.proc.wait()
+        self.close()
+        if self.usage is None:
+            self.usage = self._tracker.finish()
+        return rc
+
+    def _signal_group(self, sig: int):
+        try:
+            os.killpg(self.proc.pid, sig)
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            # Only members running as another user are left (e.g. under
+            # sudo, which relays SIGTERM to its command itself)
+            pass
+
+    def _group_exists(self) -> bool:
+        """Whether kill() still finds the job's group (zombies included)."""
+        try:
+            os.killpg(self.proc.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def group_alive(self) -> bool:
+        """Whether any process of the job's group is still running."""
+        # Zombies count for kill(); they exit nothing and hold no locks
+        return self._group_exists() and _group_running(self.proc.pid)
+
+    async def _wait_group(self, deadline: float) -> bool:
+        """Wait until the group has gone; False when `deadline` passes first.
+
+        kill(0) is polled every TERM_POLL. A group that only holds zombies
+        (whose parent has not reaped them yet) still exists for kill(), so
+        every GROUP_SCAN_INTERVAL /proc is scanned, off the event loop.
+        """
+        # First scan as soon as the shell is reaped
+        next_scan = 0.0
+        while True:
+            if self.proc.returncode is None or self._group_exists():
+                now = time.monotonic()
+                if now >= deadline:
+                    return False
+                if self.proc.returncode is not None and now >= next_scan:
+                    if not await asyncio.to_thread(_group_running, self.proc.pid):
+                        return True
+                    next_scan = time.monotonic() + GROUP_SCAN_INTERVAL
+                await asyncio.sleep(TERM_POLL)
+            else:
+                return True
+
+    def kill(self):
+        """SIGKILL the job's whole process group at once."""
+        self._signal_group(signal.SIGKILL)
+        self.close()
+
+    async def terminate(self, grace: float = TERM_GRACE) -> int:
+        """Stop the job's process tree: SIGTERM, then SIGKILL after `grace`.
+
+        Returns the job's exit status once the shell has been reaped.
+        """
+        if self.proc.returncode is None or self._group_exists():
+            self._signal_group(signal.SIGTERM)
+            if not await self._wait_group(time.monotonic() + grace):
+                self._signal_group(signal.SIGKILL)
+        return await self.wait()
+
+
+async def start_job(command: str, env: Optional[Dict[str, str]] = None, use_pty: bool = False,
+                    limits=None) -> Job:
+    """Start `command` through the shell and return a Job streaming its output.
+
+    stdin is always /dev/null so a job can never block waiting for input
+    from the front end. The job leads a new session (see Job.terminate).
+    `limits` (archer.isolation.JobLimits) runs it with lower priority.
+    """
+    if limits is not None:
+        command = limits.wrap(command)
+    if not use_pty:
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            stdin=asyncio.subprocess.DEVNULL,
+            env=env,
+            start_new_session=True,
+        )
+        return Job(proc)
+
+    master, slave = _open_pty()
+    try:
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdout=slave,
+            stderr=slave,
+            stdin=asyncio.subprocess.DEVNULL,
+            env=env,
+            start_new_session=True,
+        )
+    except Exception:
+        os.close(master)
+        raise
+    finally:
+        # The child holds its own copy; closing ours lets EOF reach the master
+        os.close(slave)
+    return Job(proc, _PtyReader(master))
+
+
+__all__ = ['Job', 'LineSplitter', 'ResourceUsage', 'start_job', 'strip_ansi']
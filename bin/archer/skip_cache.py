@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Skip installer scripts that are unchanged since their last successful run.
+
+After a script succeeds its fingerprint is stored in a small SQLite
+database under the state directory (`lib.state_dir()/skip_cache.sqlite3`):
+
+- content: SHA-256 of the script and of the files it sources
+  (common-funcs.sh and friends), so editing either reruns it;
+- env: the values of the environment variables the script references,
+  minus the front ends' plumbing (VOLATILE_ENV);
+- packages: the installed version of every pacman/AUR package the script
+  installs (found by archer.profiles.analyze_script, read from pacman's
+  local database), so upgrades, downgrades and removals rerun it.
+
+A script whose fingerprint still matches is skipped; one that changed,
+failed last time or was never recorded runs again. Installs outside
+pacman (mise, cargo, curl | sh) are only covered by the content and env
+parts; `forget` clears an entry to force the next run.
+
+Install All uses this through execute_with_progress in common-funcs.sh when
+ARCHER_SKIP_UNCHANGED=1 (the TUI's Install All and `archer.run` set it
+unless it is 0 or --force is given):
+
+    python3 -m archer.skip_cache check install/development/editors/neovim.sh
+    python3 -m archer.skip_cache list
+    python3 -m archer.skip_cache forget --all
+"""
+import hashlib
+import json
+import os
+import re
+import socket
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SKIP_ENV = 'ARCHER_SKIP_UNCHANGED'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    script TEXT PRIMARY KEY,
+    recorded REAL NOT NULL,
+    host TEXT NOT NULL,
+    content TEXT NOT NULL,
+    env TEXT NOT NULL,
+    packages TEXT NOT NULL
+);
+"""
+
+# Set by the front ends or the shell for every job; they do not change
+# what a script installs
+VOLATILE_ENV = frozenset({
+    'ARCHER_ASKPASS_SOCKET', 'ARCHER_DIR', 'ARCHER_ISOLATE', 'ARCHER_NONINTERACTIVE', 'ARCHER_PROMPT_FIFO',
+    'ARCHER_STATE_DIR', 'ARCHER_TRACE', 'ARCHER_TUI', 'ARCHER_VERBOSE', 'AUTO_CONFIRM', SKIP_ENV, 'SUDO_ASKPASS',
+    'COLUMNS', 'LINES', 'OLDPWD', 'PWD', 'SHLVL', 'TERM', '_',
+})
+
+_VAR_RE = re.compile(r'\$\{?([A-Za-z_][A-Za-z0-9_]*)')
+_SOURCE_RE = re.compile(r'^\s*(?:source|\.)\s+["\']?([^"\'\s;]+)', re.MULTILINE)
+# Sourced files nested deeper than this are not followed
+MAX_SOURCE_DEPTH = 3
+
+
+def default_path() -> Path:
+    from .lib import state_dir
+    return state_dir() / 'skip_cache.sqlite3'
+
+
+def enabled(default: bool = False) -> bool:
+    """Whether $ARCHER_SKIP_UNCHANGED asks for unchanged scripts to be skipped."""
+    value = os.environ.get(SKIP_ENV, '').strip().lower()
+    if not value:
+        return default
+    return value not in ('0', 'off', 'no', 'false')
+
+
+def _archer_root() -> Path:
+    return Path(os.environ.get('ARCHER_DIR') or Path(__file__).resolve().parents[2])
+
+
+def _sourced(path: Path, text: str) -> List[Path]:
+    """Files `text` (the contents of `path`) sources, where they can be resolved."""
+    root = str(_archer_root())
+    found = []
+    for m in _SOURCE_RE.finditer(text):
+        name = m.group(1).replace('${ARCHER_DIR}', root).replace('$ARCHER_DIR', root)
+        if '$' in name or '`' in name:
+            continue
+        candidate = Path(name) if os.path.isabs(name) else path.parent / name
+        if candidate.is_file():
+            found.append(candidate)
+    return found
+
+
+def content_hash(script: str) -> Tuple[str, str]:
+    """(SHA-256 of the script and the files it sources, script text)."""
+    digest = hashlib.sha256()
+    path = Path(script)
+    text = path.read_text(errors='replace')
+    seen = set()
+    pending = [(path, text, 0)]
+    while pending:
+        current, body, depth = pending.pop(0)
+        key = str(current.resolve())
+        if key in seen:
+            continue
+        seen.add(key)
+        # Contents only, so the hash does not depend on where Archer is checked out
+        digest.update(body.encode('utf-8', 'surrogateescape'))
+        digest.update(b'\0')
+        if depth < MAX_SOURCE_DEPTH:
+            for sourced in _sourced(current, body):
+                try:
+                    pending.append((sourced, sourced.read_text(errors='replace'), depth + 1))
+                except OSError:
+                    continue
+    return digest.hexdigest(), text
+
+
+@dataclass
+class Fingerprint:
+    content: str
+    env: Dict[str, str] = field(default_factory=dict)
+    # Package name -> installed version, None when not installed
+    packages: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    def change_from(self, recorded: 'Fingerprint') -> str:
+        """Why this differs from `recorded`; '' when it does not."""
+        if self.content != recorded.content:
+            return 'script changed'
+        for name in sorted(set(self.env) | set(recorded.env)):
+            if self.env.get(name) != recorded.env.get(name):
+                return f"${name} changed"
+        for name, version in sorted(recorded.packages.items()):
+            now = self.packages.get(name)
+            if now != version:
+                if now is None:
+                    return f"{name} no longer installed"
+                return f"{name} {version or 'missing'} -> {now}"
+        return ''
+
+
+def fingerprint(script: str, env: Optional[Dict[str, str]] = None, local=None) -> Fingerprint:
+    """Fingerprint of `script` as it would run now with `env` (default: ours).
+
+    `local` is a pacman_db.LocalDb to reuse; package versions are empty
+    when pacman's database cannot be read.
+    """
+    env = os.environ if env is None else env
+    content, text = content_hash(script)
+    names = {m.group(1) for m in _VAR_RE.finditer(text)}
+    relevant = {name: env[name] for name in sorted(names) if name in env and name not in VOLATILE_ENV}
+    packages: Dict[str, Optional[str]] = {}
+    try:
+        from .profiles import analyze_script
+        info = analyze_script(script)
+        wanted = info.packages + info.aur
+    except Exception:
+        wanted = []
+    if wanted:
+        try:
+            if local is None:
+                from .pacman_db import LocalDb
+                local = LocalDb()
+            for name in wanted:
+                version = local.installed.get(name)
+                packages[name] = version if version is not None else ('provided' if name in local.provided else None)
+        except Exception:
+            packages = {}
+    return Fingerprint(content, relevant, packages)
+
+
+class SkipCache:
+    """Fingerprints of the last successful run of each script.
+
+    Connections are opened per call, like RunHistory, so lookups and
+    records can run in worker threads and concurrent batch jobs.
+    """
+
+    def __init__(self, path: Optional[os.PathLike] = None):
+        self.path = Path(path) if path else default_path()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def lookup(self, script: str) -> Optional[Fingerprint]:
+        if not self.path.exists():
+            return None
+        from .history import script_key
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT content, env, packages FROM entries WHERE script = ?',
+                               (script_key(script),)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return Fingerprint(row[0], json.loads(row[1]), json.loads(row[2]))
+
+    def check(self, script: str, env: Optional[Dict[str, str]] = None) -> Tuple[bool, str]:
+        """(unchanged, reason): whether `script` can be skipped, and why not."""
+        recorded = self.lookup(script)
+        if recorded is None:
+            return False, 'no successful run recorded'
+        try:
+            current = fingerprint(script, env)
+        except OSError as e:
+            return False, str(e)
+        reason = current.change_from(recorded)
+        return not reason, reason or 'unchanged since last successful run'
+
+    def record(self, script: str, env: Optional[Dict[str, str]] = None) -> None:
+        """Store the fingerprint of `script` after it succeeded."""
+        from .history import script_key
+        current = fingerprint(script, env)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (script, recorded, host, content, env, packages) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (script_key(script), time.time(), socket.gethostname(), current.content,
+                     json.dumps(current.env, sort_keys=True), json.dumps(current.packages, sort_keys=True)),
+                )
+        finally:
+            conn.close()
+
+    def forget(self, script: Optional[str] = None) -> int:
+        """Drop the entry of `script` (all entries when None); rows removed."""
+        if not self.path.exists():
+            return 0
+        from .history import script_key
+        conn = self._connect()
+        try:
+            with conn:
+                if script is None:
+                    return conn.execute('DELETE FROM entries').rowcount
+                return conn.execute('DELETE FROM entries WHERE script = ?', (script_key(script),)).rowcount
+        finally:
+            conn.close()
+
+    def entries(self) -> List[Dict]:
+        if not self.path.exists():
+            return []
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute('SELECT script, recorded, host, packages FROM entries ORDER BY script').fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect the cache of unchanged installer scripts')
+    parser.add_argument('--db', help='Cache database (default: state dir)')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_check = sub.add_parser('check', help='Exit 0 if SCRIPT is unchanged since its last success, else 1')
+    p_check.add_argument('script')
+    p_record = sub.add_parser('record', help='Record a successful run of SCRIPT')
+    p_record.add_argument('script')
+    p_forget = sub.add_parser('forget', help='Run SCRIPT again next time')
+    p_forget.add_argument('script', nargs='?')
+    p_forget.add_argument('--all', action='store_true', help='Forget every script')
+    sub.add_parser('list', help='Recorded scripts')
+    args = parser.parse_args(argv)
+
+    cache = SkipCache(args.db)
+    if args.cmd == 'check':
+        unchanged, reason = cache.check(args.script)
+        print(reason)
+        return 0 if unchanged else 1
+    if args.cmd == 'record':
+        try:
+            cache.record(args.script)
+        except (OSError, sqlite3.Error) as e:
+            print(f"not recorded: {e}", file=sys.stderr)
+            return 1
+        return 0
+    if args.cmd == 'forget':
+        if not args.all and not args.script:
+            parser.error('forget needs a SCRIPT or --all')
+        print(f"{cache.forget(None if args.all else args.script)} entr(ies) removed")
+        return 0
+    for row in cache.entries():
+        recorded = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['recorded']))
+        print(f"{recorded}  {row['host']:<16} {len(json.loads(row['packages'])):>3} pkg  {row['script']}")
+    return 0
+
+
+__all__ = ['Fingerprint', 'SKIP_ENV', 'SkipCache', 'enabled', 'fingerprint']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
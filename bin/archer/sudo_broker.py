@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""In-process sudo credential broker for the Archer front ends.
+
+One broker is owned by the running application. Once the user's password
+has been validated it:
+
+- keeps the sudo timestamp fresh from a single asyncio task instead of a
+  detached `while true; do sudo -n true; done` shell loop;
+- serves askpass requests over a Unix socket in a private (0700) runtime
+  directory. Child jobs get `SUDO_ASKPASS` pointing at the static
+  `askpass.py` helper plus `ARCHER_ASKPASS_SOCKET`, so no per-job script
+  containing the password is ever written to disk;
+- is torn down deterministically by `close()`, which cancels the refresh
+  task, stops the server, removes the socket directory and forgets the
+  password.
+
+Only processes running as the same uid may query the socket.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+# Seconds between timestamp refreshes (sudo's default timeout is 5 minutes)
+REFRESH_INTERVAL = 60
+
+ASKPASS_HELPER = Path(__file__).resolve().parent / 'askpass.py'
+SOCKET_ENV = 'ARCHER_ASKPASS_SOCKET'
+
+
+def _peer_uid(sock) -> Optional[int]:
+    """Return the uid of the process on the other end of a Unix socket."""
+    try:
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        _pid, uid, _gid = struct.unpack('3i', creds)
+        return uid
+    except (AttributeError, OSError):
+        return None
+
+
+class SudoBroker:
+    """Owns sudo credentials for the lifetime of an application session."""
+
+    def __init__(self, refresh_interval: int = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._password: Optional[str] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._runtime_dir: Optional[str] = None
+        self.socket_path: Optional[str] = None
+
+    @property
+    def validated(self) -> bool:
+        return self._password is not None
+
+    async def _sudo_validate(self, password: str) -> bool:
+        proc = await asyncio.create_subprocess_exec(
+            'sudo', '-S', '-v',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            await proc.communicate((password + '\n').encode('utf-8'))
+        except Exception:
+            pass
+        return (await proc.wait()) == 0
+
+    async def validate(self, password: str) -> bool:
+        """Check `password` with `sudo -S -v` and start serving it on success."""
+        if not await self._sudo_validate(password):
+            return False
+        self._password = password
+        await self._start_server()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        return True
+
+    async def _refresh_loop(self):
+        """Keep the sudo timestamp alive while the session runs."""
+        while self._password is not None:
+            await asyncio.sleep(self.refresh_interval)
+            proc = await asyncio.create_subprocess_exec(
+                'sudo', '-n', '-v',
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            if (await proc.wait()) != 0 and self._password is not None:
+                # Timestamp already expired; re-validate with the cached password
+                if not await self._sudo_validate(self._password):
+                    break
+
+    async def _start_server(self):
+        if self._server is not None:
+            return
+        self._runtime_dir = tempfile.mkdtemp(prefix='archer-sudo-')
+        os.chmod(self._runtime_dir, 0o700)
+        self.socket_path = os.path.join(self._runtime_dir, 'askpass.sock')
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            sock = writer.get_extra_info('socket')
+            if self._password is not None and sock is not None and _peer_uid(sock) == os.getuid():
+                writer.write((self._password + '\n').encode('utf-8'))
+                await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    def child_env(self) -> Dict[str, str]:
+        """Environment entries that let a child job's sudo use the broker."""
+        if not self.validated or not self.socket_path:
+            return {}
+        return {
+            'SUDO_ASKPASS': str(ASKPASS_HELPER),
+            SOCKET_ENV: self.socket_path,
+        }
+
+    async def close(self):
+        """Stop refreshing, stop serving and forget the password."""
+        self._password = None
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._refresh_task = None
+        if self._server is not None:
+            self._server.close()
+            try:
+                await self._server.wait_closed()
+            except Exception:
+                pass
+            self._server = None
+        if self._runtime_dir is not None:
+            shutil.rmtree(self._runtime_dir, ignore_errors=True)
+            self._runtime_dir = None
+        self.socket_path = None
+
+
+__all__ = ['SudoBroker', 'SOCKET_ENV']
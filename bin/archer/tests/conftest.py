@@ -0,0 +1,7 @@
+"""Make `archer` importable as in the front ends (bin/ on sys.path)."""
+import sys
+from pathlib import Path
+
+BIN = str(Path(__file__).resolve().parents[2])
+if BIN not in sys.path:
+    sys.path.insert(0, BIN)
@@ -0,0 +1,54 @@
+import pytest
+
+from archer.batch_progress import DEFAULT_JOB_SECONDS, BatchProgress
+from archer.eta import Prediction
+
+
+def test_jobs_are_weighted_by_prediction():
+    batch = BatchProgress()
+    batch.add('slow', Prediction(seconds=30.0, runs=2))
+    batch.add('fast', Prediction(seconds=10.0, runs=2))
+    # Unknown jobs weigh the median of the known ones
+    batch.add('new')
+    assert [job.weight for job in batch.jobs] == [30.0, 10.0, 20.0]
+    batch.update(1, 1.0)
+    assert batch.fraction() == pytest.approx(10 / 60)
+    assert batch.remaining_seconds() == pytest.approx(50.0)
+
+
+def test_without_history_jobs_weigh_the_same():
+    batch = BatchProgress()
+    for name in 'abcd':
+        batch.add(name)
+    assert {job.weight for job in batch.jobs} == {DEFAULT_JOB_SECONDS}
+    batch.update(0, 0.5)
+    batch.update(3, 0.5)
+    assert batch.fraction() == pytest.approx(0.25)
+
+
+def test_progress_never_moves_backwards_and_finish_completes():
+    batch = BatchProgress()
+    batch.add('a')
+    batch.add('b')
+    batch.update(0, 0.8)
+    batch.update(0, 0.3)
+    batch.update(1, 7.0)
+    assert [job.fraction for job in batch.jobs] == [0.8, 1.0]
+    assert batch.finished == 0
+    batch.finish(0)
+    assert batch.finished == 1
+    assert batch.fraction() == 1.0
+
+
+def test_frames_are_rate_limited_and_only_on_change():
+    batch = BatchProgress(max_fps=10)
+    batch.add('a')
+    assert batch.frame(now=100.0) == 0.0
+    # Nothing changed
+    assert batch.frame(now=100.5) is None
+    batch.update(0, 0.5)
+    assert batch.frame(now=100.55) == 0.5
+    batch.update(0, 0.6)
+    # Less than 1/10 s since the last frame
+    assert batch.frame(now=100.6) is None
+    assert batch.frame(now=100.7) == pytest.approx(0.6)
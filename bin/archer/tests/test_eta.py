@@ -0,0 +1,54 @@
+import pytest
+
+from archer.eta import ETA_CEILING, ETA_LINEAR_CAP, EtaClock, Prediction, format_duration, predict_duration
+
+
+class FakeHistory:
+    def __init__(self, runs):
+        self.runs = runs
+
+    def durations(self, script, limit):
+        return self.runs[:limit]
+
+
+def test_no_history_means_no_prediction():
+    assert predict_duration(FakeHistory([]), 'install/x.sh', cpu_score=1.0) is None
+    assert predict_duration(FakeHistory([(10.0, 1.0, 1.0)]), '', cpu_score=1.0) is None
+
+
+def test_cpu_time_is_scaled_to_this_host():
+    # 60s wall of which 40s CPU on a host half as fast as this one
+    prediction = predict_duration(FakeHistory([(60.0, 40.0, 1.0)]), 'x.sh', cpu_score=2.0)
+    assert prediction == Prediction(seconds=40.0, runs=1)
+
+
+def test_prediction_is_the_median_and_cpu_is_capped_by_wall_time():
+    runs = [(10.0, 0.0, None), (30.0, 0.0, None), (1000.0, 0.0, None), (20.0, 50.0, 1.0)]
+    prediction = predict_duration(FakeHistory(runs), 'x.sh', cpu_score=1.0)
+    assert prediction.runs == 4
+    assert prediction.seconds == pytest.approx(25.0)
+
+
+def test_clock_is_linear_then_creeps_towards_ceiling(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('archer.eta.time.monotonic', lambda: now[0])
+    clock = EtaClock(Prediction(seconds=10.0, runs=3), started=100.0)
+    now[0] = 105.0
+    assert clock.fraction() == pytest.approx(ETA_LINEAR_CAP / 2)
+    assert clock.remaining() == pytest.approx(5.0)
+    now[0] = 110.0
+    assert clock.fraction() == pytest.approx(ETA_LINEAR_CAP)
+    now[0] = 120.0
+    assert clock.fraction() == pytest.approx((ETA_LINEAR_CAP + ETA_CEILING) / 2)
+    now[0] = 150.0
+    assert (ETA_LINEAR_CAP + ETA_CEILING) / 2 < clock.fraction() < ETA_CEILING
+    now[0] = 10_000.0
+    assert clock.fraction() <= ETA_CEILING
+    assert clock.remaining() == 0.0
+
+
+@pytest.mark.parametrize('seconds, text', [
+    (0.4, '<1s'), (1, '1s'), (59.4, '59s'), (60, '1m00s'), (125, '2m05s'), (3600, '1h00m'), (7325, '2h02m'),
+])
+def test_format_duration(seconds, text):
+    assert format_duration(seconds) == text
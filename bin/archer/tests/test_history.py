@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from archer import history
+from archer.history import RunHistory, main, merge_totals, script_key
+from archer.runner import ResourceUsage
+
+
+@pytest.fixture
+def runs(tmp_path, monkeypatch):
+    monkeypatch.setenv('ARCHER_STATE_DIR', str(tmp_path / 'state'))
+    monkeypatch.setenv('ARCHER_DIR', str(tmp_path / 'archer'))
+    monkeypatch.setattr(history, 'host_cpu_score', lambda: 1000.0)
+    return RunHistory(tmp_path / 'history.sqlite3')
+
+
+def usage(wall, cpu=0.0, **kwargs):
+    return ResourceUsage(wall_s=wall, user_s=cpu, **kwargs)
+
+
+def test_script_key_is_relative_to_the_checkout(tmp_path, monkeypatch):
+    monkeypatch.setenv('ARCHER_DIR', str(tmp_path))
+    assert script_key(str(tmp_path / 'install' / 'x.sh')) == 'install/x.sh'
+    assert script_key('/elsewhere/x.sh') == '/elsewhere/x.sh'
+    assert script_key('') == ''
+    monkeypatch.delenv('ARCHER_DIR')
+    assert script_key(str(tmp_path / 'x.sh')) == str(tmp_path / 'x.sh')
+
+
+def test_durations_are_latest_successful_runs(runs, tmp_path, monkeypatch):
+    script = str(tmp_path / 'archer' / 'install' / 'x.sh')
+    assert runs.durations(script) == []
+    clock = iter(range(100, 200, 10))
+    monkeypatch.setattr(history.time, 'time', lambda: float(next(clock)))
+    runs.record('x', 'bash x.sh', script, 0, usage(5.0, 1.0))
+    runs.record('x', 'bash x.sh', script, 1, usage(99.0))
+    runs.record('x', 'bash x.sh', script, 0, usage(7.0, 2.0))
+    runs.record('other', 'bash y.sh', '', 0, usage(3.0))
+    assert runs.durations(script) == [(7.0, 2.0, 1000.0), (5.0, 1.0, 1000.0)]
+    assert runs.durations(script, limit=1) == [(7.0, 2.0, 1000.0)]
+    # Commands without a script are keyed by their description
+    assert runs.durations('other') == [(3.0, 0.0, 1000.0)]
+    assert runs.recent(1)[0]['description'] == 'other'
+
+
+def test_totals_merge_across_databases(runs, tmp_path):
+    other = RunHistory(tmp_path / 'other.sqlite3')
+    runs.record('a', 'cmd', '', 0, usage(10.0, 4.0, peak_rss_kib=100, download_bytes=5))
+    runs.record('a', 'cmd', '', 2, usage(1.0, 0.0, peak_rss_kib=300))
+    other.record('a', 'cmd', '', 0, usage(20.0, 6.0, peak_rss_kib=200, download_bytes=7))
+    other.record('b', 'cmd', '', 0, usage(2.0))
+    merged = {row['script']: row for row in merge_totals([runs.script_totals(), other.script_totals()])}
+    a = merged['a']
+    assert (a['runs'], a['failures'], a['hosts']) == (3, 1, 2)
+    assert a['total_wall_s'] == pytest.approx(31.0)
+    assert a['total_cpu_s'] == pytest.approx(10.0)
+    assert a['max_rss_kib'] == 300
+    assert a['total_download_bytes'] == 12
+    assert merged['b']['runs'] == 1
+
+
+def test_reopening_keeps_rows(runs):
+    runs.record('a', 'cmd', '', 0, usage(1.0))
+    conn = sqlite3.connect(str(runs.path))
+    assert conn.execute('SELECT COUNT(*) FROM runs').fetchone() == (1,)
+    conn.close()
+    assert len(RunHistory(runs.path).recent()) == 1
+
+
+def test_cli(runs, capsys):
+    assert main(['--db', str(runs.path), 'recent']) == 1
+    runs.record('slow', 'cmd', '', 0, usage(60.0, 30.0))
+    runs.record('fast', 'cmd', '', 0, usage(1.0))
+    assert main(['--db', str(runs.path), 'top', '--by', 'cpu']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[-2].endswith('slow') and lines[-1].endswith('fast')
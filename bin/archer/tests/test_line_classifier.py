@@ -0,0 +1,110 @@
+import re
+
+import pytest
+
+from archer.line_classifier import (
+    MAX_SOURCE_NAME, TABLES, Classification, KeywordChain, LineClassifier, classifier, rule, trie_pattern,
+)
+from archer.bench.classify import DEFAULT_MIX, generate_lines
+
+
+@pytest.mark.parametrize('words', [
+    ['install', 'installing', 'in'],
+    ['make', 'makepkg', 'cargo', 'car'],
+    ['a'],
+])
+def test_trie_pattern_prefers_longest_keyword(words):
+    scan = re.compile(trie_pattern(words))
+    for word in words:
+        assert scan.fullmatch(word)
+    longest = max(words, key=len)
+    assert scan.findall(f"x {longest} y") == [longest]
+
+
+def test_rules_are_conjunctions_and_first_match_wins():
+    table = LineClassifier([
+        rule('building', 'Rust', ('building', 'compiling'), 'cargo'),
+        rule('building', 'Generic', ('building', 'compiling')),
+    ])
+    assert table.classify('Compiling serde v1 (cargo)') == Classification('building', 'Rust')
+    assert table.classify('Building docs') == Classification('building', 'Generic')
+    assert table.classify('cargo fetch') is None
+    assert table.classify('nothing to see') is None
+
+
+def test_longer_keyword_satisfies_contained_keyword():
+    table = LineClassifier([rule('installing', 'Installing', 'install')])
+    assert table.classify('Installing foo') == Classification('installing', 'Installing')
+
+
+def test_capture_names_are_shortened():
+    nala = classifier('nala')
+    result = nala.classify('Downloading https://example.org/pub/foo-1.2.tar.gz')
+    assert result == Classification('downloading', 'Downloading foo-1.2.tar.gz...', 'foo-1.2.tar.gz')
+    long_name = 'x' * 50 + '.cpp'
+    result = nala.classify(f"gcc -c src/{long_name}")
+    assert result.phase == 'building'
+    assert result.name == long_name[:MAX_SOURCE_NAME]
+
+
+def test_rule_without_status_needs_its_capture():
+    nala = classifier('nala')
+    # No source file: falls through to the next build rule
+    assert nala.classify('make -j8') == Classification('building', 'Building from source...')
+    assert nala.classify('==> makepkg') == Classification('building', 'Building package with makepkg...')
+
+
+def test_original_chain_order_is_kept():
+    script = classifier('script')
+    assert script.classify('Installing rust via rustup').status == 'Installing Rust toolchain...'
+    assert script.classify('install done, success').status == 'Installing packages...'
+    assert script.classify('Build complete').status == 'Installation completing...'
+    simple = classifier('simple')
+    assert simple.classify('cargo install ripgrep').status == 'Installing Rust package...'
+
+
+def test_classify_is_stable_across_memoised_masks():
+    nala = classifier('nala')
+    lines = ['Installing foo', 'Installing bar', 'resolving dependencies...', 'Installing foo']
+    first = [nala.classify(line) for line in lines]
+    assert [nala.classify(line) for line in lines] == first
+    assert first[0].name == 'foo' and first[1].name == 'bar'
+
+
+def test_classifier_is_shared():
+    assert classifier('nala') is classifier('nala')
+
+
+def test_keyword_tables_use_the_generated_chain():
+    assert isinstance(classifier('script'), KeywordChain)
+    assert isinstance(classifier('simple'), KeywordChain)
+    assert isinstance(classifier('nala'), LineClassifier)
+
+
+@pytest.mark.parametrize('table', ['script', 'simple'])
+def test_keyword_chain_agrees_with_the_compiled_scan(table):
+    chain, scan = KeywordChain(TABLES[table]), LineClassifier(TABLES[table])
+    lines = generate_lines(2000, DEFAULT_MIX) + [
+        'Installing rust via rustup', 'service foo start', 'service foo stop', 'INSTALL done, success',
+        'bison parser building', 'pacman -S git', '',
+    ]
+    for line in lines:
+        assert chain.classify(line) == scan.classify(line), line
+
+
+def test_keyword_chain_conjunctions_and_literals():
+    chain = KeywordChain([
+        rule('building', 'Rust', ('building', 'compiling'), 'cargo'),
+        rule('building', 'Generic', ('building', 'compiling')),
+        rule('quoted', 'Quoted', "it's \\ done"),
+    ])
+    assert chain.classify('Compiling serde (cargo)') == Classification('building', 'Rust')
+    assert chain.classify('building docs') == Classification('building', 'Generic')
+    assert chain.classify("IT'S \\ DONE") == Classification('quoted', 'Quoted')
+    assert chain.classify("IT'S \\ DONE", lower=False) is None
+    assert chain.classify('cargo fetch') is None
+
+
+def test_keyword_chain_rejects_captures():
+    with pytest.raises(ValueError):
+        KeywordChain(TABLES['nala'])
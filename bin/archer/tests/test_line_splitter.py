@@ -0,0 +1,39 @@
+from archer.runner import MAX_LINE_BYTES, LineSplitter
+
+
+def split(chunks):
+    splitter = LineSplitter()
+    out = []
+    for chunk in chunks:
+        out.extend(splitter.feed(chunk))
+    return out + splitter.flush()
+
+
+def test_newlines_and_redraws():
+    assert split([b'one\ntwo\r\nbar 10%\rbar 50%\rthree\n']) == [
+        ('one', False), ('two', False), ('bar 10%', True), ('bar 50%', True), ('three', False),
+    ]
+
+
+def test_crlf_split_across_chunks_is_one_line():
+    assert split([b'done\r', b'\nnext\n']) == [('done', True), ('done', False), ('next', False)]
+
+
+def test_partial_line_waits_for_more_data():
+    splitter = LineSplitter()
+    assert splitter.feed(b'hal') == []
+    assert splitter.feed(b'f\n') == [('half', False)]
+    assert splitter.feed(b'tail') == []
+    assert splitter.flush() == [('tail', False)]
+
+
+def test_multibyte_characters_split_across_chunks():
+    data = 'naïve ✓\n'.encode()
+    assert split([data[:3], data[3:9], data[9:]]) == [('naïve ✓', False)]
+
+
+def test_overlong_line_is_emitted():
+    splitter = LineSplitter()
+    out = splitter.feed(b'x' * (MAX_LINE_BYTES + 1))
+    assert out == [('x' * (MAX_LINE_BYTES + 1), False)]
+    assert splitter.flush() == []
@@ -0,0 +1,62 @@
+from archer.output_spool import OutputSpool, prune, recent_logs
+
+
+def test_tail_is_bounded_but_log_keeps_everything(tmp_path):
+    with OutputSpool('Build thing', tail=3, directory=tmp_path) as spool:
+        for n in range(10):
+            spool.append(f"line {n}")
+    assert spool.lines == 10
+    assert list(spool.tail) == ['line 7', 'line 8', 'line 9']
+    assert spool.path.parent == tmp_path
+    assert spool.path.name.endswith('-build-thing.log')
+    assert spool.path.read_text().splitlines() == [f"line {n}" for n in range(10)]
+
+
+def test_last_skips_blank_lines():
+    spool = OutputSpool('x', enabled=False)
+    for line in ('a', '', 'b', '   ', 'c'):
+        spool.append(line)
+    assert spool.last(2) == ['b', 'c']
+    assert spool.last(0) == []
+    assert spool.path is None
+
+
+def test_close_without_keep_removes_the_log(tmp_path):
+    spool = OutputSpool('ok', directory=tmp_path)
+    spool.append('done')
+    path = spool.path
+    spool.close(keep=False)
+    assert not path.exists()
+    assert spool.path is None
+    # Closing again is harmless
+    spool.close()
+
+
+def test_log_is_closed_when_the_block_raises(tmp_path):
+    try:
+        with OutputSpool('boom', directory=tmp_path) as spool:
+            spool.append('before the error')
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert spool._fh is None
+    assert spool.path.read_text() == 'before the error\n'
+
+
+def test_unwritable_directory_keeps_the_tail(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    spool = OutputSpool('x', directory=blocker / 'logs')
+    spool.append('still here')
+    assert spool.path is None
+    assert spool.last(1) == ['still here']
+    spool.close()
+
+
+def test_prune_keeps_the_newest_logs(tmp_path):
+    for stamp in ('20240101', '20240102', '20240103'):
+        (tmp_path / f"{stamp}-1-x.log").write_text('')
+    (tmp_path / 'notes.txt').write_text('')
+    prune(tmp_path, keep=2)
+    assert [p.name for p in recent_logs(tmp_path)] == ['20240103-1-x.log', '20240102-1-x.log']
+    assert (tmp_path / 'notes.txt').exists()
@@ -0,0 +1,43 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('rich')
+
+SCRIPT = Path(__file__).resolve().parents[2] / 'archer-rich.py'
+spec = importlib.util.spec_from_file_location('archer_rich', SCRIPT)
+archer_rich = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(archer_rich)
+package_install = archer_rich.ArcherUI._package_install
+
+
+def test_sync_of_several_packages_is_routed():
+    assert package_install('sudo pacman -S --needed --noconfirm git vim') == (
+        ['git', 'vim'], 'sudo pacman -S --needed --noconfirm {packages}')
+
+
+def test_option_arguments_are_not_packages():
+    packages, template = package_install(
+        'sudo pacman -S --ignore foo --config /etc/p.conf -r /mnt --overwrite=* git vim')
+    assert packages == ['git', 'vim']
+    assert template == "sudo pacman -S --ignore foo --config /etc/p.conf -r /mnt '--overwrite=*' {packages}"
+    # One package left once the option argument is skipped
+    assert package_install('sudo pacman -S --ignore foo git') is None
+
+
+@pytest.mark.parametrize('command', [
+    'sudo pacman -S git',
+    'sudo pacman -R git vim',
+    'pacman -S $PACKAGES',
+    'sudo pacman -S git vim | tee log',
+    'echo hi && pacman -S git vim',
+    'apt install git vim',
+])
+def test_other_commands_are_left_alone(command):
+    assert package_install(command) is None
+
+
+def test_cd_prefix_is_kept():
+    assert package_install('cd /tmp && yay -Syu --noconfirm a b') == (
+        ['a', 'b'], 'cd /tmp && yay -Syu --noconfirm {packages}')
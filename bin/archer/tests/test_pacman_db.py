@@ -0,0 +1,113 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+from archer import pacman_db
+from archer.pacman_db import LocalDb, SyncIndex, estimate, summary_line
+
+CORE = {
+    'glibc': dict(version='2.40-1', csize=10, isize=100),
+    'bash': dict(version='5.2-1', csize=5, isize=50, depends=['glibc>=2.38', 'readline'], provides=['sh']),
+    'readline': dict(version='8.2-1', csize=2, isize=20, depends=['glibc']),
+    'make': dict(version='4.4-1', csize=3, isize=30, depends=['glibc', 'sh'], groups=['base-devel']),
+    'gcc': dict(version='14.1-1', csize=40, isize=400, depends=['glibc'], groups=['base-devel']),
+}
+EXTRA = {
+    # Shadowed by core, which comes first in pacman.conf
+    'gcc': dict(version='99-1', csize=1, isize=1),
+    'neovim': dict(version='0.10-1', csize=8, isize=80, depends=['lua51-lpeg', 'glibc']),
+    'lua51-lpeg': dict(version='1.1-1', csize=1, isize=10),
+}
+
+
+def _desc(name, version, csize, isize, depends=(), provides=(), groups=()):
+    lines = ['%NAME%', name, '', '%VERSION%', version, '', '%FILENAME%', f"{name}-{version}-x86_64.pkg.tar.zst", '',
+             '%CSIZE%', str(csize), '', '%ISIZE%', str(isize), '']
+    for key, values in (('DEPENDS', depends), ('PROVIDES', provides), ('GROUPS', groups)):
+        if values:
+            lines += [f"%{key}%", *values, '']
+    return '\n'.join(lines).encode()
+
+
+def _write_sync_db(path, packages):
+    with tarfile.open(path, 'w:gz') as tar:
+        for name, info in packages.items():
+            data = _desc(name, **info)
+            member = tarfile.TarInfo(f"{name}-{info['version']}/desc")
+            member.size = len(data)
+            tar.addfile(member, io.BytesIO(data))
+
+
+def _install_local(dbpath, name, version, provides=()):
+    entry = dbpath / 'local' / f"{name}-{version}"
+    entry.mkdir(parents=True)
+    text = f"%NAME%\n{name}\n\n%VERSION%\n{version}\n\n"
+    if provides:
+        text += '%PROVIDES%\n' + '\n'.join(provides) + '\n\n'
+    (entry / 'desc').write_text(text)
+
+
+@pytest.fixture
+def dbpath(tmp_path, monkeypatch):
+    conf = tmp_path / 'pacman.conf'
+    conf.write_text('[options]\nCacheDir = /nonexistent\n\n[core]\nInclude = x\n\n[extra]\nInclude = x\n')
+    monkeypatch.setattr(pacman_db, 'PACMAN_CONF', str(conf))
+    monkeypatch.setenv('ARCHER_STATE_DIR', str(tmp_path / 'state'))
+    root = tmp_path / 'db'
+    (root / 'sync').mkdir(parents=True)
+    (root / 'local').mkdir()
+    _write_sync_db(root / 'sync' / 'extra.db', EXTRA)
+    _write_sync_db(root / 'sync' / 'core.db', CORE)
+    _install_local(root, 'glibc', '2.40-1')
+    return root
+
+
+def test_index_follows_repo_order_and_provides(dbpath):
+    index = SyncIndex(dbpath, use_cache=False)
+    assert index.repos == ['core', 'extra']
+    assert index.find('gcc').repo == 'core'
+    assert index.find('sh>=5').name == 'bash'
+    assert index.find('nope') is None
+    assert sorted(index.groups['base-devel']) == ['gcc', 'make']
+
+
+def test_estimate_resolves_closure(dbpath):
+    result = estimate(['base-devel', 'neovim', 'missing-aur-pkg', 'glibc'],
+                      SyncIndex(dbpath, use_cache=False), LocalDb(dbpath, use_cache=False),
+                      cachedir=str(dbpath / 'cache'))
+    assert sorted(p.name for p in result.install) == ['bash', 'gcc', 'lua51-lpeg', 'make', 'neovim', 'readline']
+    assert result.satisfied == ['glibc']
+    assert result.unknown == ['missing-aur-pkg']
+    assert result.download_bytes == 5 + 2 + 3 + 40 + 8 + 1
+    assert result.installed_bytes == 50 + 20 + 30 + 400 + 80 + 10
+    assert summary_line(result).startswith('6 packages to install')
+
+
+def test_installed_providers_and_package_cache(dbpath):
+    _install_local(dbpath, 'zsh-sh', '1-1', provides=['sh'])
+    cache = dbpath / 'cache'
+    cache.mkdir()
+    (cache / 'readline-8.2-1-x86_64.pkg.tar.zst').write_bytes(b'')
+    result = estimate(['make', 'readline'], SyncIndex(dbpath, use_cache=False), LocalDb(dbpath, use_cache=False),
+                      cachedir=str(cache))
+    assert sorted(p.name for p in result.install) == ['make', 'readline']
+    assert result.cached_files == ['readline']
+    assert result.download_bytes == 3
+
+
+def test_cached_index_is_invalidated_by_database_changes(dbpath):
+    assert 'neovim' in SyncIndex(dbpath).packages
+    assert 'neovim' in SyncIndex(dbpath).packages
+    _write_sync_db(dbpath / 'sync' / 'extra.db', {'ripgrep': dict(version='14-1', csize=1, isize=1)})
+    stat = os.stat(dbpath / 'sync' / 'extra.db')
+    os.utime(dbpath / 'sync' / 'extra.db', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    packages = SyncIndex(dbpath).packages
+    assert 'ripgrep' in packages and 'neovim' not in packages
+
+    assert 'glibc' in LocalDb(dbpath).installed
+    _install_local(dbpath, 'git', '2.45-1')
+    stat = os.stat(dbpath / 'local')
+    os.utime(dbpath / 'local', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert LocalDb(dbpath).installed['git'] == '2.45-1'
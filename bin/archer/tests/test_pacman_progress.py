@@ -0,0 +1,105 @@
+from archer.pacman_progress import PHASE_SPANS, PacmanProgressParser, parse_size
+
+
+def feed_all(parser, lines):
+    return [parser.feed(line) for line in lines]
+
+
+def test_parse_size():
+    assert parse_size('1.50', 'MiB') == int(1.5 * 1024 ** 2)
+    assert parse_size('12', 'B') == 12
+    assert parse_size('x', 'KiB') == 0
+
+
+def test_piped_transaction_moves_through_phases():
+    parser = PacmanProgressParser()
+    updates = feed_all(parser, [
+        'resolving dependencies...',
+        'looking for conflicting packages...',
+        'Packages (2) foo-1-1  bar-2-1',
+        ':: Retrieving packages...',
+        ' foo-1-1-x86_64 downloading...',
+        ' bar-2-1-x86_64 downloading...',
+        ':: Processing package changes...',
+        'installing foo...',
+        'installing bar...',
+        ':: Running post-transaction hooks...',
+        '(1/2) Arming ConditionNeedsUpdate...',
+        '(2/2) Updating the info directory file...',
+    ])
+    assert None not in updates
+    assert [u.phase for u in updates] == [
+        'resolving', 'resolving', 'resolving', 'downloading', 'downloading', 'downloading',
+        'installing', 'installing', 'installing', 'hooks', 'hooks', 'done',
+    ]
+    assert updates[2].status == '2 packages to process'
+    assert updates[5].package == 'bar-2-1-x86_64'
+    assert updates[8].status == '(2/2) installing bar'
+    assert [u.overall for u in updates] == sorted(u.overall for u in updates)
+    assert updates[-1].overall == 100
+
+
+def test_total_download_size_line_is_not_an_update():
+    parser = PacmanProgressParser()
+    assert parser.feed('Total Download Size:   3.00 KiB') is None
+    assert parser.download_bytes == 3 * 1024
+
+
+def test_overall_never_moves_backwards():
+    parser = PacmanProgressParser()
+    seen = []
+    for line in [
+        'Packages (2) foo-1-1  bar-2-1',
+        ':: Retrieving packages...',
+        ' foo-1-1-x86_64    1.2 MiB  3.4 MiB/s 00:01 [###---------]  30%',
+        ' foo-1-1-x86_64    1.2 MiB  3.4 MiB/s 00:01 [############] 100%',
+        ' bar-2-1-x86_64    1.2 MiB  3.4 MiB/s 00:01 [#-----------]  10%',
+        ':: Processing package changes...',
+        '(1/2) installing foo                        [######------]  50%',
+        '(1/2) checking keys in keyring              [############] 100%',
+        '(2/2) installing bar                        [############] 100%',
+    ]:
+        update = parser.feed(line)
+        assert update is not None, line
+        seen.append(update.overall)
+    assert seen == sorted(seen)
+    start, end = PHASE_SPANS['installing']
+    assert start <= seen[-1] <= end
+
+
+def test_tty_rows_report_current_package_percent():
+    parser = PacmanProgressParser()
+    parser.feed(':: Retrieving packages...')
+    update = parser.feed(' foo-1-1-x86_64    1.2 MiB  3.4 MiB/s 00:01 [#####-------]  45%')
+    assert update.phase == 'downloading'
+    assert update.current == 45
+    assert update.package == 'foo-1-1-x86_64'
+    update = parser.feed('(3/7) upgrading glibc                       [#####-------]  40%')
+    assert update.phase == 'installing'
+    assert update.current == 40
+    assert update.package == 'glibc'
+    assert update.status == '(3/7) upgrading glibc'
+
+
+def test_second_transaction_starts_over():
+    parser = PacmanProgressParser()
+    feed_all(parser, [
+        'Packages (1) foo-1-1',
+        'installing foo...',
+        ':: Running post-transaction hooks...',
+        '(1/1) Arming ConditionNeedsUpdate...',
+    ])
+    assert parser.overall == 100
+    update = parser.feed(':: Retrieving packages...')
+    assert update.phase == 'downloading'
+    assert update.overall == PHASE_SPANS['downloading'][0]
+
+
+def test_unrelated_and_oversized_lines_are_ignored():
+    parser = PacmanProgressParser()
+    assert parser.feed('') is None
+    assert parser.feed('   ') is None
+    assert parser.feed('hello world') is None
+    assert parser.feed('(1/2) ' + 'x' * 2000) is None
+    assert parser.feed('(nope) something') is None
+    assert parser.phase == 'idle'
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from archer.pressure import COOLDOWN_SAMPLES, LOAD_WINDOW, AdaptiveLimit, Pressure
+
+CALM = Pressure(cpu_some=0.0, memory_some=0.0, memory_full=0.0, io_some=0.0, io_full=0.0, load=0.1)
+
+
+def gate(limit=4, max_jobs=8, active=None, waiting=0):
+    adaptive = AdaptiveLimit(max_jobs=max_jobs, start=limit)
+    adaptive.active = limit if active is None else active
+    adaptive.waiting = waiting
+    return adaptive
+
+
+@pytest.mark.parametrize('pressure, expected', [
+    (Pressure(memory_full=50.0), (2, 'memory thrashing')),
+    (Pressure(cpu_some=90.0), (3, 'cpu saturated')),
+    (Pressure(io_full=90.0), (3, 'io saturated')),
+    (Pressure(load=3.0), (3, 'load high')),
+])
+def test_pressure_lowers_the_limit(pressure, expected):
+    assert gate().decide(pressure) == expected
+
+
+def test_limit_never_drops_below_minimum():
+    assert gate(limit=1).decide(Pressure(memory_full=50.0)) == (1, 'memory thrashing')
+
+
+def test_calm_grows_only_when_the_limit_holds_jobs_back():
+    assert gate(waiting=2).decide(CALM) == (5, 'headroom')
+    assert gate(waiting=0).decide(CALM) == (4, '')
+    assert gate(active=2, waiting=2).decide(CALM) == (4, '')
+    assert gate(limit=8, waiting=2).decide(CALM) == (8, 'headroom')
+
+
+def test_without_psi_load_alone_decides():
+    assert gate(waiting=2).decide(Pressure(load=0.1)) == (5, 'headroom')
+    assert gate(waiting=2).decide(Pressure(load=0.9)) == (4, '')
+
+
+def test_with_psi_load_is_ignored():
+    busy = Pressure(cpu_some=0.0, memory_some=0.0, memory_full=0.0, io_some=0.0, io_full=0.0, load=3.0)
+    assert gate().decide(busy) == (4, '')
+    assert gate(waiting=2).decide(busy) == (5, 'headroom')
+
+
+def limits_after(pressures, interval=1.0):
+    """Limits an AdaptiveLimit moves to while fed `pressures`."""
+    changes = []
+
+    async def main():
+        adaptive = AdaptiveLimit(max_jobs=8, start=4, interval=interval,
+                                 on_change=lambda limit, pressure, reason: changes.append(limit))
+        adaptive.active = 4
+        for pressure in pressures:
+            await adaptive.adjust(pressure)
+
+    asyncio.run(main())
+    return changes
+
+
+def test_load_driven_changes_wait_out_the_load_window():
+    window = int(LOAD_WINDOW)
+    assert limits_after([Pressure(load=3.0)] * (window + 1)) == [3]
+    assert limits_after([Pressure(load=3.0)] * (window + 2)) == [3, 2]
+    # Longer sampling intervals wait fewer samples for the same window
+    assert limits_after([Pressure(load=3.0)] * (window // 2 + 2), interval=2.0) == [3, 2]
+
+
+def test_psi_driven_changes_use_the_short_cooldown():
+    assert limits_after([Pressure(cpu_some=90.0)] * (COOLDOWN_SAMPLES + 2)) == [3, 2]
@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import pytest
+
+from archer.profiles import Profile, ProfileError, analyze_script, compile_plan, load_cached_plan, plan_for
+
+HARDWARE = Path(__file__).resolve().parents[3] / 'install' / 'system' / 'hardware'
+
+
+class FakeMenu:
+    """Menus whose options are the given script paths."""
+
+    def __init__(self, menus, installs=None):
+        installs = installs or {}
+        self.discovered_menus = {key: {'install': installs.get(key)} for key in menus}
+        self.menus = menus
+
+    def get_menu_options_filtered(self, key):
+        return key, '', [{'target': str(path)} for path in self.menus[key]]
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def profile(tmp_path, targets, **kwargs):
+    path = write(tmp_path / 'profiles' / 'test.toml', f"[install]\ntargets = {targets!r}\n")
+    return Profile(name='test', path=str(path), targets=targets, **kwargs)
+
+
+def stages(plan):
+    return [(stage.parallel, [step.name for step in stage.steps]) for stage in plan.stages]
+
+
+@pytest.mark.parametrize('script', ['audio-system.sh', 'bluetooth.sh'])
+def test_package_installs_in_command_strings_are_exclusive(script):
+    # execute_with_progress "sudo pacman -S --noconfirm $package" inside a loop
+    info = analyze_script(str(HARDWARE / script))
+    assert info.exclusive
+    assert info.packages == []
+
+
+def test_audio_and_bluetooth_never_share_a_stage(tmp_path):
+    menu = FakeMenu({'system/hardware': [HARDWARE / 'audio-system.sh', HARDWARE / 'bluetooth.sh']})
+    plan = compile_plan(profile(tmp_path, ['system/hardware/audio-system', 'system/hardware/bluetooth']), menu)
+    assert stages(plan) == [(False, ['system/hardware/audio-system', 'system/hardware/bluetooth'])]
+
+
+@pytest.mark.parametrize('body, packages, exclusive', [
+    ('install_with_retries git neovim\n', ['git', 'neovim'], True),
+    ('sudo pacman -S --needed --noconfirm ripgrep\n', ['ripgrep'], True),
+    ('if lspci | grep -q NVIDIA; then\n  install_with_retries nvidia\nfi\n', [], True),
+    ('sudo pacman -S "$pkg"\n', [], True),
+    ('execute_with_progress "yay -S --noconfirm foo" "Installing foo"\n', [], True),
+    ('setup_mise\nmise use -g node@lts\n', [], True),
+    ('log_info "Update first with: sudo pacman -Syu"\nmkdir -p ~/.config/foo\n', [], False),
+    ('# pacman -S foo\ncp foo.conf ~/.config/\n', [], False),
+    ('bash "$SCRIPT_DIR/other.sh"\n', [], True),
+])
+def test_analyze_script(tmp_path, body, packages, exclusive):
+    info = analyze_script(str(write(tmp_path / 'x.sh', '#!/bin/bash\n' + body)))
+    assert (info.packages, info.exclusive) == (packages, exclusive)
+
+
+def test_plan_merges_packages_and_only_parallelises_scripts_without_package_manager(tmp_path):
+    scripts = {
+        'neovim': 'install_with_retries neovim\n',
+        'ripgrep': 'sudo pacman -S --needed --noconfirm ripgrep\n',
+        'dotfiles': 'cp -r dotfiles ~/.config\n',
+        'theme': 'gsettings set org.gnome.desktop.interface gtk-theme Adwaita\n',
+    }
+    menu = FakeMenu({'tools': [write(tmp_path / 'tools' / f"{n}.sh", b) for n, b in scripts.items()]})
+    plan = compile_plan(profile(tmp_path, ['tools/*'], packages=['git']), menu)
+    assert plan.packages == ['git', 'neovim', 'ripgrep']
+    assert stages(plan) == [
+        (False, ['packages/pacman']),
+        (True, ['tools/dotfiles', 'tools/theme']),
+        (False, ['tools/neovim', 'tools/ripgrep']),
+    ]
+
+
+def test_after_constraints_order_stages_and_cycles_fail(tmp_path):
+    menu = FakeMenu({'t': [write(tmp_path / 't' / f"{n}.sh", 'true\n') for n in ('a', 'b', 'c')]})
+    plan = compile_plan(profile(tmp_path, ['t/*'], after={'t/a': ['t/c']}), menu)
+    assert stages(plan) == [(True, ['t/b', 't/c']), (False, ['t/a'])]
+    with pytest.raises(ProfileError, match='cycle'):
+        compile_plan(profile(tmp_path, ['t/*'], after={'t/a': ['t/c'], 't/c': ['t/a']}), menu)
+    with pytest.raises(ProfileError, match='not a target'):
+        compile_plan(profile(tmp_path, ['t/a'], after={'t/a': ['t/b']}), menu)
+
+
+def test_scripts_run_by_a_selected_menu_or_wrapper_are_dropped(tmp_path):
+    tools = tmp_path / 'tools'
+    install = write(tools / 'install.sh', 'for s in *.sh; do bash "$s"; done\n')
+    wrapper = write(tools / 'all.sh', 'bash "$SCRIPT_DIR/one.sh"\n')
+    one = write(tools / 'one.sh', 'true\n')
+    menu = FakeMenu({'tools': [wrapper, one]}, installs={'tools': str(install)})
+    plan = compile_plan(profile(tmp_path, ['tools', 'tools/one']), menu)
+    assert plan.dropped == {'tools/one': 'run by tools'}
+    plan = compile_plan(profile(tmp_path, ['tools/all', 'tools/one']), menu)
+    assert plan.dropped == {'tools/one': 'run by tools/all'}
+
+
+def test_cached_plan_is_reused_until_a_script_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('ARCHER_STATE_DIR', str(tmp_path / 'state'))
+    monkeypatch.setenv('ARCHER_DIR', str(tmp_path))
+    script = write(tmp_path / 'tools' / 'a.sh', 'true\n')
+    profile(tmp_path, ['tools/a'])
+    menu = FakeMenu({'tools': [script]})
+    built = []
+
+    def factory():
+        built.append(1)
+        return menu
+
+    first, cached = plan_for('test', factory)
+    assert not cached
+    again, cached = plan_for('test', factory)
+    assert cached and again == first and len(built) == 1
+    write(script, 'install_with_retries foo\n')
+    assert load_cached_plan(tmp_path / 'profiles' / 'test.toml') is None
+    plan, cached = plan_for('test', factory)
+    assert not cached and plan.packages == ['foo']
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from archer.prompt_channel import PROMPT_ENV, PromptChannel
+
+COMMON_FUNCS = Path(__file__).resolve().parents[3] / 'install' / 'system' / 'common-funcs.sh'
+
+pytestmark = pytest.mark.skipif(shutil.which('bash') is None, reason='needs bash')
+
+
+async def ask(channel, shell):
+    """Run `shell` after sourcing common-funcs.sh with the channel in its env."""
+    env = dict(os.environ, **channel.child_env())
+    proc = await asyncio.create_subprocess_exec(
+        'bash', '-c', f'source "{COMMON_FUNCS}" >/dev/null 2>&1; {shell}',
+        env=env, stdout=asyncio.subprocess.PIPE)
+    out, _ = await asyncio.wait_for(proc.communicate(), 10)
+    return proc.returncode, out.decode()
+
+
+def serve(handler, *shells):
+    async def main():
+        channel = PromptChannel(handler)
+        await channel.start()
+        try:
+            return [await ask(channel, shell) for shell in shells], channel.fifo_path
+        finally:
+            await channel.close()
+    return asyncio.run(main())
+
+
+def test_confirm_and_secret_round_trip():
+    asked = []
+
+    async def handler(kind, message):
+        asked.append((kind, message))
+        return 'hunter2' if kind == 'secret' else ('' if 'Proceed' in message else None)
+
+    results, fifo = serve(
+        handler,
+        'confirm_action "Proceed?"; echo "rc=$?"',
+        'confirm_action "Wipe the disk?"; echo "rc=$?"',
+        'archer_prompt_secret "Password:"',
+    )
+    assert results == [(0, 'rc=0\n'), (0, 'rc=1\n'), (0, 'hunter2')]
+    assert asked == [('confirm', 'Proceed?'), ('confirm', 'Wipe the disk?'), ('secret', 'Password:')]
+    # close() removes the private directory
+    assert not os.path.exists(os.path.dirname(fifo))
+
+
+def test_handler_errors_decline():
+    async def handler(kind, message):
+        raise RuntimeError('modal failed')
+
+    results, _fifo = serve(handler, 'archer_tui_prompt confirm "x"; echo " rc=$?"')
+    assert results == [(0, ' rc=1\n')]
+
+
+def test_no_channel_falls_back():
+    async def main():
+        channel = PromptChannel(None)
+        assert channel.child_env() == {}
+        return await ask(channel, f'{PROMPT_ENV}=/nonexistent archer_tui_prompt confirm "x"; echo "rc=$?"')
+
+    assert asyncio.run(main()) == (0, 'rc=2\n')
+
+
+def test_replies_only_go_to_fifos_in_the_channel_dir(tmp_path):
+    outside = tmp_path / 'reply'
+    os.mkfifo(outside)
+    asked = []
+
+    async def handler(kind, message):
+        asked.append(message)
+        return 'yes'
+
+    async def main():
+        channel = PromptChannel(handler)
+        await channel.start()
+        try:
+            fd = os.open(channel.fifo_path, os.O_WRONLY)
+            os.write(fd, f"confirm\t{outside}\tsneaky\nbogus line\n".encode())
+            os.close(fd)
+            await asyncio.sleep(0.1)
+        finally:
+            await channel.close()
+
+    asyncio.run(main())
+    assert asked == []
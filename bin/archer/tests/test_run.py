@@ -0,0 +1,78 @@
+import asyncio
+import io
+
+import pytest
+
+from archer.run import BatchRunner, Target, TextReporter, _jobs_arg, resolve_targets
+
+
+class FakeMenu:
+    """The parts of lib.ArcherMenu that target resolution uses."""
+
+    def __init__(self, menus):
+        self.discovered_menus = {key: {'install': f"/a/{key}/install.sh"} for key in menus}
+        self.menus = menus
+
+    def get_menu_options_filtered(self, key):
+        return key, '', [{'target': f"/a/{key}/{name}.sh"} for name in self.menus[key]]
+
+
+MENU = FakeMenu({
+    'development': ['neovim', 'vscode', 'zed'],
+    'development/languages': ['go', 'rust'],
+    'multimedia': ['audio-system', 'vlc'],
+})
+
+
+def names(targets):
+    return [t.name for t in targets]
+
+
+def test_exact_names_keep_order_and_drop_duplicates():
+    targets = resolve_targets(MENU, ['multimedia/vlc', 'development', 'multimedia/vlc/'])
+    assert names(targets) == ['multimedia/vlc', 'development']
+    assert targets[1].is_menu and targets[1].script == '/a/development/install.sh'
+    assert targets[0].script == '/a/multimedia/vlc.sh'
+
+
+def test_globs_match_scripts_one_level_at_a_time():
+    assert names(resolve_targets(MENU, ['development/*'])) == [
+        'development/neovim', 'development/vscode', 'development/zed']
+    assert names(resolve_targets(MENU, ['*/languages/r*'])) == ['development/languages/rust']
+    assert names(resolve_targets(MENU, ['*/v*'])) == ['development/vscode', 'multimedia/vlc']
+
+
+def test_unmatched_patterns_are_all_reported():
+    with pytest.raises(ValueError, match='no such target: nope, development/x\\*'):
+        resolve_targets(MENU, ['nope', 'development/zed', 'development/x*'])
+
+
+@pytest.mark.parametrize('value, expected', [('1', 1), ('8', 8), ('auto', 'auto')])
+def test_jobs_arg(value, expected):
+    assert _jobs_arg(value) == expected
+
+
+@pytest.mark.parametrize('value', ['0', '-2', 'many'])
+def test_jobs_arg_rejects(value):
+    import argparse
+    with pytest.raises(argparse.ArgumentTypeError):
+        _jobs_arg(value)
+
+
+def test_batch_runner_reports_and_stops_after_failure(tmp_path):
+    for name, body in [('ok', 'echo hello'), ('bad', 'echo oops; exit 3'), ('later', 'echo never')]:
+        (tmp_path / f"{name}.sh").write_text(body + '\n')
+    targets = [Target(name, str(tmp_path / f"{name}.sh")) for name in ('ok', 'bad', 'later')]
+    out = io.StringIO()
+    reporter = TextReporter(out)
+    reporter.plan(targets)
+    runner = BatchRunner(archer_dir=str(tmp_path), reporter=reporter, jobs=1, fail_fast=True)
+    results = asyncio.run(runner.run(targets))
+    assert [(r.target.name, r.rc, r.skipped) for r in results] == [('ok', 0, False), ('bad', 3, False),
+                                                                   ('later', None, True)]
+    assert results[0].usage is not None and results[0].usage.wall_s >= 0
+    lines = out.getvalue().splitlines()
+    assert 'ok    | hello' in lines
+    assert 'bad   | oops' in lines
+    assert 'skip  later: earlier job failed' in lines
+    assert not any('never' in line for line in lines)
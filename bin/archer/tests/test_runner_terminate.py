@@ -0,0 +1,71 @@
+import asyncio
+import signal
+import time
+
+from archer.runner import _group_running, start_job
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 20))
+
+
+async def started(command):
+    """Start `command` and wait for its first line (its children are up)."""
+    job = await start_job(command)
+    line = await job.proc.stdout.readline()
+    assert line.strip() == b'ready'
+    return job
+
+
+def test_terminate_stops_background_children():
+    async def main():
+        job = await started('sleep 30 & echo ready; wait')
+        rc = await job.terminate(grace=5)
+        # Orphaned children may linger as zombies where nothing reaps
+        # them; they do not count as running
+        return rc, job.group_alive(), _group_running(job.pid)
+
+    rc, alive, running = run(main())
+    assert rc == -signal.SIGTERM
+    assert not alive and not running
+
+
+def test_terminate_kills_a_group_that_ignores_sigterm():
+    async def main():
+        job = await started("trap '' TERM; sleep 30 & echo ready; wait")
+        t0 = time.monotonic()
+        rc = await job.terminate(grace=0.3)
+        return rc, time.monotonic() - t0, job.group_alive()
+
+    rc, elapsed, alive = run(main())
+    assert rc == -signal.SIGKILL
+    assert 0.3 <= elapsed < 5
+    assert not alive
+
+
+def test_terminate_reaches_children_left_behind_by_the_shell():
+    async def main():
+        # The child must not hold the output pipe, or proc.wait() waits for it
+        job = await started('sleep 30 >/dev/null 2>&1 & echo ready')
+        assert await job.proc.wait() == 0
+        assert job.group_alive()
+        rc = await job.terminate(grace=5)
+        return rc, job.group_alive()
+
+    assert run(main()) == (0, False)
+
+
+def test_wait_group_gives_up_at_the_deadline():
+    async def main():
+        job = await started('sleep 30 & echo ready; wait')
+        try:
+            t0 = time.monotonic()
+            gone = await job._wait_group(t0 + 0.2)
+            return gone, time.monotonic() - t0
+        finally:
+            job.kill()
+            await job.wait()
+
+    gone, elapsed = run(main())
+    assert not gone
+    assert 0.2 <= elapsed < 2
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+
+from archer.skip_cache import Fingerprint, SkipCache, content_hash, enabled, fingerprint
+
+SCRIPT = """#!/bin/bash
+source "$ARCHER_DIR/common-funcs.sh"
+install_with_retries foo bar
+echo "$EDITOR_CHOICE $ARCHER_TUI"
+"""
+
+
+@pytest.fixture
+def archer_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('ARCHER_DIR', str(tmp_path))
+    (tmp_path / 'common-funcs.sh').write_text('install_with_retries() { :; }\n')
+    (tmp_path / 'tool.sh').write_text(SCRIPT)
+    return tmp_path
+
+
+def local_db(**installed):
+    return SimpleNamespace(installed=installed, provided={'bar'})
+
+
+@pytest.mark.parametrize('current, reason', [
+    (Fingerprint('abc', {'A': '1'}, {'foo': '1-1'}), ''),
+    (Fingerprint('xyz', {'A': '1'}, {'foo': '1-1'}), 'script changed'),
+    (Fingerprint('abc', {'A': '2'}, {'foo': '1-1'}), '$A changed'),
+    (Fingerprint('abc', {}, {'foo': '1-1'}), '$A changed'),
+    (Fingerprint('abc', {'A': '1', 'B': '0'}, {'foo': '1-1'}), '$B changed'),
+    (Fingerprint('abc', {'A': '1'}, {'foo': '1-2'}), 'foo 1-1 -> 1-2'),
+    (Fingerprint('abc', {'A': '1'}, {}), 'foo no longer installed'),
+    # Packages the script newly installs show up through the content hash
+    (Fingerprint('abc', {'A': '1'}, {'foo': '1-1', 'bar': '2-1'}), ''),
+])
+def test_change_from(current, reason):
+    recorded = Fingerprint('abc', {'A': '1'}, {'foo': '1-1'})
+    assert current.change_from(recorded) == reason
+
+
+def test_change_from_reports_packages_installed_since():
+    recorded = Fingerprint('abc', {}, {'foo': None})
+    assert Fingerprint('abc', {}, {'foo': '1-1'}).change_from(recorded) == 'foo missing -> 1-1'
+
+
+def test_content_hash_covers_sourced_files(archer_dir):
+    script = str(archer_dir / 'tool.sh')
+    digest, text = content_hash(script)
+    assert text == SCRIPT
+    (archer_dir / 'common-funcs.sh').write_text('install_with_retries() { echo changed; }\n')
+    assert content_hash(script)[0] != digest
+
+
+def test_content_hash_does_not_depend_on_checkout_location(tmp_path, monkeypatch):
+    digests = []
+    for name in ('a', 'b'):
+        root = tmp_path / name
+        root.mkdir()
+        (root / 'common-funcs.sh').write_text('x=1\n')
+        (root / 'tool.sh').write_text(SCRIPT)
+        monkeypatch.setenv('ARCHER_DIR', str(root))
+        digests.append(content_hash(str(root / 'tool.sh'))[0])
+    assert digests[0] == digests[1]
+
+
+def test_fingerprint_keeps_referenced_non_volatile_env(archer_dir):
+    env = {'EDITOR_CHOICE': 'nvim', 'ARCHER_TUI': '1', 'UNRELATED': 'x'}
+    result = fingerprint(str(archer_dir / 'tool.sh'), env, local=local_db(foo='1-1'))
+    assert result.env == {'EDITOR_CHOICE': 'nvim'}
+    assert result.packages == {'foo': '1-1', 'bar': 'provided'}
+
+
+def test_cache_round_trip(archer_dir, monkeypatch):
+    script = str(archer_dir / 'tool.sh')
+    env = {'EDITOR_CHOICE': 'nvim'}
+    monkeypatch.setattr('archer.pacman_db.LocalDb', lambda: local_db(foo='1-1'))
+    cache = SkipCache(archer_dir / 'state' / 'skip.sqlite3')
+    assert cache.check(script, env) == (False, 'no successful run recorded')
+    cache.record(script, env)
+    assert cache.check(script, env) == (True, 'unchanged since last successful run')
+    assert cache.check(script, {'EDITOR_CHOICE': 'helix'}) == (False, '$EDITOR_CHOICE changed')
+    assert [row['script'] for row in cache.entries()] == ['tool.sh']
+    assert cache.forget(script) == 1
+    assert cache.lookup(script) is None
+
+
+@pytest.mark.parametrize('value, default, expected', [
+    ('', False, False), ('', True, True), ('1', False, True), ('0', True, False), ('off', True, False),
+])
+def test_enabled(value, default, expected, monkeypatch):
+    monkeypatch.setenv('ARCHER_SKIP_UNCHANGED', value)
+    assert enabled(default) is expected
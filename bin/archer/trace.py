@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Structured JSONL trace of UI and job lifecycle events.
+
+`EventTrace.emit(event, **fields)` appends one record to an in-memory ring
+(a bounded deque) and returns; nothing is formatted or written on the
+caller's path. A background task drains the ring once a second and appends
+the records to a JSONL file from a worker thread. When the file grows past
+MAX_FILE_BYTES it is rotated to `<name>.1`, so a session keeps at most two
+segments on disk. If events arrive faster than they are written, the
+oldest are dropped and a `trace.dropped` record says how many.
+
+Each record has:
+
+    t      milliseconds since the trace started (monotonic clock)
+    ev     event type, e.g. 'job.start', 'menu.select'
+    ...    event fields such as job (job id), menu (menu key), ms
+
+Tracing is off unless enabled (archer-tui --trace, or ARCHER_TRACE=1);
+a disabled trace's emit() is a single attribute check.
+
+Summarise a trace with
+
+    python3 -m archer.trace summary <file.jsonl>
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+TRACE_ENV = 'ARCHER_TRACE'
+# Records kept in memory between flushes
+RING_SIZE = 10000
+# Seconds between flushes to disk
+FLUSH_INTERVAL = 1.0
+# Rotate the file to <name>.1 beyond this size
+MAX_FILE_BYTES = 8 * 1024 * 1024
+
+
+def default_path() -> Path:
+    from .lib import state_dir
+    return state_dir() / 'traces' / time.strftime('archer-tui-%Y%m%d-%H%M%S.jsonl')
+
+
+class EventTrace:
+    """Low-overhead event recorder with asynchronous JSONL output."""
+
+    def __init__(self, path: Optional[os.PathLike] = None, enabled: bool = True, ring_size: int = RING_SIZE):
+        self.enabled = enabled
+        self.path = Path(path) if path else (default_path() if enabled else None)
+        self._origin = time.monotonic()
+        self._ring: deque = deque(maxlen=ring_size)
+        self._emitted = 0
+        self._drained = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> 'EventTrace':
+        value = os.environ.get(TRACE_ENV, '')
+        if value in ('', '0'):
+            return cls(enabled=False)
+        return cls(path=None if value == '1' else value)
+
+    def now_ms(self) -> float:
+        return (time.monotonic() - self._origin) * 1000
+
+    def emit(self, event: str, **fields):
+        """Record an event; cheap enough to call from any UI handler."""
+        if not self.enabled:
+            return
+        fields['t'] = round((time.monotonic() - self._origin) * 1000, 3)
+        fields['ev'] = event
+        self._ring.append(fields)
+        self._emitted += 1
+
+    async def start(self):
+        """Start the background flusher; call from the running event loop."""
+        if not self.enabled or self._task is not None:
+            return
+        self.emit('trace.start', wall=time.time(), pid=os.getpid())
+        self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def _take(self) -> List[Dict]:
+        records = list(self._ring)
+        self._ring.clear()
+        dropped = self._emitted - self._drained - len(records)
+        self._drained = self._emitted
+        if dropped > 0:
+            records.insert(0, {'t': records[0]['t'] if records else round(self.now_ms(), 3),
+                               'ev': 'trace.dropped', 'count': dropped})
+        return records
+
+    def _write(self, records: List[Dict]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if self.path.stat().st_size > MAX_FILE_BYTES:
+                os.replace(self.path, self.path.with_name(self.path.name + '.1'))
+        except OSError:
+            pass
+        with open(self.path, 'a') as fh:
+            for record in records:
+                if isinstance(record.get('ms'), float):
+                    record['ms'] = round(record['ms'], 3)
+                fh.write(json.dumps(record, separators=(',', ':'), default=str))
+                fh.write('\n')
+
+    async def flush(self):
+        records = self._take()
+        if records:
+            await asyncio.to_thread(self._write, records)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except OSError:
+                # Keep the session going; the trace is best effort
+                pass
+
+    async def close(self):
+        """Stop the flusher and write everything still buffered."""
+        if not self.enabled:
+            return
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self.emit('trace.end')
+        try:
+            await self.flush()
+        except OSError:
+            pass
+
+
+# -- summary ------------------------------------------------------------------
+
+def read_records(path: os.PathLike) -> List[Dict]:
+    """Records of a trace, including its rotated segment, in order."""
+    path = Path(path)
+    records: List[Dict] = []
+    for part in (path.with_name(path.name + '.1'), path):
+        if not part.exists():
+            continue
+        with open(part) as fh:
+            for line in fh:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    records.sort(key=lambda r: r.get('t', 0))
+    return records
+
+
+def _pct(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(records: Iterable[Dict]) -> str:
+    """Explain where time went in a traced session."""
+    records = list(records)
+    if not records:
+        return 'empty trace'
+    session_ms = records[-1]['t'] - records[0]['t']
+    counts = Counter(r['ev'] for r in records)
+    jobs: Dict[int, Dict] = {}
+    waits = Counter()
+    latencies: Dict[str, List[float]] = {}
+    first_frame = None
+    for r in records:
+        ev = r['ev']
+        if ev == 'ui.first_frame':
+            first_frame = r.get('ms')
+        if 'ms' in r and ev in ('menu.select', 'subtopic.activate', 'tree.select'):
+            latencies.setdefault(ev, []).append(r['ms'])
+        if ev in ('job.sudo_wait', 'job.prompt'):
+            waits[ev] += r.get('ms', 0)
+        job_id = r.get('job')
+        if job_id is None:
+            continue
+        job = jobs.setdefault(job_id, {'description': '', 'start': r['t'], 'user_wait_ms': 0.0})
+        if ev == 'job.start':
+            job['description'] = r.get('description', '')
+            job['start'] = r['t']
+        elif ev == 'job.first_output':
+            job['first_output_ms'] = r['t'] - job['start']
+        elif ev in ('job.sudo_wait', 'job.prompt'):
+            job['user_wait_ms'] += r.get('ms', 0)
+        elif ev == 'job.end':
+            job['wall_ms'] = r['t'] - job['start']
+            job['rc'] = r.get('rc')
+
+    job_ms = sum(j.get('wall_ms', 0) for j in jobs.values())
+    user_ms = sum(waits.values())
+    lines = [f"session            {session_ms / 1000:10.1f} s   ({len(records)} events)"]
+    if first_frame is not None:
+        lines.append(f"first frame        {first_frame / 1000:10.2f} s")
+    lines.append(f"running jobs       {(job_ms - sum(j['user_wait_ms'] for j in jobs.values())) / 1000:10.1f} s   ({len(jobs)} jobs)")
+    lines.append(f"waiting for user   {user_ms / 1000:10.1f} s   (sudo {waits['job.sudo_wait'] / 1000:.1f} s, prompts {waits['job.prompt'] / 1000:.1f} s)")
+    lines.append(f"idle / browsing    {max(0.0, session_ms - job_ms) / 1000:10.1f} s")
+    if counts.get('trace.dropped'):
+        lines.append(f"dropped events     {sum(r.get('count', 0) for r in records if r['ev'] == 'trace.dropped'):10d}")
+
+    if jobs:
+        lines.append('')
+        lines.append(f"{'job':>4} {'rc':>4} {'wall s':>8} {'1st out s':>9} {'user s':>7}  description")
+        for job_id, j in sorted(jobs.items(), key=lambda kv: -kv[1].get('wall_ms', 0)):
+            first = j.get('first_output_ms')
+            lines.append(f"{job_id:>4} {str(j.get('rc', '-')):>4} {j.get('wall_ms', 0) / 1000:>8.1f} "
+                         f"{'-' if first is None else f'{first / 1000:.2f}':>9} {j['user_wait_ms'] / 1000:>7.1f}  {j['description']}")
+
+    if latencies:
+        lines.append('')
+        lines.append(f"{'interaction':<20} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for name, values in sorted(latencies.items()):
+            lines.append(f"{name:<20} {len(values):>5} {_pct(values, 50):>8.1f} {_pct(values, 95):>8.1f} {max(values):>8.1f}")
+
+    lines.append('')
+    lines.append('events: ' + ', '.join(f"{name}={n}" for name, n in counts.most_common()))
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect archer-tui event traces')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_sum = sub.add_parser('summary', help='Where time went in a session')
+    p_sum.add_argument('trace')
+    args = parser.parse_args(argv)
+    print(summarize(read_records(args.trace)))
+    return 0
+
+
+__all__ = ['EventTrace', 'TRACE_ENV', 'read_records', 'summarize']
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,9 +3,19 @@
 
 This module exposes `main()` which starts the Textual application. It is
 designed to be executed as `python3 -m archer.tui` or imported by other code.
+
+Startup is kept lean: only the standard library is imported at module load,
+menu discovery runs on a background thread while Textual and the
+application module are being imported, and the app reports its measured
+time-to-first-frame.
 """
 import os
 import sys
+import time
+
+# Reference point for time-to-first-frame; taken before anything heavy loads
+STARTED_AT = time.perf_counter()
+
 from pathlib import Path
 
 # Ensure the package bin directory is on sys.path for relative imports
@@ -14,30 +24,134 @@ ROOT_DIR = PACKAGE_DIR.parent
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from .archer_tui_impl import ArcherTUIApp  # type: ignore
+# Minimum terminal dimensions
+MIN_COLUMNS = 100
+MIN_ROWS = 25
+
+
+def check_terminal_dimensions(verbose: bool = False) -> bool:
+    """Check if terminal meets minimum dimension requirements"""
+    try:
+        size = os.get_terminal_size(sys.__stdout__.fileno())
+    except (AttributeError, ValueError, OSError) as e:
+        if verbose:
+            print(f"⚠️  Could not determine terminal size: {e}")
+        return True
+
+    if size.columns < MIN_COLUMNS or size.lines < MIN_ROWS:
+        print(f"❌ Terminal too small: {size.columns}x{size.lines} (required {MIN_COLUMNS}x{MIN_ROWS})")
+        return False
+
+    if verbose:
+        print(f"✅ Terminal size OK: {size.columns}x{size.lines}")
+    return True
+
+
+def start_menu_discovery():
+    """Discover install menus on a background thread; returns a Future."""
+    from concurrent.futures import ThreadPoolExecutor
+    from .lib import ArcherMenu, ArcherUI
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='archer-discovery')
+    future = executor.submit(lambda: ArcherMenu(ArcherUI(verbose=False)))
+    executor.shutdown(wait=False)
+    return future
 
 
 def main(argv=None):
-    argv = argv or sys.argv[1:]
-    if ArcherTUIApp is None:
-        print("No TUI implementation found. Ensure 'bin/archer/archer_tui_impl.py' exists.")
-        return 2
+    """Run the Archer TUI application"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Archer Linux Enhancement Suite - TUI')
+    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--skip-size-check', action='store_true', help='Skip terminal size check')
+    parser.add_argument('--pty', action='store_true', help='Run installers under a pseudo-terminal for live progress')
+    parser.add_argument('--profile', nargs='?', const='', metavar='PATH',
+                        help='Record startup timings and a sampling profile (default: state dir)')
+    parser.add_argument('--trace', nargs='?', const='', metavar='PATH',
+                        help='Write a JSONL trace of UI and job events (default: state dir; also ARCHER_TRACE=1)')
+    parser.add_argument('--isolate', nargs='?', const='auto', choices=('off', 'auto', 'scope', 'nice'),
+                        help='Run installers with lower CPU/IO priority and a memory limit '
+                             '(default auto: systemd user scope, else nice; also ARCHER_ISOLATE)')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.debug:
+        print("[archer-tui] Starting up...")
+        print(f"[archer-tui] Python: {sys.executable} {sys.version.splitlines()[0]}")
+        print(f"[archer-tui] CWD: {os.getcwd()}")
+        print(f"[archer-tui] ARGS: {sys.argv}")
+
+    # Check terminal dimensions unless skipped
+    if not args.skip_size_check and not check_terminal_dimensions(verbose=args.debug):
+        print("[archer-tui] Exiting due to terminal size")
+        return 1
 
-    # Pass through CLI args to the module's main if present, otherwise instantiate
-    # and run the application directly.
+    # Set up environment: default to project root (two levels up from bin/archer)
+    archer_dir = str(Path(__file__).resolve().parents[2])
+    os.environ['ARCHER_DIR'] = archer_dir
     try:
-        # If the module defined a main(), call it
-        ns = globals()
-        # If the extracted ns has a main, call it
-        # Otherwise, create and run the App
-        app = ArcherTUIApp()
+        os.chdir(archer_dir)
+    except Exception as e:
+        print(f"[archer-tui] Could not change directory to {archer_dir}: {e}")
+
+    # Walk install/ while Textual is being imported
+    menu_future = start_menu_discovery()
+
+    profiler = None
+    if args.profile is not None:
+        from .profiling import SessionProfiler
+        profiler = SessionProfiler(STARTED_AT)
+
+    from .trace import EventTrace
+    if args.trace is not None:
+        trace = EventTrace(path=args.trace or None)
+    else:
+        trace = EventTrace.from_env()
+
+    from .archer_tui_impl import ArcherTUIApp
+
+    if profiler is not None:
+        profiler.mark_since_start('imports')
+
+    try:
+        app = ArcherTUIApp(
+            use_pty=True if args.pty else None,
+            archer_menu=menu_future,
+            started_at=STARTED_AT,
+            profiler=profiler,
+            trace=trace,
+            isolate=args.isolate,
+        )
         app.run()
-        return 0
     except SystemExit as e:
         return e.code if isinstance(e.code, int) else 0
-    except Exception as e:
-        print(f"Error running Archer TUI: {e}")
-        raise
+    except Exception:
+        import traceback
+        print("[archer-tui] Unhandled exception while running app:")
+        traceback.print_exc()
+        return 1
+
+    if args.debug and app.first_frame_ms is not None:
+        print(f"[archer-tui] Time to first frame: {app.first_frame_ms:.0f} ms")
+    if profiler is not None:
+        write_profile(profiler, app, args.profile)
+    if trace.enabled:
+        print(f"[archer-tui] Trace written to {trace.path}")
+    return 0
+
+
+def write_profile(profiler, app, path):
+    """Add discovery timings to the profile and write the report."""
+    timings = getattr(getattr(app, 'archer_menu', None), 'timings', {}) or {}
+    for phase in ('config_load', 'discovery'):
+        if phase in timings:
+            profiler.record(phase, timings[phase])
+    try:
+        target = profiler.write(path or None)
+    except OSError as e:
+        print(f"[archer-tui] Could not write profile: {e}")
+        return
+    print(f"[archer-tui] Profile written to {target}")
 
 
 if __name__ == '__main__':
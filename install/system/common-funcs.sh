@@ -25,41 +25,51 @@ NC='\033[0m' # No Color
 # USER INTERFACE FUNCTIONS (Simple, no dependencies)
 # ============================================================================
 
-# Confirm function: prefer `gum confirm` in interactive TUI-enabled environments,
-# otherwise fall back to a simple read-based prompt. This keeps the same
-# interface (`confirm_action "Message"`) used across scripts.
+# Ask the running Archer TUI to show a prompt through its prompt channel
+# (a FIFO named by ARCHER_PROMPT_FIFO, see bin/archer/prompt_channel.py).
+# Usage: archer_tui_prompt <confirm|secret> "Message"
+# Prints the answer on stdout. Returns 0 when answered, 1 when declined and
+# 2 when no TUI is listening so callers can fall back to other prompts.
+archer_tui_prompt() {
+    local kind="$1"
+    local message="$2"
+    local channel="${ARCHER_PROMPT_FIFO:-}"
+
+    if [ -z "$channel" ] || [ ! -p "$channel" ]; then
+        return 2
+    fi
+
+    local reply_fifo="${channel%/*}/reply.$$.${RANDOM}"
+    mkfifo -m 600 "$reply_fifo" 2>/dev/null || return 2
+
+    # Hold the reply FIFO open before sending so the TUI can always answer
+    local fd status value
+    exec {fd}<>"$reply_fifo"
+    message="${message//$'\n'/ }"
+    message="${message//$'\t'/ }"
+    printf '%s\t%s\t%s\n' "$kind" "$reply_fifo" "${message:0:2048}" > "$channel"
+    IFS=$'\t' read -r -u "$fd" status value
+    exec {fd}<&-
+    rm -f "$reply_fifo"
+
+    printf '%s' "$value"
+    [ "$status" = "ok" ]
+}
+
+# Confirm function: inside the TUI the running app shows a modal; otherwise
+# prefer `gum confirm` in interactive environments and fall back to a simple
+# read-based prompt. This keeps the same interface (`confirm_action "Message"`)
+# used across scripts.
 confirm_action() {
     local message="$1"
-    # Helper to determine if the Textual-based TUI CLI can run here.
-    archer_can_run_tui_cli() {
-        # Only try if ARCHER_TUI is set and python3 exists and the CLI file exists
-        if [ -z "${ARCHER_TUI:-}" ]; then
-            return 1
-        fi
-        local cli="${ARCHER_DIR:-$(dirname "${BASH_SOURCE[0]}")/../../}/bin/archer/archer_tui_cli.py"
-        if [ ! -f "$cli" ]; then
-            return 1
-        fi
-        if ! command -v python3 >/dev/null 2>&1; then
-            return 1
-        fi
-        # Check if textual module is importable
-        python3 - <<'PY' >/dev/null 2>&1 || return 1
-import importlib, sys
-spec = importlib.util.find_spec('textual')
-sys.exit(0 if spec is not None else 1)
-PY
-        return 0
-    }
 
-    # If the textual-based TUI helper is available, prefer it.
-    if archer_can_run_tui_cli && [ "${AUTO_CONFIRM:-0}" != "1" ]; then
-        tui_cli="${ARCHER_DIR:-$(dirname "${BASH_SOURCE[0]}")/../../}/bin/archer/archer_tui_cli.py"
-        if python3 "$tui_cli" confirm --message "$message" >/dev/null 2>&1; then
-            return 0
-        else
-            return 1
-        fi
+    # Inside the TUI, let the running app render the modal
+    if [ -n "${ARCHER_PROMPT_FIFO:-}" ] && [ "${AUTO_CONFIRM:-0}" != "1" ]; then
+        archer_tui_prompt confirm "$message" >/dev/null
+        case $? in
+            0) return 0 ;;
+            1) return 1 ;;
+        esac
     fi
 
     # If gum is available and stdout is a tty, prefer gum's confirmation UI
@@ -86,12 +96,12 @@ archer_prompt_secret() {
     local prompt="${1:-Password: }"
     local secret=""
 
-    # Prefer Textual TUI modal if available
-    if archer_can_run_tui_cli && [ "${AUTO_CONFIRM:-0}" != "1" ]; then
-        tui_cli="${ARCHER_DIR:-$(dirname "${BASH_SOURCE[0]}")/../../}/bin/archer/archer_tui_cli.py"
-        secret=$(python3 "$tui_cli" secret --prompt "$prompt" 2>/dev/null || true)
-        printf '%s' "$secret"
-        return 0
+    # Inside the TUI, let the running app render a masked input modal
+    if [ -n "${ARCHER_PROMPT_FIFO:-}" ] && [ "${AUTO_CONFIRM:-0}" != "1" ]; then
+        if secret=$(archer_tui_prompt secret "$prompt") || [ $? -eq 1 ]; then
+            printf '%s' "$secret"
+            return 0
+        fi
     fi
 
     if command -v gum >/dev/null 2>&1 && [ -t 1 ] && [ "${AUTO_CONFIRM:-0}" != "1" ]; then
@@ -121,6 +131,11 @@ archer_request_sudo() {
         return 0
     fi
 
+    # Inside the TUI the app's sudo broker answers askpass requests
+    if [ -n "${ARCHER_ASKPASS_SOCKET:-}" ] && command sudo -A -v 2>/dev/null; then
+        return 0
+    fi
+
     # Non-interactive contexts cannot collect a password
     if [ "${AUTO_CONFIRM:-0}" = "1" ] || ! [ -t 0 ] || ! [ -t 1 ]; then
         echo -e "${YELLOW}Cannot prompt for sudo password in non-interactive mode.${NC}"
@@ -143,6 +158,15 @@ archer_request_sudo() {
     fi
 }
 
+# When launched by the TUI with a validated session, route every sudo call
+# through the broker's askpass helper (SUDO_ASKPASS) instead of a terminal
+# prompt that the TUI could never answer.
+if [ -n "${ARCHER_ASKPASS_SOCKET:-}" ] && [ -n "${SUDO_ASKPASS:-}" ]; then
+    sudo() {
+        command sudo -A "$@"
+    }
+fi
+
 # Wrapper to run a command with sudo after ensuring credentials are available.
 # Usage: archer_sudo <command...>
 archer_sudo() {
@@ -221,8 +245,14 @@ select_option() {
 # - user explicitly sets ARCHER_FORCE_AUTO_CONFIRM=1
 # - ARCHER_TUI or ARCHER_NONINTERACTIVE or CI are set
 # - stdin (fd 0) or stdout (fd 1) are not TTYs (covers TUI output panels)
+# unless the running TUI provides a prompt channel (ARCHER_PROMPT_FIFO), in
+# which case prompts are shown as modals in the TUI itself.
 if [ -z "${AUTO_CONFIRM:-}" ]; then
-    if [ "${ARCHER_FORCE_AUTO_CONFIRM:-}" = "1" ] || [ -n "${ARCHER_TUI:-}" ] || [ -n "${ARCHER_NONINTERACTIVE:-}" ] || [ -n "${CI:-}" ] || ! [ -t 0 ] || ! [ -t 1 ]; then
+    if [ "${ARCHER_FORCE_AUTO_CONFIRM:-}" = "1" ] || [ -n "${ARCHER_NONINTERACTIVE:-}" ] || [ -n "${CI:-}" ]; then
+        AUTO_CONFIRM=1
+    elif [ -p "${ARCHER_PROMPT_FIFO:-}" ]; then
+        AUTO_CONFIRM=0
+    elif [ -n "${ARCHER_TUI:-}" ] || ! [ -t 0 ] || ! [ -t 1 ]; then
         AUTO_CONFIRM=1
     else
         AUTO_CONFIRM=0
@@ -381,7 +411,41 @@ execute_with_progress() {
         echo -e "${CYAN}Command: $command ${args[*]}${NC}"
     fi
 
-    eval "$command" "${args[@]}"
+    # With ARCHER_SKIP_UNCHANGED=1, installer scripts (not nested install.sh
+    # menus, whose scripts are checked one by one) are skipped while they are
+    # unchanged since their last successful run (bin/archer/skip_cache.py)
+    local cached_script=""
+    if [[ "${ARCHER_SKIP_UNCHANGED:-0}" == "1" && ${#args[@]} -eq 0 && "$command" =~ ^bash\ \'([^\']+)\'$ ]]; then
+        cached_script="${BASH_REMATCH[1]}"
+        [[ "$(basename "$cached_script")" == "install.sh" ]] && cached_script=""
+    fi
+    if [[ -z "$cached_script" ]]; then
+        eval "$command" "${args[@]}"
+        return
+    fi
+
+    local reason
+    if reason=$(archer_skip_cache check "$cached_script"); then
+        echo -e "${GREEN}✓ Skipped: $reason${NC}"
+        return 0
+    fi
+    [[ -n "$reason" ]] && log_debug "Running $(basename "$cached_script"): $reason"
+
+    local rc=0
+    eval "$command" || rc=$?
+    if (( rc == 0 )); then
+        archer_skip_cache record "$cached_script" >/dev/null
+    else
+        archer_skip_cache forget "$cached_script" >/dev/null
+    fi
+    return $rc
+}
+
+# Run bin/archer/skip_cache.py; fails (so scripts run) when Python is unusable
+archer_skip_cache() {
+    local root="${ARCHER_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)}"
+    ARCHER_DIR="$root" PYTHONPATH="$root/bin${PYTHONPATH:+:$PYTHONPATH}" \
+        python3 -m archer.skip_cache "$@" 2>/dev/null
 }
 
 # Execute custom action from TOML